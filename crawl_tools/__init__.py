@@ -1,26 +1,155 @@
-from crawl_tools.custom import CustomFilteredCrawlStrategy
-from crawl_tools.utils import (
-    split_into_paragraphs,
-    convert_and_wrap,
-    convert_crawl_result,
-    normalize_url,
-    convert_content,
-    convert_to_utc_string,
-    log_print,
-    clean_text,
-    get_page_slug,
-    save_content,
-    generate_json_filename,
-    filter_queries,
-    response_url,
-)
-from crawl_tools.dual_logger import DualLogger
-from crawl_tools.interactions_js import (
-    scroll_and_next,
-    wait_for_new_page
-)
-from crawl_tools.hooks import (
-    local_result_hook,
-    api_result_hook,
-    periodic_json_update,
-)
\ No newline at end of file
+"""
+crawl_tools exposes its helpers lazily: `from crawl_tools import DualLogger` only
+imports crawl_tools.dual_logger, and the crawl stack (crawl4ai, selenium, requests,
+BeautifulSoup, html2text) is imported the first time a name that needs it is used.
+"""
+import importlib
+
+# public name -> submodule defining it
+_EXPORTS = {
+    "crawl_tools.custom": [
+        "CustomFilteredCrawlStrategy",
+        "SeededBFSDeepCrawlStrategy",
+    ],
+    "crawl_tools.utils": [
+        "split_into_paragraphs",
+        "convert_and_wrap",
+        "convert_crawl_result",
+        "convert_crawl_result_formats",
+        "html_to_text",
+        "OUTPUT_FORMATS",
+        "normalize_url",
+        "convert_content",
+        "convert_to_utc_string",
+        "log_print",
+        "clean_text",
+        "get_page_slug",
+        "save_content",
+        "generate_json_filename",
+        "filter_queries",
+        "build_content_filename",
+        "unwrap_result",
+    ],
+    "crawl_tools.browser": [
+        "response_url",
+    ],
+    "crawl_tools.dual_logger": [
+        "DualLogger",
+    ],
+    "crawl_tools.interactions_js": [
+        "scroll_and_next",
+        "wait_for_new_page",
+        "paginate_step",
+    ],
+    "crawl_tools.pagination": [
+        "Paginator",
+    ],
+    "crawl_tools.hooks": [
+        "HookContext",
+        "result_hook",
+        "save_formats",
+        "periodic_json_update",
+    ],
+    "crawl_tools.memory": [
+        "OVERSIZE_CHOICES",
+        "PageSizeLimit",
+        "ByteBudget",
+        "result_bytes",
+        "release_result",
+    ],
+    "crawl_tools.storage": [
+        "STORE_CHOICES",
+        "FileStore",
+        "ShardStore",
+        "create_store",
+        "read_content",
+        "read_record",
+        "load_shard_index",
+    ],
+    "crawl_tools.archive": [
+        "ARCHIVE_DIRNAME",
+        "FetchArchive",
+        "replay_archive",
+    ],
+    "crawl_tools.fetch_cache": [
+        "FETCH_CACHE_DIR",
+        "FetchCache",
+        "CachedCrawlerStrategy",
+        "canonical_url",
+    ],
+    "crawl_tools.boilerplate": [
+        "BOILERPLATE_FILENAME",
+        "BoilerplateDetector",
+    ],
+    "crawl_tools.search": [
+        "SEARCH_INDEX_FILENAME",
+        "SearchIndex",
+        "SearchHit",
+        "build_search_index",
+    ],
+    "crawl_tools.link_graph": [
+        "LINK_GRAPH_SUFFIX",
+        "LinkGraph",
+        "link_graph_filename",
+        "load_link_graph",
+    ],
+    "crawl_tools.page_index": [
+        "PAGE_INDEX_DIRNAME",
+        "PageIndex",
+        "PageEntry",
+        "build_from_mapping",
+    ],
+    "crawl_tools.profiling": [
+        "Profiler",
+        "activity",
+    ],
+    "crawl_tools.seeding": [
+        "RobotsRules",
+        "RobotsFilter",
+        "SitemapEntry",
+        "iter_sitemap",
+        "seed_urls",
+    ],
+    "crawl_tools.throttle": [
+        "AdaptiveRateLimiter",
+        "RetryQueue",
+        "is_transient_failure",
+    ],
+    "crawl_tools.engine": [
+        "CrawlEngine",
+        "CrawlSettings",
+        "CrawlOutput",
+    ],
+    "crawl_tools.cli": [
+        "add_crawl_arguments",
+        "check_crawl_arguments",
+        "settings_from_args",
+        "setup_logging",
+        "open_fetch_cache",
+        "run_cli",
+    ],
+    "crawl_tools.frontier": [
+        "SQLiteFrontier",
+        "RedisFrontier",
+        "FrontierWorker",
+        "create_frontier",
+        "url_partition",
+    ],
+}
+
+_LAZY = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = sorted(_LAZY)
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value  # cache, later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
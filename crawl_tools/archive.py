@@ -0,0 +1,153 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Awaitable, Callable, Optional, TYPE_CHECKING
+
+from crawl_tools.storage import ShardStore, load_shard_index, read_record
+from crawl_tools.utils import log_print
+
+if TYPE_CHECKING:
+    from crawl4ai import CrawlResult
+
+ARCHIVE_DIRNAME = ".archive"
+
+
+class FetchArchive(ShardStore):
+    """
+    Record of the raw rendered HTML and response metadata of every fetched page, kept
+    so conversion settings (content filter, output format) can be changed later and
+    applied with replay_archive() instead of re-crawling.
+
+    Pages are written as one compressed JSON record each
+    ({"url", "depth", "fetched", "status_code", "response_headers", "redirected_url", "html"})
+    into rolling fetch_*.jsonl.gz shards with a .idx.jsonl sidecar, see ShardStore.
+    """
+
+    def __init__(
+        self,
+        archive_dir: str,
+        compression: str = "gzip",
+        shard_size: int = 256 * 1024 * 1024,
+        level: Optional[int] = None,
+    ):
+        super().__init__(
+            archive_dir, compression=compression, shard_size=shard_size, prefix="fetch", level=level
+        )
+
+    def record(self, result: "CrawlResult", depth: int) -> str:
+        return self.append(
+            result.url,
+            {
+                "url": result.url,
+                "depth": depth,
+                "fetched": time.time(),
+                "status_code": result.status_code,
+                "response_headers": result.response_headers,
+                "redirected_url": result.redirected_url,
+                "html": result.html,
+            },
+        )
+
+
+# Per-process run config of the replay workers, built once by _init_replay_worker.
+_replay_config = None
+
+
+def build_replay_config(pruning_threshold: float = 0.4):
+    """The conversion settings of a live crawl (see main.py), without any fetching."""
+    from crawl4ai import CrawlerRunConfig, DefaultMarkdownGenerator, PruningContentFilter
+
+    return CrawlerRunConfig(
+        markdown_generator=DefaultMarkdownGenerator(
+            content_filter=PruningContentFilter(threshold=pruning_threshold, threshold_type="fixed"),
+        ),
+        exclude_external_links=True,
+        exclude_social_media_links=True,
+    )
+
+
+def _init_replay_worker(pruning_threshold: float):
+    global _replay_config
+    _replay_config = build_replay_config(pruning_threshold)
+
+
+def replay_page(ref: str) -> "CrawlResult":
+    """
+    Rebuild the CrawlResult of one archived page the way AsyncWebCrawler.aprocess_html
+    does: scraping strategy -> cleaned HTML and links -> markdown generator.
+    Runs in a worker process; failures are returned as unsuccessful results.
+    """
+    from crawl4ai import CrawlResult
+
+    record = read_record(ref)
+    config = _replay_config or build_replay_config()
+    metadata = {"depth": record.get("depth", 0)}
+    try:
+        params = {k: v for k, v in config.to_dict().items() if k != "url"}
+        scraped = config.scraping_strategy.scrap(record["url"], record["html"], **params)
+        markdown = config.markdown_generator.generate_markdown(
+            cleaned_html=scraped.cleaned_html, base_url=record["url"]
+        )
+    except Exception as e:
+        return CrawlResult(
+            url=record["url"],
+            html="",
+            success=False,
+            error_message=f"Replay of {ref} failed: {e}",
+            metadata=metadata,
+        )
+    metadata.update(scraped.metadata or {})
+    return CrawlResult(
+        url=record["url"],
+        html=record["html"],
+        success=True,
+        cleaned_html=scraped.cleaned_html,
+        links=scraped.links.model_dump(),
+        media=scraped.media.model_dump(),
+        markdown=markdown,
+        metadata=metadata,
+        status_code=record.get("status_code"),
+        response_headers=record.get("response_headers"),
+        redirected_url=record.get("redirected_url"),
+    )
+
+
+async def replay_archive(
+    archive_dir: str,
+    handle_result: Callable[["CrawlResult"], Awaitable[None]],
+    pruning_threshold: float = 0.4,
+    workers: Optional[int] = None,
+) -> int:
+    """
+    Convert every archived page (latest recording per URL) in a process pool and pass the
+    results to handle_result in the calling process, typically the save hook, so stores,
+    the page index and the URL mapping are written by a single writer. At most
+    2 * workers pages are in flight. Returns the number of pages replayed.
+    """
+    refs = list(load_shard_index(archive_dir).values())
+    workers = workers or os.cpu_count() or 1
+    log_print(f"[INFO] Replaying {len(refs)} archived pages from '{archive_dir}' with {workers} workers")
+    loop = asyncio.get_running_loop()
+    started = time.time()
+    done = 0
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_replay_worker,
+        initargs=(pruning_threshold,),
+    ) as pool:
+        pending = set()
+        queue = iter(refs)
+        while True:
+            for ref in queue:
+                pending.add(loop.run_in_executor(pool, replay_page, ref))
+                if len(pending) >= 2 * workers:
+                    break
+            if not pending:
+                break
+            finished, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in finished:
+                await handle_result(future.result())
+                done += 1
+    log_print(f"[INFO] Replayed {done} pages in {time.time() - started:.1f}s")
+    return done
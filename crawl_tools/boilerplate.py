@@ -0,0 +1,138 @@
+import hashlib
+import json
+import math
+import os
+import re
+from typing import Dict, Iterable, List, Optional
+
+from crawl_tools.utils import TEXT_FORMATS, log_print
+
+# State file kept in the data folder of a crawl.
+BOILERPLATE_FILENAME = ".boilerplate.json"
+
+BLOCK_SEPARATOR = re.compile(r"\n[ \t]*\n")
+
+
+def split_blocks(content: str) -> List[str]:
+    """Split markdown / plain text into blocks separated by blank lines."""
+    return BLOCK_SEPARATOR.split(content)
+
+
+def block_fingerprint(block: str) -> Optional[int]:
+    """64-bit fingerprint of a block, insensitive to case and whitespace; None for empty blocks."""
+    normalized = " ".join(block.split()).lower()
+    if not normalized:
+        return None
+    return int.from_bytes(
+        hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).digest(), "little"
+    )
+
+
+class BoilerplateDetector:
+    """
+    Learns the template of one site (navigation, cookie banners, footers...) from the
+    pages of a crawl and strips it from the saved text.
+
+    Every page's distinct block fingerprints are counted with lossy counting: counts
+    are kept in buckets of ceil(1 / error) pages and fingerprints that cannot reach
+    a frequency of error * pages are dropped at each bucket boundary, so memory stays
+    bounded however many unique blocks the site has. Once min_pages pages have been
+    seen, a block present on at least threshold of them is boilerplate.
+
+    Pages saved before the template is learned keep their boilerplate; the state is
+    saved to path (loaded again on the next run) so strip_boilerplate.py can
+    reprocess them afterwards.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.5,
+        min_pages: int = 20,
+        error: float = 0.005,
+        path: Optional[str] = None,
+    ):
+        self.threshold = threshold
+        self.min_pages = min_pages
+        self.bucket_width = math.ceil(1 / error)
+        self.path = path
+        self.pages = 0
+        # fingerprint -> [count, maximum undercount]
+        self.counts: Dict[int, List[int]] = {}
+        if path is not None and os.path.exists(path):
+            self._load(path)
+
+    def _load(self, path: str):
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        self.pages = state["pages"]
+        self.counts = {int(fp, 16): entry for fp, entry in state["counts"].items()}
+        log_print(
+            f"[DEBUG] Loaded boilerplate state from '{path}' "
+            f"({self.pages} pages, {len(self.boilerplate())} boilerplate blocks)"
+        )
+
+    def save(self, path: Optional[str] = None):
+        path = path or self.path
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "pages": self.pages,
+                    "counts": {f"{fp:016x}": entry for fp, entry in self.counts.items()},
+                },
+                f,
+            )
+        log_print(
+            f"[DEBUG] Saved boilerplate state to '{path}' "
+            f"({self.pages} pages, {len(self.boilerplate())} boilerplate blocks)"
+        )
+
+    def observe(self, contents: Iterable[str]):
+        """Count the distinct blocks of one page (given as one or more of its representations)."""
+        fingerprints = set()
+        for content in contents:
+            for block in split_blocks(content):
+                fp = block_fingerprint(block)
+                if fp is not None:
+                    fingerprints.add(fp)
+        self.pages += 1
+        bucket = math.ceil(self.pages / self.bucket_width)
+        for fp in fingerprints:
+            entry = self.counts.get(fp)
+            if entry is None:
+                self.counts[fp] = [1, bucket - 1]
+            else:
+                entry[0] += 1
+        if self.pages % self.bucket_width == 0:
+            self.counts = {
+                fp: entry for fp, entry in self.counts.items() if entry[0] + entry[1] > bucket
+            }
+
+    def is_boilerplate(self, fingerprint: Optional[int]) -> bool:
+        if fingerprint is None or self.pages < self.min_pages:
+            return False
+        entry = self.counts.get(fingerprint)
+        return entry is not None and entry[0] >= self.threshold * self.pages
+
+    def boilerplate(self) -> List[int]:
+        if self.pages < self.min_pages:
+            return []
+        return [fp for fp in self.counts if self.is_boilerplate(fp)]
+
+    def strip(self, content: str) -> str:
+        """Drop boilerplate blocks; a page made only of boilerplate is returned unchanged."""
+        blocks = split_blocks(content)
+        kept = [block for block in blocks if not self.is_boilerplate(block_fingerprint(block))]
+        if len(kept) == len(blocks) or not any(block.strip() for block in kept):
+            return content
+        return "\n\n".join(kept)
+
+    def process(self, formats: Dict[str, str]) -> Dict[str, str]:
+        """Learn from and strip the text formats ({ext: content}) of one page."""
+        texts = {ext: content for ext, content in formats.items() if ext in TEXT_FORMATS and content}
+        if not texts:
+            return formats
+        self.observe(texts.values())
+        stripped = dict(formats)
+        for ext, content in texts.items():
+            stripped[ext] = self.strip(content)
+        return stripped
@@ -0,0 +1,29 @@
+import time
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import TimeoutException
+
+
+def response_url(url):
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--disable-gpu")
+    # Initialize the Chrome driver (ensure chromedriver is in PATH)
+    driver = webdriver.Chrome(options=chrome_options)
+    
+    try:
+        driver.set_page_load_timeout(300)
+        driver.get(url)
+        # Wait to ensure dynamic content loads.
+        time.sleep(5)
+        # Get the final URL after any redirections.
+        final_url = driver.current_url
+        driver.quit()
+        return final_url
+    
+    except TimeoutException as te:
+        driver.quit()
+        raise Exception("URL not accessible due to timeout: " + str(te))
+    except Exception as e:
+        driver.quit()
+        raise Exception("URL not accessible: " + str(e))
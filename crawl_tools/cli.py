@@ -0,0 +1,337 @@
+"""
+Command line front end shared by main.py and crawl_with_sleep.py: the crawl options,
+their conversion to CrawlSettings, and a run of one crawl on a CrawlEngine with the
+logging, profiling and fetch cache options applied.
+"""
+import argparse
+import asyncio
+import dataclasses
+import json
+import os
+import sys
+from typing import AsyncIterator, Callable, Optional
+
+from crawl_tools.archive import ARCHIVE_DIRNAME
+from crawl_tools.boilerplate import BOILERPLATE_FILENAME
+from crawl_tools.dual_logger import DualLogger
+from crawl_tools.engine import CrawlEngine, CrawlSettings
+from crawl_tools.fetch_cache import FETCH_CACHE_DIR, FetchCache
+from crawl_tools.link_graph import LINK_GRAPH_SUFFIX
+from crawl_tools.memory import OVERSIZE_CHOICES
+from crawl_tools.page_index import PAGE_INDEX_DIRNAME
+from crawl_tools.profiling import Profiler
+from crawl_tools.search import SEARCH_INDEX_FILENAME
+from crawl_tools.storage import STORE_CHOICES, _zstd
+from crawl_tools.utils import OUTPUT_FORMATS, generate_json_filename, log_print
+
+
+def add_crawl_arguments(parser: argparse.ArgumentParser, timing: bool = True) -> argparse.ArgumentParser:
+    """Add the crawl options; timing adds -t/--timeout, -s/--sleep_timer and -c/--concurrent_tasks."""
+    parser.add_argument(
+        "-u", "--url", required=True, help="The base website URL to scrape"
+    )
+    parser.add_argument(
+        "-d",
+        "--max_depth",
+        type=int,
+        default=2,
+        help="Maximum depth to crawl (default: 2, use -1 for unlimited, 0 for only the base page).",
+    )
+    if timing:
+        parser.add_argument(
+            "-t",
+            "--timeout",
+            type=int,
+            default=300000,
+            help="Timeout per page request in milliseconds (default: 300000).",
+        )
+        parser.add_argument(
+            "-s",
+            "--sleep_timer",
+            type=float,
+            default=2.0,
+            help="Upper bound of randomized sleep timer in seconds after each process finishes (default: 2.0).",
+        )
+        parser.add_argument(
+            "-c",
+            "--concurrent_tasks",
+            type=int,
+            default=None,
+            help="Maximum number of pages fetched at once (default: Crawl4AI's dispatcher limit of 20).",
+        )
+    parser.add_argument(
+        "--ext",
+        nargs="+",
+        choices=OUTPUT_FORMATS,
+        default=[".md"],
+        help="Output formats, any subset saved from the same crawl: .md fit Markdown (content filter applied), "
+        ".raw.md full-page Markdown, .html fit HTML, .raw.html rendered HTML, .txt plain text (default: .md)",
+    )
+    parser.add_argument(
+        "--store",
+        choices=STORE_CHOICES,
+        default="files",
+        help="Output backend: files (one file per page), gzip/zstd (one compressed file per page), "
+        "shards (rolling compressed JSONL archives with a URL index, many pages per file)",
+    )
+    parser.add_argument(
+        "--shard_size",
+        type=int,
+        default=256,
+        help="Maximum size in MB of each archive when --store shards is used (default: 256).",
+    )
+    parser.add_argument(
+        "--shard_compression",
+        choices=["gzip", "zstd"],
+        default="gzip",
+        help="Per-page compression used inside shards (default: gzip).",
+    )
+    parser.add_argument(
+        "--no_index",
+        action="store_true",
+        help=f"Do not build the memory-mapped page index in <data folder>/{PAGE_INDEX_DIRNAME}",
+    )
+    parser.add_argument(
+        "--robots",
+        action="store_true",
+        help="Honor robots.txt: skip Disallowed URLs and never sleep less than its Crawl-delay between pages",
+    )
+    parser.add_argument(
+        "--sitemaps",
+        action="store_true",
+        help="Seed the crawl frontier from the site's sitemaps (from robots.txt or /sitemap.xml), "
+        "skipping pages whose lastmod is older than their entry in the page index",
+    )
+    parser.add_argument(
+        "--max_seed_urls",
+        type=int,
+        default=None,
+        help="Maximum number of sitemap URLs to seed (default: no limit).",
+    )
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="Adapt per-host concurrency and delay (AIMD) to status codes, Retry-After and latency "
+        "instead of sleeping a random time after each page",
+    )
+    parser.add_argument(
+        "--max_host_concurrency",
+        type=int,
+        default=4,
+        help="Upper bound of concurrent requests per host with --adaptive (default: 4).",
+    )
+    parser.add_argument(
+        "--max_retries",
+        type=int,
+        default=0,
+        help="Retry transient failures (429/5xx/timeouts) up to this many times with capped exponential backoff (default: 0).",
+    )
+    parser.add_argument(
+        "--paginate",
+        action="store_true",
+        help="Treat the start URL as a paginated / infinite-scroll listing: page through it in one browser "
+        "session, save each batch of new items as <url>#page-<n> and seed the crawl with the links they contain",
+    )
+    parser.add_argument(
+        "--item_selector",
+        default=None,
+        help="CSS selector of the listing items (required with --paginate), e.g. 'li.result'",
+    )
+    parser.add_argument(
+        "--next_selector",
+        default=None,
+        help="CSS selector of the next / load more button; without it the listing is scrolled to the bottom",
+    )
+    parser.add_argument(
+        "--max_pages",
+        type=int,
+        default=50,
+        help="Maximum number of pagination steps with --paginate (default: 50).",
+    )
+    parser.add_argument(
+        "--step_timeout",
+        type=float,
+        default=10.0,
+        help="Seconds to wait for new items after each pagination step (default: 10).",
+    )
+    parser.add_argument(
+        "--pruning_threshold",
+        type=float,
+        default=0.4,
+        help="Threshold of the PruningContentFilter used to build the fit markdown (default: 0.4).",
+    )
+    parser.add_argument(
+        "--record",
+        action="store_true",
+        help=f"Record the raw rendered HTML and response metadata of every page in the fetch archive "
+        f"(<data folder>/{ARCHIVE_DIRNAME} or --archive), to be re-converted later with main.py --replay",
+    )
+    parser.add_argument(
+        "--archive",
+        default=None,
+        help=f"Fetch archive directory (default: <data folder>/{ARCHIVE_DIRNAME}).",
+    )
+    parser.add_argument(
+        "--strip_boilerplate",
+        action="store_true",
+        help=f"Learn blocks repeated across the site's pages (menus, banners, footers) and strip them from "
+        f"the .md/.raw.md/.txt output; the learned template is kept in <data folder>/{BOILERPLATE_FILENAME}",
+    )
+    parser.add_argument(
+        "--boilerplate_threshold",
+        type=float,
+        default=0.5,
+        help="Fraction of pages a block must appear on to count as boilerplate (default: 0.5).",
+    )
+    parser.add_argument(
+        "--search_index",
+        action="store_true",
+        help=f"Maintain a BM25 search index of the saved pages in <data folder>/{SEARCH_INDEX_FILENAME} "
+        "(query it with search.py or send_to_prompt.py --query)",
+    )
+    parser.add_argument(
+        "--link_graph",
+        action="store_true",
+        help="Capture the link graph of the crawl (interned URLs, CSR adjacency) and save it next to the "
+        f"URL mapping as <mapping>{LINK_GRAPH_SUFFIX}, for in-degree / PageRank based prioritization",
+    )
+    parser.add_argument(
+        "--max_page_bytes",
+        type=int,
+        default=None,
+        help="Size limit of a page's rendered HTML in bytes; larger pages are handled as set by --oversize (default: no limit).",
+    )
+    parser.add_argument(
+        "--oversize",
+        choices=OVERSIZE_CHOICES,
+        default="truncate",
+        help="What to do with pages over --max_page_bytes: truncate every saved format to the limit, or skip the page (default: truncate).",
+    )
+    parser.add_argument(
+        "--max_inflight_mb",
+        type=float,
+        default=None,
+        help="Run the save hook of each page as a task, with at most this many MB of pages being processed at once; "
+        "the crawl waits while the budget is used up (default: one page at a time)",
+    )
+    parser.add_argument(
+        "--fetch_cache",
+        nargs="?",
+        const=FETCH_CACHE_DIR,
+        default=None,
+        metavar="DIR",
+        help=f"Serve page, robots.txt and sitemap fetches from a shared on-disk cache, and store new ones in it "
+        f"(default directory: {FETCH_CACHE_DIR}). Cache-Control / Expires are honored; "
+        "session and JS interaction steps are never cached",
+    )
+    parser.add_argument(
+        "--cache_size_mb",
+        type=int,
+        default=2048,
+        help="Size bound of the fetch cache in MB, least recently used entries are evicted (default: 2048).",
+    )
+    parser.add_argument(
+        "--cache_ttl",
+        type=float,
+        default=86400,
+        help="Seconds cached responses without Cache-Control or Expires stay fresh (default: 86400).",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Sample the run's stacks into a folded stacks file next to the URL mapping (for flamegraph.pl / "
+        "speedscope), log every event loop stall with the hook and URL that caused it, and log a summary "
+        "of the top blocking call sites at the end",
+    )
+    parser.add_argument(
+        "--stall_threshold",
+        type=float,
+        default=100,
+        help="With --profile, milliseconds the event loop must be blocked to count as a stall (default: 100).",
+    )
+    parser.add_argument(
+        "--verbose",
+        "-v",
+        action="store_true",
+        help="Print output to the terminal in addition to writing to the log file",
+    )
+    return parser
+
+
+def check_crawl_arguments(parser: argparse.ArgumentParser, args: argparse.Namespace):
+    if args.paginate and not args.item_selector:
+        parser.error("--paginate requires --item_selector")
+    if "zstd" in (args.store, args.shard_compression):
+        # fail here rather than once the crawl has started
+        try:
+            _zstd()
+        except ImportError as e:
+            parser.error(str(e))
+
+
+def settings_from_args(args: argparse.Namespace, **overrides) -> CrawlSettings:
+    """CrawlSettings from parsed options (unknown options are ignored), then overrides."""
+    names = {f.name for f in dataclasses.fields(CrawlSettings)}
+    values = {name: value for name, value in vars(args).items() if name in names}
+    values.update(overrides)
+    return CrawlSettings(**values)
+
+
+def setup_logging(args: argparse.Namespace, settings: CrawlSettings, suffix: str = ""):
+    """Log to <debug folder>/log_<base>_depth<d><suffix> (and the terminal with --verbose)."""
+    os.makedirs(settings.data_folder, exist_ok=True)
+    os.makedirs(settings.debug_folder, exist_ok=True)
+    sys.stdout = DualLogger(
+        f"{settings.debug_folder}/log_{settings.desired_base.replace('/', '%')}_depth{settings.max_depth}{suffix}",
+        verbose=args.verbose,
+    )
+    log_print(json.dumps(vars(args), indent=4))
+
+
+def open_fetch_cache(args: argparse.Namespace) -> Optional[FetchCache]:
+    if not args.fetch_cache:
+        return None
+    return FetchCache(
+        args.fetch_cache, max_bytes=args.cache_size_mb * 1024 * 1024, default_ttl=args.cache_ttl
+    )
+
+
+async def run_cli(
+    args: argparse.Namespace,
+    settings: CrawlSettings,
+    crawl: Optional[Callable[[CrawlEngine], AsyncIterator]] = None,
+    log_suffix: str = "",
+    fetch_cache: bool = True,
+):
+    """
+    Run one crawl the way the scripts do: log to <debug folder>/log_<base>_depth<d>,
+    then apply --profile and --fetch_cache (unless fetch_cache is False). crawl picks
+    what the engine runs (default: engine.crawl(settings)).
+    """
+    setup_logging(args, settings, log_suffix)
+    if settings.debug_file is None:
+        settings.debug_file = os.path.join(
+            settings.debug_folder,
+            generate_json_filename(settings.desired_base, settings.max_depth).replace(
+                ".json", f"{log_suffix}.json"
+            ),
+        )
+
+    profiler = None
+    if args.profile:
+        profiler = Profiler(
+            os.path.splitext(settings.debug_file)[0] + ".folded",
+            stall_threshold=args.stall_threshold / 1000,
+        ).start(asyncio.get_running_loop())
+    cache = open_fetch_cache(args) if fetch_cache else None
+
+    try:
+        async with CrawlEngine(fetch_cache=cache) as engine:
+            results = crawl(engine) if crawl is not None else engine.crawl(settings)
+            async for _ in results:
+                pass
+    finally:
+        if cache is not None:
+            cache.close()
+        if profiler is not None:
+            profiler.stop()
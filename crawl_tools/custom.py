@@ -1,6 +1,7 @@
 from urllib.parse import urlparse
-from crawl4ai import BFSDeepCrawlStrategy, CrawlerRunConfig, CacheMode
-from crawl_tools.interactions_js import wait_for_new_page, scroll_and_next
+from typing import List
+from crawl4ai import BFSDeepCrawlStrategy
+from crawl4ai.utils import normalize_url_for_deep_crawl
 # from crawl.utils import normalize_url
 
 
@@ -12,17 +13,72 @@ def normalize_url(url):
     path = parsed.path.rstrip("/")  # Remove trailing slash
     return f"{parsed.scheme}://{netloc}{path}/"  # Always end with a slash
 
-CustomConfig = CrawlerRunConfig(
-    # ... other settings ...
-    session_id="some_session",
-    js_code=scroll_and_next,
-    wait_for=wait_for_new_page,
-    js_only=True,
-    cache_mode=CacheMode.BYPASS,
-)
-
-class CustomPaginationConfig(CrawlerRunConfig):
-    pass
+class _DispatchingCrawler:
+    """Proxy for an AsyncWebCrawler that makes arun_many() use a given dispatcher by default."""
+
+    def __init__(self, crawler, dispatcher):
+        self._crawler = crawler
+        self._dispatcher = dispatcher
+
+    async def arun_many(self, urls, config=None, dispatcher=None, **kwargs):
+        return await self._crawler.arun_many(
+            urls, config=config, dispatcher=dispatcher or self._dispatcher, **kwargs
+        )
+
+    def __getattr__(self, name):
+        return getattr(self._crawler, name)
+
+
+class SeededBFSDeepCrawlStrategy(BFSDeepCrawlStrategy):
+    """
+    BFS strategy whose frontier is pre-seeded with extra URLs (e.g. from sitemaps).
+    Seeds join the first level discovered from the start page at depth 1, so they are
+    deduplicated against the links found there and then crawled and expanded like any
+    other page, honoring max_depth and the filter chain.
+    URLs in skip_urls (e.g. unchanged since the last crawl) are marked as visited and
+    never fetched. If a dispatcher is given, every BFS level is crawled through it
+    (e.g. to apply an AdaptiveRateLimiter).
+    """
+
+    def __init__(
+        self,
+        *args,
+        seed_urls: List[str] = None,
+        skip_urls: List[str] = None,
+        dispatcher=None,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.seed_urls = list(seed_urls or [])
+        self.skip_urls = list(skip_urls or [])
+        self.dispatcher = dispatcher
+
+    async def arun(self, start_url, crawler, config=None):
+        # BFS levels are fetched with crawler.arun_many(), route them through our dispatcher
+        if self.dispatcher is not None:
+            crawler = _DispatchingCrawler(crawler, self.dispatcher)
+        return await super().arun(start_url, crawler, config)
+
+    async def link_discovery(self, result, source_url, current_depth, visited, next_level, depths):
+        if self.skip_urls:
+            visited.update(normalize_url_for_deep_crawl(url, source_url) for url in self.skip_urls)
+            self.skip_urls = []
+        await super().link_discovery(result, source_url, current_depth, visited, next_level, depths)
+        if current_depth != 0 or not self.seed_urls or current_depth + 1 > self.max_depth:
+            return
+        seeds, self.seed_urls = self.seed_urls, []
+        added = 0
+        for url in seeds:
+            base_url = normalize_url_for_deep_crawl(url, source_url)
+            if base_url in visited or base_url in depths:
+                continue
+            if not await self.can_process_url(url, 1):
+                self.stats.urls_skipped += 1
+                continue
+            next_level.append((base_url, None))
+            depths[base_url] = 1
+            added += 1
+        self.logger.info(f"Added {added} seed URLs to the frontier")
 
 
 class CustomFilteredCrawlStrategy(BFSDeepCrawlStrategy):
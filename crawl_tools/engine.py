@@ -0,0 +1,621 @@
+import asyncio
+import json
+import os
+from collections import namedtuple
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+from crawl_tools.archive import ARCHIVE_DIRNAME, FetchArchive, replay_archive
+from crawl_tools.boilerplate import BOILERPLATE_FILENAME, BoilerplateDetector
+from crawl_tools.hooks import HookContext, periodic_json_update, result_hook
+from crawl_tools.link_graph import LinkGraph, link_graph_filename
+from crawl_tools.memory import ByteBudget, PageSizeLimit
+from crawl_tools.page_index import PAGE_INDEX_DIRNAME, PageIndex
+from crawl_tools.profiling import activity
+from crawl_tools.search import SEARCH_INDEX_FILENAME, SearchIndex
+from crawl_tools.storage import create_store
+from crawl_tools.utils import filter_queries, generate_json_filename, log_print
+
+BROWSER_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# A processed page: files is {ext: filename} of what was saved, error the failure message.
+CrawlOutput = namedtuple("CrawlOutput", ["url", "depth", "files", "error"])
+
+
+@dataclass
+class CrawlSettings:
+    """
+    Everything one crawl needs. Field names match the command line options of
+    main.py / crawl_with_sleep.py (see crawl_tools.cli). url is used as given: resolve
+    redirects first (crawl_tools.response_url) so the data folder matches the site.
+    """
+
+    url: str
+    max_depth: int = 2
+    ext: List[str] = field(default_factory=lambda: [".md"])
+    timeout: int = 300000
+    sleep_timer: float = 2.0
+    # only follow links under the start URL (URLPatternFilter on the desired base)
+    stay_within_base: bool = True
+    data_folder: str = "data"
+    debug_folder: str = "debug"
+    # URL mapping JSON (default: a timestamped file in debug_folder)
+    debug_file: Optional[str] = None
+    # page index directory (default: <site folder>/.index)
+    page_index_dir: Optional[str] = None
+    mapping_interval: float = 60
+    store: str = "files"
+    shard_size: int = 256
+    shard_compression: str = "gzip"
+    no_index: bool = False
+    robots: bool = False
+    sitemaps: bool = False
+    max_seed_urls: Optional[int] = None
+    adaptive: bool = False
+    max_host_concurrency: int = 4
+    max_retries: int = 0
+    paginate: bool = False
+    item_selector: Optional[str] = None
+    next_selector: Optional[str] = None
+    max_pages: int = 50
+    step_timeout: float = 10.0
+    pruning_threshold: float = 0.4
+    record: bool = False
+    archive: Optional[str] = None
+    strip_boilerplate: bool = False
+    boilerplate_threshold: float = 0.5
+    search_index: bool = False
+    link_graph: bool = False
+    max_page_bytes: Optional[int] = None
+    oversize: str = "truncate"
+    max_inflight_mb: Optional[float] = None
+    # pages fetched at once (the dispatcher's max_session_permit, default: Crawl4AI's)
+    concurrent_tasks: Optional[int] = None
+
+    @property
+    def desired_base(self) -> str:
+        return filter_queries(self.url)
+
+    @property
+    def site_folder(self) -> str:
+        """data/<host>/<path>, where the pages of this crawl are saved."""
+        parsed = urlparse(self.url)
+        return os.path.join(self.data_folder, parsed.netloc, parsed.path.replace("/", "%"))
+
+
+class _SharedOutputs:
+    """
+    Writers of one data folder. The store, page index, fetch archive, boilerplate state
+    and search index each assume a single writer, so crawls saving into the same
+    folder at the same time share them; they are closed when the last crawl ends.
+    The writers are set up from the first crawl's settings, a later crawl whose
+    settings for them differ is rejected with a ValueError.
+    """
+
+    def __init__(self, data_folder: str):
+        self.data_folder = data_folder
+        self.users = 0
+        self.settings: Optional[CrawlSettings] = None
+        self.store = None
+        self.page_index = None
+        self.archive = None
+        self.boilerplate = None
+        self.search_index = None
+
+    def _conflicts(self, settings: CrawlSettings, archive: bool) -> List[str]:
+        """Settings of a crawl joining the folder that differ from those its writers were set up with."""
+        first = self.settings
+        names = ["store", "shard_size", "shard_compression"]
+        if not settings.no_index and self.page_index is not None:
+            names.append("page_index_dir")
+        if archive and self.archive is not None:
+            names.append("archive")
+        if settings.strip_boilerplate and self.boilerplate is not None:
+            names.append("boilerplate_threshold")
+        conflicts = [
+            f"{name}={getattr(settings, name)!r} (shared: {getattr(first, name)!r})"
+            for name in names
+            if getattr(settings, name) != getattr(first, name)
+        ]
+        if sorted(settings.ext) != sorted(first.ext):
+            conflicts.append(f"ext={settings.ext!r} (shared: {first.ext!r})")
+        return conflicts
+
+    def open(self, settings: CrawlSettings, archive: bool = False):
+        if self.settings is None:
+            self.settings = settings
+        else:
+            conflicts = self._conflicts(settings, archive)
+            if conflicts:
+                raise ValueError(
+                    f"Crawl of {settings.url} conflicts with the running crawl saving into "
+                    f"'{self.data_folder}': {', '.join(conflicts)}"
+                )
+        os.makedirs(self.data_folder, exist_ok=True)
+        if self.store is None:
+            self.store = create_store(
+                settings.store, self.data_folder, settings.shard_size, settings.shard_compression
+            )
+        if not settings.no_index and self.page_index is None:
+            self.page_index = PageIndex(
+                settings.page_index_dir or os.path.join(self.data_folder, PAGE_INDEX_DIRNAME)
+            )
+        if archive and self.archive is None:
+            self.archive = FetchArchive(
+                settings.archive or os.path.join(self.data_folder, ARCHIVE_DIRNAME),
+                compression=settings.shard_compression,
+                shard_size=settings.shard_size * 1024 * 1024,
+            )
+        if settings.strip_boilerplate and self.boilerplate is None:
+            self.boilerplate = BoilerplateDetector(
+                threshold=settings.boilerplate_threshold,
+                path=os.path.join(self.data_folder, BOILERPLATE_FILENAME),
+            )
+        if settings.search_index and self.search_index is None:
+            self.search_index = SearchIndex(os.path.join(self.data_folder, SEARCH_INDEX_FILENAME))
+        self.users += 1
+
+    def close(self) -> bool:
+        """Release one user; returns True once everything has been closed."""
+        self.users -= 1
+        if self.users > 0:
+            return False
+        self.store.close()
+        if self.archive is not None:
+            self.archive.close()
+        if self.boilerplate is not None:
+            self.boilerplate.save()
+        if self.search_index is not None:
+            self.search_index.close()
+        if self.page_index is not None:
+            self.page_index.compact()
+            self.page_index.close()
+        return True
+
+
+class _Crawl:
+    """State of one crawl: its URL mapping and lock, outputs and the save hook."""
+
+    def __init__(self, engine: "CrawlEngine", settings: CrawlSettings):
+        self.engine = engine
+        self.settings = settings
+        self.desired_base = settings.desired_base
+        self.data_folder = settings.site_folder
+        os.makedirs(settings.debug_folder, exist_ok=True)
+        self.debug_file = settings.debug_file or os.path.join(
+            settings.debug_folder, generate_json_filename(self.desired_base, settings.max_depth)
+        )
+        self.url_to_filename: Dict = {}
+        self.json_lock = asyncio.Lock()
+        self.link_graph = LinkGraph() if settings.link_graph else None
+        self.size_limit = None
+        if settings.max_page_bytes:
+            self.size_limit = PageSizeLimit(settings.max_page_bytes, settings.oversize)
+        self.outputs: Optional[_SharedOutputs] = None
+        self._updater = None
+
+    def open(self, archive: bool = False):
+        self.outputs = self.engine._open_outputs(self.data_folder, self.settings, archive)
+        self._updater = asyncio.create_task(
+            periodic_json_update(
+                self.debug_file, self.json_lock, self.url_to_filename, self.settings.mapping_interval
+            )
+        )
+
+    async def close(self):
+        """Stop the periodic updater, write the final JSON mapping and close the outputs."""
+        if self._updater is not None:
+            self._updater.cancel()
+        async with self.json_lock:
+            with open(self.debug_file, "w", encoding="utf-8") as f:
+                json.dump(self.url_to_filename, f, indent=4)
+        if self.link_graph is not None:
+            self.link_graph.save(link_graph_filename(self.debug_file))
+        if self.outputs is not None:
+            self.engine._close_outputs(self.data_folder)
+        log_print(f"[DEBUG] Final URL mapping saved to '{self.debug_file}'")
+
+    def output(self, result) -> CrawlOutput:
+        value = self.url_to_filename.get(result.url)
+        depth = int((result.metadata or {}).get("depth", 0) or 0)
+        if isinstance(value, dict):
+            return CrawlOutput(result.url, depth, dict(value), None)
+        if isinstance(value, str) and value.startswith("[ERROR]"):
+            return CrawlOutput(result.url, depth, {}, value)
+        ext = self.settings.ext if isinstance(self.settings.ext, str) else self.settings.ext[0]
+        return CrawlOutput(result.url, depth, {ext: value} if value else {}, None)
+
+    def hook_context(self, sleep_timer, min_sleep=0, throttle=None, retry_queue=None) -> HookContext:
+        """The result_hook settings and outputs of this crawl (once open), with the given pacing."""
+        s = self.settings
+        return HookContext(
+            self.desired_base,
+            s.ext,
+            self.data_folder,
+            self.json_lock,
+            self.url_to_filename,
+            sleep_timer=sleep_timer,
+            min_sleep=min_sleep,
+            store=self.outputs.store,
+            index=None if s.no_index else self.outputs.page_index,
+            throttle=throttle,
+            retry_queue=retry_queue,
+            archive=self.outputs.archive if s.record else None,
+            boilerplate=self.outputs.boilerplate if s.strip_boilerplate else None,
+            search=self.outputs.search_index if s.search_index else None,
+            graph=self.link_graph,
+            size_limit=self.size_limit,
+        )
+
+    async def handle(self, result, emit, context: HookContext):
+        with activity(f"result_hook {result.url}"):
+            await result_hook(result, context)
+        await emit(self.output(result))
+
+    async def replay(self, emit, workers: Optional[int] = None):
+        s = self.settings
+        archive_dir = s.archive or os.path.join(self.data_folder, ARCHIVE_DIRNAME)
+        self.open()
+        try:
+            context = self.hook_context(0)
+            await replay_archive(
+                archive_dir,
+                lambda result: self.handle(result, emit, context),
+                pruning_threshold=s.pruning_threshold,
+                workers=workers,
+            )
+        finally:
+            await self.close()
+
+    def _run_config(self, deep_crawl_strategy=None):
+        from crawl4ai import CrawlerRunConfig, DefaultMarkdownGenerator, PruningContentFilter
+
+        s = self.settings
+        return CrawlerRunConfig(
+            deep_crawl_strategy=deep_crawl_strategy,
+            markdown_generator=DefaultMarkdownGenerator(
+                content_filter=PruningContentFilter(
+                    threshold=s.pruning_threshold, threshold_type="fixed"
+                ),
+            ),
+            verbose=True,
+            page_timeout=s.timeout,
+            wait_until="networkidle",
+            stream=True,
+            exclude_external_links=True,
+            exclude_social_media_links=True,
+        )
+
+    def _pacing(self, robots_rules):
+        """
+        (sleep_timer, min_sleep, throttle, dispatcher, retry_queue) of the hook calls:
+        adaptive per-host throttling replaces the fixed sleep in the hook, and a
+        robots.txt Crawl-delay bounds either from below. concurrent_tasks caps the
+        pages the dispatcher fetches at once.
+        """
+        from crawl4ai import MemoryAdaptiveDispatcher
+        from crawl_tools.throttle import RetryQueue
+
+        s = self.settings
+        sleep_timer = s.sleep_timer
+        min_sleep = (robots_rules.crawl_delay or 0) if s.robots else 0
+        throttle, dispatcher = None, None
+        dispatcher_options = {}
+        if s.concurrent_tasks:
+            dispatcher_options["max_session_permit"] = s.concurrent_tasks
+        if s.adaptive:
+            throttle = self.engine._rate_limiter(
+                initial_delay=sleep_timer / 2,
+                min_delay=min_sleep,
+                max_concurrency=s.max_host_concurrency,
+            )
+            dispatcher_options["rate_limiter"] = throttle
+            sleep_timer, min_sleep = 0, 0
+        if dispatcher_options:
+            dispatcher = MemoryAdaptiveDispatcher(**dispatcher_options)
+        retry_queue = RetryQueue(max_retries=s.max_retries) if s.max_retries > 0 else None
+        return sleep_timer, min_sleep, throttle, dispatcher, retry_queue
+
+    async def _drain_retries(self, crawler, config, handle_result, retry_queue, throttle):
+        if retry_queue is not None and len(retry_queue):
+            log_print(f"[INFO] Retrying {len(retry_queue)} transiently failed URLs...")
+            await retry_queue.drain(
+                crawler,
+                config.clone(deep_crawl_strategy=None, stream=False),
+                handle_result,
+                limiter=throttle,
+            )
+
+    async def run(self, emit):
+        from crawl4ai import FilterChain, URLPatternFilter
+        from crawl_tools.custom import SeededBFSDeepCrawlStrategy
+        from crawl_tools.pagination import Paginator
+        from crawl_tools.seeding import RobotsFilter, RobotsRules, seed_urls
+
+        s = self.settings
+        url = s.url
+        log_print(f"[DEBUG] Starting crawl of {url}")
+        log_print(f"[DEBUG] Fitlered base URL set to: {self.desired_base}")
+        self.open(archive=s.record)
+        try:
+            fetch_cache = self.engine.fetch_cache
+            # Optional robots.txt / sitemap seeding stage; the fetches block, so they run
+            # in a thread rather than stall the other crawls sharing the loop
+            robots_rules = None
+            if s.robots or s.sitemaps:
+                robots_rules = await asyncio.to_thread(RobotsRules, url, cache=fetch_cache)
+            url_filters = []
+            if s.stay_within_base:
+                # Generate a custom filter for URLs: only stay within the specified base
+                url_filters.append(URLPatternFilter(patterns=[f"{self.desired_base}*"]))
+            if s.robots:
+                url_filters.append(RobotsFilter(robots_rules))
+            seeds, unchanged = [], []
+            if s.sitemaps:
+                seeds, unchanged = await asyncio.to_thread(
+                    seed_urls,
+                    url,
+                    self.desired_base,
+                    rules=robots_rules if s.robots else None,
+                    page_index=None if s.no_index else self.outputs.page_index,
+                    max_urls=s.max_seed_urls,
+                    cache=fetch_cache,
+                )
+            sleep_timer, min_sleep, throttle, dispatcher, retry_queue = self._pacing(robots_rules)
+            paginator = None
+            if s.paginate:
+                paginator = Paginator(
+                    s.item_selector,
+                    next_selector=s.next_selector,
+                    max_pages=s.max_pages,
+                    step_timeout=s.step_timeout,
+                )
+
+            crawler_config = self._run_config(
+                SeededBFSDeepCrawlStrategy(
+                    max_depth=None if s.max_depth == -1 else s.max_depth,
+                    filter_chain=FilterChain(url_filters),
+                    include_external=False,
+                    seed_urls=[entry.url for entry in seeds],
+                    skip_urls=unchanged,
+                    dispatcher=dispatcher,
+                )
+            )
+
+            crawler = await self.engine._browser()
+            log_print(
+                f"[DEBUG] Starting crawl with depth {s.max_depth} and sleep timer of {s.sleep_timer}s between hook calls..."
+            )
+
+            context = self.hook_context(sleep_timer, min_sleep, throttle, retry_queue)
+
+            async def handle_result(result):
+                await self.handle(result, emit, context)
+
+            if paginator is not None:
+                async for result in paginator.paginate(crawler, url, crawler_config):
+                    await handle_result(result)
+                # items found while paging join the sitemap seeds at depth 1
+                crawler_config.deep_crawl_strategy.seed_urls.extend(
+                    paginator.seed_links(self.desired_base)
+                )
+
+            budget = None
+            if s.max_inflight_mb:
+                budget = self.engine._byte_budget(int(s.max_inflight_mb * 1024 * 1024))
+            # hooks of this crawl still running (the budget is shared with other crawls)
+            hooks, failed = set(), []
+
+            def hook_done(task):
+                hooks.discard(task)
+                if not task.cancelled() and task.exception() is not None:
+                    failed.append(task)
+
+            try:
+                async for result in await crawler.arun(url, config=crawler_config):
+                    if budget is None:
+                        await handle_result(result)
+                        continue
+                    task = await budget.spawn(result, handle_result(result))
+                    hooks.add(task)
+                    task.add_done_callback(hook_done)
+                    if failed:
+                        break
+                if hooks:
+                    await asyncio.wait(list(hooks))
+            finally:
+                for task in list(hooks):
+                    task.cancel()
+            if budget is not None:
+                log_print(f"[DEBUG] Peak in-flight result bytes: {budget.peak}")
+            if failed:
+                # a failing hook aborts the crawl, as it does when hooks are awaited in line
+                failed[0].result()
+
+            await self._drain_retries(crawler, crawler_config, handle_result, retry_queue, throttle)
+        finally:
+            await self.close()
+
+    async def run_frontier(self, emit, frontier, worker_index: int, num_workers: int, **worker_options):
+        """Crawl as worker worker_index of num_workers over a shared frontier (see crawl_tools.frontier)."""
+        from crawl_tools.frontier import FrontierWorker
+        from crawl_tools.seeding import RobotsRules
+
+        s = self.settings
+        self.open(archive=s.record)
+        try:
+            robots_rules = None
+            if s.robots:
+                robots_rules = await asyncio.to_thread(RobotsRules, s.url, cache=self.engine.fetch_cache)
+            sleep_timer, min_sleep, throttle, dispatcher, retry_queue = self._pacing(robots_rules)
+            worker = FrontierWorker(
+                frontier,
+                worker_index,
+                num_workers,
+                self.desired_base,
+                max_depth=None if s.max_depth == -1 else s.max_depth,
+                url_filter=robots_rules.can_fetch if robots_rules else None,
+                **worker_options,
+            )
+            # every worker seeds the start URL too; the frontier ignores duplicates
+            frontier.add([(s.url, 0)])
+            crawler = await self.engine._browser()
+            crawler_config = self._run_config()
+            log_print(
+                f"[DEBUG] {worker.worker} of {num_workers} starting with depth {s.max_depth}..."
+            )
+
+            context = self.hook_context(sleep_timer, min_sleep, throttle, retry_queue)
+
+            async def handle_result(result):
+                await self.handle(result, emit, context)
+
+            await worker.run(crawler, crawler_config, handle_result, dispatcher=dispatcher)
+            await self._drain_retries(crawler, crawler_config, handle_result, retry_queue, throttle)
+        finally:
+            await self.close()
+
+
+class CrawlEngine:
+    """
+    Runs crawls in-process without global state.
+
+    Each crawl gets its own URL mapping, lock and debug files; resources are shared
+    by all the crawls of an engine: one browser (started on the first crawl), the
+    optional FetchCache, the per-host AdaptiveRateLimiter of adaptive crawls with the
+    same pacing settings, the in-flight byte budget of max_inflight_mb crawls (so it
+    bounds all of them together) and the writers of each data folder (set up from the
+    first crawl saving there; a concurrent crawl with different store, index, archive,
+    boilerplate or ext settings for the same folder raises ValueError).
+    crawl() and replay() run the crawl as a task feeding a queue of up to queue_size
+    outputs; closing the iterator early (e.g. contextlib.aclosing) cancels it.
+
+        async with CrawlEngine() as engine:
+            async for page in engine.crawl(CrawlSettings(url="https://example.com/docs/")):
+                print(page.url, page.files)
+            await asyncio.gather(engine.run(settings_a), engine.run(settings_b))
+    """
+
+    def __init__(self, browser_config=None, fetch_cache=None, queue_size: int = 100):
+        self.browser_config = browser_config
+        self.fetch_cache = fetch_cache
+        self.queue_size = queue_size
+        self.crawler = None
+        self.throttles = {}  # sorted kwargs -> AdaptiveRateLimiter
+        self.budget: Optional[ByteBudget] = None
+        self._browser_lock = asyncio.Lock()
+        self._outputs: Dict[str, _SharedOutputs] = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def _browser(self):
+        async with self._browser_lock:
+            if self.crawler is None:
+                from crawl4ai import AsyncWebCrawler, BrowserConfig
+
+                config = self.browser_config or BrowserConfig(
+                    headless=True, text_mode=True, user_agent=BROWSER_USER_AGENT
+                )
+                crawler = AsyncWebCrawler(config=config)
+                await crawler.start()
+                if self.fetch_cache is not None:
+                    self.fetch_cache.install(crawler)
+                self.crawler = crawler
+        return self.crawler
+
+    def _rate_limiter(self, **kwargs):
+        """The rate limiter shared by the adaptive crawls configured with the same kwargs."""
+        key = tuple(sorted(kwargs.items()))
+        if key not in self.throttles:
+            from crawl_tools.throttle import AdaptiveRateLimiter
+
+            self.throttles[key] = AdaptiveRateLimiter(**kwargs)
+        return self.throttles[key]
+
+    def _byte_budget(self, max_bytes: int) -> ByteBudget:
+        """The in-flight byte budget shared by every crawl of the engine."""
+        if self.budget is None:
+            self.budget = ByteBudget(max_bytes)
+        elif self.budget.max_bytes != max_bytes:
+            raise ValueError(
+                f"max_inflight_mb differs from the engine's shared budget of {self.budget.max_bytes} bytes"
+            )
+        return self.budget
+
+    def _open_outputs(self, data_folder: str, settings: CrawlSettings, archive: bool) -> _SharedOutputs:
+        outputs = self._outputs.get(data_folder)
+        if outputs is None:
+            outputs = self._outputs[data_folder] = _SharedOutputs(data_folder)
+        outputs.open(settings, archive)
+        return outputs
+
+    def _close_outputs(self, data_folder: str):
+        if self._outputs[data_folder].close():
+            del self._outputs[data_folder]
+
+    async def _iterate(self, produce: Callable[[Callable], Awaitable[None]]) -> AsyncIterator[CrawlOutput]:
+        """Yield what produce(emit) emits; the crawl waits while queue_size outputs are unread."""
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        done = object()
+
+        async def run():
+            try:
+                await produce(queue.put)
+            except asyncio.CancelledError:
+                # the consumer closed the iterator: nobody reads the (possibly full) queue
+                raise
+            except BaseException:
+                await queue.put(done)
+                raise
+            await queue.put(done)
+
+        task = asyncio.create_task(run())
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                yield item
+            await task  # re-raise a failed crawl
+        finally:
+            if not task.done():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
+    def crawl(self, settings: CrawlSettings) -> AsyncIterator[CrawlOutput]:
+        """Crawl settings.url and yield a CrawlOutput per processed page."""
+        return self._iterate(_Crawl(self, settings).run)
+
+    def crawl_frontier(
+        self, settings: CrawlSettings, frontier, worker_index: int = 0, num_workers: int = 1, **worker_options
+    ) -> AsyncIterator[CrawlOutput]:
+        """
+        Crawl as one worker of a shared frontier (see crawl_tools.frontier), starting
+        from settings.url; worker_options are passed on to FrontierWorker.
+        """
+        crawl = _Crawl(self, settings)
+        return self._iterate(
+            lambda emit: crawl.run_frontier(emit, frontier, worker_index, num_workers, **worker_options)
+        )
+
+    def replay(self, settings: CrawlSettings, workers: Optional[int] = None) -> AsyncIterator[CrawlOutput]:
+        """Re-convert the fetch archive of settings' data folder, without browser or network."""
+        crawl = _Crawl(self, settings)
+        return self._iterate(lambda emit: crawl.replay(emit, workers))
+
+    async def run(self, settings: CrawlSettings) -> Dict:
+        """Run a whole crawl and return its URL mapping."""
+        mapping = {}
+        async for page in self.crawl(settings):
+            mapping[page.url] = page.error or page.files
+        return mapping
+
+    async def close(self):
+        if self.crawler is not None:
+            await self.crawler.close()
+            self.crawler = None
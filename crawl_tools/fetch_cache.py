@@ -0,0 +1,355 @@
+import asyncio
+import gzip
+import hashlib
+import io
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from email.utils import parsedate_to_datetime
+from typing import BinaryIO, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from crawl_tools.utils import header_value, log_print
+
+# Default location, shared by every crawl launched from the repository root.
+FETCH_CACHE_DIR = os.path.join("data", ".fetch_cache")
+
+DEFAULT_PORTS = {"http": "80", "https": "443"}
+# Seconds within which a hit does not refresh an entry's access time: LRU order only
+# needs to be coarse, and skipping the write keeps cache hits read-only.
+ACCESS_GRANULARITY = 300
+CHUNK_SIZE = 1 << 20
+
+CacheEntry = namedtuple(
+    "CacheEntry", ["url", "path", "size", "status_code", "headers", "redirected_url", "expires"]
+)
+
+
+def canonical_url(url: str) -> str:
+    """
+    Cache key of a URL: lowercase scheme and host, no default port, no fragment,
+    query parameters sorted, "/" for an empty path.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port is not None and str(parts.port) != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    if parts.username:
+        host = f"{parts.username}{':' + parts.password if parts.password else ''}@{host}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or "/", query, ""))
+
+
+def freshness_lifetime(headers: Optional[dict], default_ttl: float) -> Optional[float]:
+    """
+    Seconds a response may be served from the cache, from Cache-Control (s-maxage,
+    max-age), Expires and Age; default_ttl when the response says nothing.
+    None when it must not be cached (no-store, no-cache, or already stale).
+    """
+    directives = {}
+    for part in (header_value(headers, "cache-control") or "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip().strip('"')
+    if "no-store" in directives or "no-cache" in directives:
+        return None
+    lifetime = None
+    for name in ("s-maxage", "max-age"):
+        if directives.get(name, "").isdigit():
+            lifetime = float(directives[name])
+            break
+    if lifetime is None and header_value(headers, "expires"):
+        try:
+            expires = parsedate_to_datetime(header_value(headers, "expires")).timestamp()
+            date = header_value(headers, "date")
+            now = parsedate_to_datetime(date).timestamp() if date else time.time()
+            lifetime = expires - now
+        except (TypeError, ValueError):
+            lifetime = 0.0  # invalid Expires means already expired
+    if lifetime is None:
+        return default_ttl
+    age = header_value(headers, "age")
+    if age and age.strip().isdigit():
+        lifetime -= float(age)
+    return lifetime if lifetime > 0 else None
+
+
+class FetchCache:
+    """
+    On-disk HTTP fetch cache shared by runs and processes.
+
+    Response bodies are gzipped blob files under blobs/, named after the hash of the
+    canonical URL; a SQLite database in WAL mode keeps, per URL, the response status,
+    headers, expiry time, size and last access. Blobs are written to a temporary file
+    and renamed into place before their row is committed, so readers in other
+    processes see either the old or the new response, never a partial one. Once the
+    blobs exceed max_bytes the least recently used entries are evicted down to 90%;
+    the total size is kept in a meta row updated with every write, so checking it is
+    O(1). Access times are only rewritten when ACCESS_GRANULARITY seconds old, so most
+    hits do not write. Only 2xx responses that Cache-Control allows are stored.
+
+    Methods are blocking (SQLite and gzip); a lock lets them be called from worker
+    threads, as CachedCrawlerStrategy does to keep them off the event loop.
+    """
+
+    def __init__(self, path: str = FETCH_CACHE_DIR, max_bytes: int = 2 << 30, default_ttl: float = 86400):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.blob_dir = os.path.join(path, "blobs")
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self._lock = threading.RLock()
+        self.db = sqlite3.connect(
+            os.path.join(path, "cache.db"), timeout=60, isolation_level=None, check_same_thread=False
+        )
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                blob TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                status_code INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                redirected_url TEXT,
+                stored REAL NOT NULL,
+                expires REAL NOT NULL,
+                accessed REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS entries_lru ON entries (accessed);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+            """
+        )
+        # caches created before the meta row get their total computed once
+        self.db.execute(
+            "INSERT OR IGNORE INTO meta SELECT 'total_bytes', COALESCE(SUM(size), 0) FROM entries"
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def _blob_name(self, key: str) -> str:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+        return os.path.join(digest[:2], digest + ".gz")
+
+    def lookup(self, url: str) -> Optional[CacheEntry]:
+        """The fresh cached response for url, or None."""
+        key = canonical_url(url)
+        now = time.time()
+        with self._lock:
+            row = self.db.execute(
+                "SELECT url, blob, size, status_code, headers, redirected_url, expires, accessed "
+                "FROM entries WHERE key = ? AND expires > ?",
+                (key, now),
+            ).fetchone()
+            if row is None or not os.path.exists(os.path.join(self.blob_dir, row[1])):
+                self.misses += 1
+                return None
+            if now - row[7] > ACCESS_GRANULARITY:
+                self.db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return CacheEntry(
+            row[0], os.path.join(self.blob_dir, row[1]), row[2], row[3], json.loads(row[4]), row[5], row[6]
+        )
+
+    def open(self, entry: CacheEntry) -> BinaryIO:
+        """The cached body as a binary file object (raises OSError if it was evicted meanwhile)."""
+        return gzip.open(entry.path, "rb")
+
+    def read(self, entry: CacheEntry) -> Optional[bytes]:
+        try:
+            with self.open(entry) as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def store(
+        self,
+        url: str,
+        body: bytes,
+        status_code: int = 200,
+        headers: Optional[Dict[str, str]] = None,
+        redirected_url: Optional[str] = None,
+    ) -> bool:
+        """Cache a response body if its status and Cache-Control allow it; returns True if stored."""
+        return self.store_stream(url, io.BytesIO(body), status_code, headers, redirected_url)
+
+    def store_stream(
+        self,
+        url: str,
+        stream: BinaryIO,
+        status_code: int = 200,
+        headers: Optional[Dict[str, str]] = None,
+        redirected_url: Optional[str] = None,
+    ) -> bool:
+        """Like store(), copying the body from a file object in chunks (e.g. a large sitemap)."""
+        if not 200 <= (status_code or 0) < 300:
+            return False
+        lifetime = freshness_lifetime(headers, self.default_ttl)
+        if lifetime is None:
+            return False
+        key = canonical_url(url)
+        blob = self._blob_name(key)
+        blob_path = os.path.join(self.blob_dir, blob)
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(blob_path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) as f:
+                shutil.copyfileobj(stream, f, CHUNK_SIZE)
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, blob_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        now = time.time()
+        with self._lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                previous = self.db.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+                self.db.execute(
+                    "INSERT OR REPLACE INTO entries "
+                    "(key, url, blob, size, status_code, headers, redirected_url, stored, expires, accessed) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        key, url, blob, size, status_code, json.dumps(dict(headers or {})),
+                        redirected_url, now, now + lifetime, now,
+                    ),
+                )
+                self.db.execute(
+                    "UPDATE meta SET value = value + ? WHERE key = 'total_bytes'",
+                    (size - (previous[0] if previous else 0),),
+                )
+                self.db.execute("COMMIT")
+            except Exception:
+                self.db.execute("ROLLBACK")
+                raise
+            if self.total_bytes() > self.max_bytes:
+                self.evict()
+        return True
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            (total,) = self.db.execute("SELECT value FROM meta WHERE key = 'total_bytes'").fetchone()
+        return total
+
+    def evict(self):
+        """Remove expired entries and the least recently used ones while over max_bytes."""
+        with self._lock:
+            self._evict()
+
+    def _evict(self):
+        target = int(self.max_bytes * 0.9)
+        removed = []
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            # read inside the transaction: another process may have evicted already
+            (total,) = self.db.execute("SELECT value FROM meta WHERE key = 'total_bytes'").fetchone()
+            if total <= self.max_bytes:
+                self.db.execute("COMMIT")
+                return
+            now = time.time()
+            # expired entries first, then by last access
+            for key, blob, size in self.db.execute(
+                "SELECT key, blob, size FROM entries ORDER BY expires > ?, accessed", (now,)
+            ):
+                if total <= target:
+                    break
+                removed.append((key, blob))
+                total -= size
+            self.db.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key, _ in removed])
+            self.db.execute("UPDATE meta SET value = ? WHERE key = 'total_bytes'", (total,))
+            self.db.execute("COMMIT")
+        except Exception:
+            self.db.execute("ROLLBACK")
+            raise
+        for _, blob in removed:
+            # another process may have rewritten the same key after our delete
+            if self.db.execute("SELECT 1 FROM entries WHERE blob = ?", (blob,)).fetchone() is None:
+                try:
+                    os.remove(os.path.join(self.blob_dir, blob))
+                except FileNotFoundError:
+                    pass
+        log_print(f"[DEBUG] Evicted {len(removed)} entries from the fetch cache ({total} bytes left)")
+
+    def install(self, crawler):
+        """Serve the page fetches of a started AsyncWebCrawler from this cache."""
+        if not isinstance(crawler.crawler_strategy, CachedCrawlerStrategy):
+            crawler.crawler_strategy = CachedCrawlerStrategy(crawler.crawler_strategy, self)
+        return crawler
+
+    def close(self):
+        log_print(
+            f"[INFO] Fetch cache: {self.hits} hits, {self.misses} misses, "
+            f"{self.total_bytes()} bytes in '{self.path}'"
+        )
+        with self._lock:
+            self.db.close()
+
+
+class CachedCrawlerStrategy:
+    """
+    Wraps the crawler strategy of an AsyncWebCrawler so that page fetches are served
+    from a FetchCache when fresh, and successful fetches are stored in it. Session
+    steps (e.g. pagination), JS interactions and screenshots / PDFs go straight to
+    the browser. Everything else is delegated to the wrapped strategy.
+    """
+
+    def __init__(self, strategy, cache: FetchCache):
+        self.strategy = strategy
+        self.cache = cache
+
+    def __getattr__(self, name):
+        return getattr(self.strategy, name)
+
+    async def __aenter__(self):
+        await self.strategy.__aenter__()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.strategy.__aexit__(exc_type, exc_val, exc_tb)
+
+    def _cacheable(self, url: str, config) -> bool:
+        if not url.startswith(("http://", "https://")):
+            return False
+        return config is None or not (
+            config.session_id or config.js_code or config.js_only or config.screenshot or config.pdf
+        )
+
+    def _cached(self, url: str):
+        entry = self.cache.lookup(url)
+        return entry, self.cache.read(entry) if entry is not None else None
+
+    async def crawl(self, url: str, config=None, **kwargs):
+        from crawl4ai.models import AsyncCrawlResponse
+
+        if not self._cacheable(url, config):
+            return await self.strategy.crawl(url, config=config, **kwargs)
+        # SQLite and gzip block, keep them off the event loop
+        entry, body = await asyncio.to_thread(self._cached, url)
+        if body is not None:
+            log_print(f"[DEBUG] Fetch cache hit for {url}")
+            return AsyncCrawlResponse(
+                html=body.decode("utf-8"),
+                response_headers={**entry.headers, "x-crawl-cache": "HIT"},
+                status_code=entry.status_code,
+                redirected_url=entry.redirected_url,
+            )
+        response = await self.strategy.crawl(url, config=config, **kwargs)
+        if response.html:
+            await asyncio.to_thread(
+                self.cache.store,
+                url,
+                response.html.encode("utf-8"),
+                response.status_code,
+                response.response_headers,
+                response.redirected_url,
+            )
+        return response
@@ -0,0 +1,540 @@
+import asyncio
+import json
+import os
+import sqlite3
+import time
+import zlib
+from collections import namedtuple
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple, TYPE_CHECKING
+from urllib.parse import urlparse
+
+from crawl_tools.utils import log_print, normalize_url
+
+if TYPE_CHECKING:
+    from crawl4ai import CrawlResult
+
+FrontierItem = namedtuple("FrontierItem", ["url", "depth", "partition"])
+
+DEFAULT_PARTITIONS = 64
+# claims of a URL (its worker crashed or stalled each time) before it is marked failed
+DEFAULT_MAX_ATTEMPTS = 3
+
+
+def url_partition(url: str, num_partitions: int) -> int:
+    """
+    Stable partition of a URL by hash of the whole normalized URL, so the pages of a
+    single site are spread over all workers. Per-host politeness is left to each
+    worker's sleep / rate limiter.
+    """
+    key = normalize_url(url)
+    query = urlparse(url).query
+    if query:
+        key += "?" + query
+    return zlib.crc32(key.encode("utf-8")) % num_partitions
+
+
+def owned_partitions(worker_index: int, num_workers: int, num_partitions: int) -> List[int]:
+    return [p for p in range(num_partitions) if p % num_workers == worker_index]
+
+
+class SQLiteFrontier:
+    """
+    Shared frontier in a SQLite database, for workers on a single host.
+    WAL mode and IMMEDIATE transactions make claims atomic across processes.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        num_partitions: int = DEFAULT_PARTITIONS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_attempts = max_attempts
+        self.db = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS frontier (
+                url TEXT PRIMARY KEY,
+                depth INTEGER NOT NULL,
+                partition INTEGER NOT NULL,
+                state TEXT NOT NULL DEFAULT 'pending',
+                worker TEXT,
+                lease_until REAL,
+                attempts INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS frontier_claim ON frontier (state, partition);
+            CREATE TABLE IF NOT EXISTS workers (worker TEXT PRIMARY KEY, heartbeat REAL);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            """
+        )
+        self.db.execute(
+            "INSERT OR IGNORE INTO meta VALUES ('num_partitions', ?)", (str(num_partitions),)
+        )
+        (value,) = self.db.execute("SELECT value FROM meta WHERE key = 'num_partitions'").fetchone()
+        self.num_partitions = int(value)
+
+    def add(self, items: Iterable[Tuple[str, int]]) -> int:
+        """Add (url, depth) pairs; URLs already known to the frontier are ignored. Returns the number added."""
+        rows = [(url, depth, url_partition(url, self.num_partitions)) for url, depth in items]
+        if not rows:
+            return 0
+        self.db.execute("BEGIN IMMEDIATE")
+        before = self.db.total_changes
+        self.db.executemany(
+            "INSERT OR IGNORE INTO frontier (url, depth, partition) VALUES (?, ?, ?)", rows
+        )
+        added = self.db.total_changes - before
+        self.db.execute("COMMIT")
+        return added
+
+    def claim(self, worker: str, partitions: List[int], limit: int, lease_seconds: float) -> List[FrontierItem]:
+        if not partitions:
+            return []
+        marks = ",".join("?" * len(partitions))
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            rows = self.db.execute(
+                f"SELECT url, depth, partition FROM frontier "
+                f"WHERE state = 'pending' AND partition IN ({marks}) ORDER BY depth LIMIT ?",
+                (*partitions, limit),
+            ).fetchall()
+            self.db.executemany(
+                "UPDATE frontier SET state = 'leased', worker = ?, lease_until = ?, "
+                "attempts = attempts + 1 WHERE url = ?",
+                [(worker, time.time() + lease_seconds, url) for url, _, _ in rows],
+            )
+            self.db.execute("COMMIT")
+        except Exception:
+            self.db.execute("ROLLBACK")
+            raise
+        return [FrontierItem(*row) for row in rows]
+
+    def complete(self, url: str, worker: str, success: bool = True) -> bool:
+        """Mark a URL done or failed; False (and no change) if worker no longer holds its lease."""
+        cursor = self.db.execute(
+            "UPDATE frontier SET state = ?, lease_until = NULL "
+            "WHERE url = ? AND state = 'leased' AND worker = ?",
+            ("done" if success else "failed", url, worker),
+        )
+        return cursor.rowcount > 0
+
+    def renew(self, worker: str, urls: List[str], lease_seconds: float) -> int:
+        """Extend the leases worker still holds on urls; returns the number renewed."""
+        if not urls:
+            return 0
+        marks = ",".join("?" * len(urls))
+        return self.db.execute(
+            f"UPDATE frontier SET lease_until = ? "
+            f"WHERE state = 'leased' AND worker = ? AND url IN ({marks})",
+            (time.time() + lease_seconds, worker, *urls),
+        ).rowcount
+
+    def reclaim_expired(self) -> int:
+        """
+        Return URLs whose lease ran out (their worker died or stalled) to the pending
+        state, or mark them failed once they have been claimed max_attempts times.
+        """
+        now = time.time()
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            failed = self.db.execute(
+                "UPDATE frontier SET state = 'failed', worker = NULL, lease_until = NULL "
+                "WHERE state = 'leased' AND lease_until < ? AND attempts >= ?",
+                (now, self.max_attempts),
+            ).rowcount
+            reclaimed = self.db.execute(
+                "UPDATE frontier SET state = 'pending', worker = NULL, lease_until = NULL "
+                "WHERE state = 'leased' AND lease_until < ?",
+                (now,),
+            ).rowcount
+            self.db.execute("COMMIT")
+        except Exception:
+            self.db.execute("ROLLBACK")
+            raise
+        if failed:
+            log_print(f"[WARNING] Gave up on {failed} URLs whose lease expired {self.max_attempts} times")
+        return reclaimed
+
+    def heartbeat(self, worker: str):
+        self.db.execute("INSERT OR REPLACE INTO workers VALUES (?, ?)", (worker, time.time()))
+
+    def workers(self) -> Dict[str, float]:
+        return dict(self.db.execute("SELECT worker, heartbeat FROM workers").fetchall())
+
+    def counts(self) -> Dict[str, int]:
+        return dict(self.db.execute("SELECT state, COUNT(*) FROM frontier GROUP BY state").fetchall())
+
+    def pending_partitions(self) -> List[int]:
+        return [
+            row[0] for row in
+            self.db.execute("SELECT DISTINCT partition FROM frontier WHERE state = 'pending'")
+        ]
+
+    def close(self):
+        self.db.close()
+
+
+# KEYS: pending list, leased, leases, owners, attempts, counts; ARGV: worker, lease expiry, limit
+_CLAIM_SCRIPT = """
+local claimed = {}
+for _ = 1, tonumber(ARGV[3]) do
+    local raw = redis.call('LPOP', KEYS[1])
+    if not raw then break end
+    local url = cjson.decode(raw)['url']
+    redis.call('HSET', KEYS[2], url, raw)
+    redis.call('ZADD', KEYS[3], ARGV[2], url)
+    redis.call('HSET', KEYS[4], url, ARGV[1])
+    redis.call('HINCRBY', KEYS[5], url, 1)
+    claimed[#claimed + 1] = raw
+end
+if #claimed > 0 then
+    redis.call('HINCRBY', KEYS[6], 'pending', -#claimed)
+    redis.call('HINCRBY', KEYS[6], 'leased', #claimed)
+end
+return claimed
+"""
+
+# KEYS: owners, leases, leased, counts; ARGV: url, worker, final state
+_COMPLETE_SCRIPT = """
+if redis.call('HGET', KEYS[1], ARGV[1]) ~= ARGV[2] then return 0 end
+if redis.call('ZREM', KEYS[2], ARGV[1]) == 0 then return 0 end
+redis.call('HDEL', KEYS[1], ARGV[1])
+redis.call('HDEL', KEYS[3], ARGV[1])
+redis.call('HINCRBY', KEYS[4], 'leased', -1)
+redis.call('HINCRBY', KEYS[4], ARGV[3], 1)
+return 1
+"""
+
+# KEYS: owners, leases; ARGV: worker, lease expiry, urls...
+_RENEW_SCRIPT = """
+local renewed = 0
+for i = 3, #ARGV do
+    if redis.call('HGET', KEYS[1], ARGV[i]) == ARGV[1] then
+        renewed = renewed + redis.call('ZADD', KEYS[2], 'XX', 'CH', ARGV[2], ARGV[i])
+    end
+end
+return renewed
+"""
+
+# KEYS: leases, leased, owners, attempts, counts, pending list; ARGV: url, max attempts
+# returns 1 if requeued, -1 if marked failed, 0 if another worker got there first
+_RECLAIM_SCRIPT = """
+if redis.call('ZREM', KEYS[1], ARGV[1]) == 0 then return 0 end
+local raw = redis.call('HGET', KEYS[2], ARGV[1])
+redis.call('HDEL', KEYS[2], ARGV[1])
+redis.call('HDEL', KEYS[3], ARGV[1])
+redis.call('HINCRBY', KEYS[5], 'leased', -1)
+if not raw then return 0 end
+if tonumber(redis.call('HGET', KEYS[4], ARGV[1]) or '0') >= tonumber(ARGV[2]) then
+    redis.call('HINCRBY', KEYS[5], 'failed', 1)
+    return -1
+end
+redis.call('RPUSH', KEYS[6], raw)
+redis.call('HINCRBY', KEYS[5], 'pending', 1)
+return 1
+"""
+
+
+class RedisFrontier:
+    """
+    Shared frontier in a Redis-compatible store, for workers on several machines.
+    Any client exposing the redis-py API can be passed in (e.g. a local stand-in such
+    as fakeredis for testing); otherwise one is created from redis_url.
+
+    Keys under prefix: seen (set of all URLs), pending:<partition> (lists of JSON
+    items), leases (sorted set url -> lease expiry), leased (hash url -> item),
+    owners (hash url -> leasing worker), attempts (hash url -> claims), workers
+    (hash worker -> heartbeat), counts (hash state -> count). Claims, completions and
+    reclaims are Lua scripts, so a crash between their steps cannot lose a URL.
+    """
+
+    def __init__(
+        self,
+        redis_url: str = None,
+        client=None,
+        prefix: str = "crawley",
+        num_partitions: int = DEFAULT_PARTITIONS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise ImportError(
+                    "The redis frontier backend requires the 'redis' package (pip install redis)"
+                ) from e
+            client = redis.Redis.from_url(redis_url)
+        self.client = client
+        self.prefix = prefix
+        self.max_attempts = max_attempts
+        self._claim = client.register_script(_CLAIM_SCRIPT)
+        self._complete = client.register_script(_COMPLETE_SCRIPT)
+        self._reclaim = client.register_script(_RECLAIM_SCRIPT)
+        self._renew = client.register_script(_RENEW_SCRIPT)
+        self.client.hsetnx(self._key("meta"), "num_partitions", num_partitions)
+        self.num_partitions = int(self.client.hget(self._key("meta"), "num_partitions"))
+
+    def _key(self, *parts) -> str:
+        return ":".join((self.prefix,) + tuple(str(p) for p in parts))
+
+    def add(self, items: Iterable[Tuple[str, int]]) -> int:
+        added = 0
+        for url, depth in items:
+            if self.client.sadd(self._key("seen"), url):
+                partition = url_partition(url, self.num_partitions)
+                self.client.rpush(
+                    self._key("pending", partition),
+                    json.dumps({"url": url, "depth": depth, "partition": partition}),
+                )
+                added += 1
+        if added:
+            self.client.hincrby(self._key("counts"), "pending", added)
+        return added
+
+    def claim(self, worker: str, partitions: List[int], limit: int, lease_seconds: float) -> List[FrontierItem]:
+        items = []
+        lease_until = time.time() + lease_seconds
+        for partition in partitions:
+            claimed = self._claim(
+                keys=[
+                    self._key("pending", partition), self._key("leased"), self._key("leases"),
+                    self._key("owners"), self._key("attempts"), self._key("counts"),
+                ],
+                args=[worker, lease_until, limit - len(items)],
+            )
+            for raw in claimed:
+                entry = json.loads(raw)
+                items.append(FrontierItem(entry["url"], entry["depth"], entry["partition"]))
+            if len(items) >= limit:
+                break
+        return items
+
+    def complete(self, url: str, worker: str, success: bool = True) -> bool:
+        """Mark a URL done or failed; False (and no change) if worker no longer holds its lease."""
+        return bool(
+            self._complete(
+                keys=[self._key("owners"), self._key("leases"), self._key("leased"), self._key("counts")],
+                args=[url, worker, "done" if success else "failed"],
+            )
+        )
+
+    def renew(self, worker: str, urls: List[str], lease_seconds: float) -> int:
+        """Extend the leases worker still holds on urls; returns the number renewed."""
+        if not urls:
+            return 0
+        return self._renew(
+            keys=[self._key("owners"), self._key("leases")],
+            args=[worker, time.time() + lease_seconds, *urls],
+        )
+
+    def reclaim_expired(self) -> int:
+        reclaimed, failed = 0, 0
+        for url in self.client.zrangebyscore(self._key("leases"), "-inf", time.time()):
+            url = url.decode() if isinstance(url, bytes) else url
+            # the script removes the lease first: only one worker requeues a given URL
+            outcome = self._reclaim(
+                keys=[
+                    self._key("leases"), self._key("leased"), self._key("owners"),
+                    self._key("attempts"), self._key("counts"),
+                    self._key("pending", url_partition(url, self.num_partitions)),
+                ],
+                args=[url, self.max_attempts],
+            )
+            if outcome == 1:
+                reclaimed += 1
+            elif outcome == -1:
+                failed += 1
+        if failed:
+            log_print(f"[WARNING] Gave up on {failed} URLs whose lease expired {self.max_attempts} times")
+        return reclaimed
+
+    def heartbeat(self, worker: str):
+        self.client.hset(self._key("workers"), worker, time.time())
+
+    def workers(self) -> Dict[str, float]:
+        return {
+            (k.decode() if isinstance(k, bytes) else k): float(v)
+            for k, v in self.client.hgetall(self._key("workers")).items()
+        }
+
+    def counts(self) -> Dict[str, int]:
+        return {
+            (k.decode() if isinstance(k, bytes) else k): int(v)
+            for k, v in self.client.hgetall(self._key("counts")).items()
+            if int(v)
+        }
+
+    def pending_partitions(self) -> List[int]:
+        return [
+            p for p in range(self.num_partitions)
+            if self.client.llen(self._key("pending", p))
+        ]
+
+    def close(self):
+        pass
+
+
+def create_frontier(
+    spec: str,
+    num_partitions: int = DEFAULT_PARTITIONS,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+):
+    """
+    Open a frontier from a spec: sqlite:///path/to/frontier.db or
+    redis://host:port/db[#prefix] (the prefix defaults to "crawley").
+    """
+    if spec.startswith("sqlite:///"):
+        return SQLiteFrontier(
+            spec[len("sqlite:///"):], num_partitions=num_partitions, max_attempts=max_attempts
+        )
+    if spec.startswith(("redis://", "rediss://", "unix://")):
+        redis_url, _, prefix = spec.partition("#")
+        return RedisFrontier(
+            redis_url,
+            prefix=prefix or "crawley",
+            num_partitions=num_partitions,
+            max_attempts=max_attempts,
+        )
+    raise ValueError(f"Unknown frontier '{spec}', expected sqlite:///<path> or redis://<host>")
+
+
+class FrontierWorker:
+    """
+    Crawl loop of one worker over a shared frontier.
+
+    Worker <index> of <num_workers> owns the partitions p with p % num_workers == index;
+    URLs are partitioned by URL hash, so the pages of one site are spread over all
+    workers. A claimed URL is leased for lease_seconds; if its worker dies the lease
+    expires and any worker returns it to the pending state (or marks it failed after
+    the frontier's max_attempts claims). When a worker's own partitions are empty it
+    also claims from partitions whose owner has not sent a heartbeat for dead_after
+    seconds. While a batch is crawled, a timer sends heartbeats and renews the leases
+    of its unfinished URLs every renew_interval seconds (default: a third of the
+    shorter of the two), so slow pages never make a live worker look dead.
+
+    Internal links of successful pages are added back to the frontier (one depth
+    deeper) while they stay within desired_base and max_depth.
+    """
+
+    def __init__(
+        self,
+        frontier,
+        worker_index: int,
+        num_workers: int,
+        desired_base: str,
+        max_depth: Optional[int],
+        batch_size: int = 10,
+        lease_seconds: float = 600.0,
+        dead_after: float = 120.0,
+        poll_interval: float = 5.0,
+        url_filter: Optional[Callable[[str], bool]] = None,
+        renew_interval: Optional[float] = None,
+    ):
+        self.frontier = frontier
+        self.worker_index = worker_index
+        self.num_workers = num_workers
+        self.worker = f"worker{worker_index}"
+        self.desired_base = desired_base
+        self.max_depth = max_depth
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.dead_after = dead_after
+        self.poll_interval = poll_interval
+        self.url_filter = url_filter
+        self.renew_interval = renew_interval or min(lease_seconds, dead_after) / 3
+        self.partitions = owned_partitions(worker_index, num_workers, frontier.num_partitions)
+
+    def _orphaned_partitions(self) -> List[int]:
+        now = time.time()
+        alive = {
+            worker for worker, beat in self.frontier.workers().items()
+            if now - beat < self.dead_after
+        }
+        orphaned = []
+        for partition in self.frontier.pending_partitions():
+            owner = f"worker{partition % self.num_workers}"
+            if owner != self.worker and owner not in alive:
+                orphaned.append(partition)
+        return orphaned
+
+    async def _keep_alive(self, unfinished: Set[str]):
+        """Heartbeat and renew the leases of the batch's unfinished URLs until cancelled."""
+        while True:
+            await asyncio.sleep(self.renew_interval)
+            self.frontier.heartbeat(self.worker)
+            self.frontier.renew(self.worker, list(unfinished), self.lease_seconds)
+
+    def _links(self, result: "CrawlResult", depth: int) -> List[Tuple[str, int]]:
+        if self.max_depth is not None and depth + 1 > self.max_depth:
+            return []
+        from crawl4ai.utils import normalize_url_for_deep_crawl
+
+        links = []
+        for link in (result.links or {}).get("internal", []):
+            href = link.get("href")
+            if not href:
+                continue
+            url = normalize_url_for_deep_crawl(href, result.url)
+            if not normalize_url(url).startswith(self.desired_base):
+                continue
+            if self.url_filter is not None and not self.url_filter(url):
+                continue
+            links.append((url, depth + 1))
+        return links
+
+    async def run(
+        self,
+        crawler,
+        config,
+        handle_result: Callable[["CrawlResult"], Awaitable[None]],
+        dispatcher=None,
+    ):
+        """
+        Claim and crawl batches until the frontier has no pending or leased URLs left.
+        A dispatcher (e.g. with an AdaptiveRateLimiter) paces the fetches of each batch.
+        """
+        page_config = config.clone(deep_crawl_strategy=None, stream=True)
+        log_print(f"[INFO] {self.worker} owns {len(self.partitions)} of {self.frontier.num_partitions} partitions")
+        while True:
+            self.frontier.heartbeat(self.worker)
+            reclaimed = self.frontier.reclaim_expired()
+            if reclaimed:
+                log_print(f"[INFO] Reclaimed {reclaimed} URLs with expired leases")
+            batch = self.frontier.claim(self.worker, self.partitions, self.batch_size, self.lease_seconds)
+            if not batch:
+                batch = self.frontier.claim(
+                    self.worker, self._orphaned_partitions(), self.batch_size, self.lease_seconds
+                )
+            if not batch:
+                counts = self.frontier.counts()
+                if not counts.get("pending") and not counts.get("leased"):
+                    log_print(f"[INFO] Frontier exhausted, {self.worker} stopping ({counts})")
+                    return
+                await asyncio.sleep(self.poll_interval)
+                continue
+            depths = {item.url: item.depth for item in batch}
+            unfinished = set(depths)
+            keep_alive = asyncio.create_task(self._keep_alive(unfinished))
+            try:
+                async for result in await crawler.arun_many(
+                    [item.url for item in batch], config=page_config, dispatcher=dispatcher
+                ):
+                    depth = depths.get(result.url, 0)
+                    result.metadata = result.metadata or {}
+                    result.metadata["depth"] = depth
+                    await handle_result(result)
+                    if result.success:
+                        added = self.frontier.add(self._links(result, depth))
+                        if added:
+                            log_print(f"[DEBUG] Added {added} new URLs to the frontier from {result.url}")
+                    unfinished.discard(result.url)
+                    if not self.frontier.complete(result.url, self.worker, result.success):
+                        log_print(f"[WARNING] {self.worker} lost the lease of {result.url} before completing it")
+                    self.frontier.heartbeat(self.worker)
+            finally:
+                keep_alive.cancel()
+                await asyncio.gather(keep_alive, return_exceptions=True)
@@ -1,107 +1,177 @@
-from typing import Union, Dict
+from typing import Union, Dict, List, Optional, TYPE_CHECKING
+from dataclasses import dataclass
 import asyncio
 import random
 import json
-from crawl4ai import CrawlResult
 from crawl_tools.utils import (
     normalize_url,
     log_print,
-    convert_crawl_result,
+    convert_crawl_result_formats,
     save_content,
+    TEXT_FORMATS,
 
 )
+from crawl_tools.memory import release_result
 
-async def local_result_hook(
-    result:CrawlResult, 
-    desired_base: str, 
-    ext:str, 
-    sleep_timer:Union[int,float], 
-    data_folder:str, 
-    json_lock:asyncio.Lock,
-    url_to_filename: Dict,
-    _skip_diff_base:bool=False,
-):
+from crawl_tools.search import pick_search_format
+
+if TYPE_CHECKING:
+    from crawl4ai import CrawlResult
+    from crawl_tools.archive import FetchArchive
+    from crawl_tools.boilerplate import BoilerplateDetector
+    from crawl_tools.link_graph import LinkGraph
+    from crawl_tools.memory import PageSizeLimit
+    from crawl_tools.page_index import PageIndex
+    from crawl_tools.search import SearchIndex
+    from crawl_tools.storage import FileStore, ShardStore
+    from crawl_tools.throttle import AdaptiveRateLimiter, RetryQueue
+
+
+def save_formats(
+    result:"CrawlResult",
+    exts:List[str],
+    desired_base:str,
+    data_folder:str,
+    store=None,
+    index=None,
+    boilerplate=None,
+    search=None,
+    size_limit=None,
+) -> Dict[str, str]:
     """
-    Asynchronous hook that processes each scraped result.
-       It saves the page if the normalized URL starts with the desired base,
-    updates the global mapping, and (optionally) waits between calls for a random duration with specified upper bound
+    Save every requested format of a successful result and return {ext: filename}.
+    All formats come from the same CrawlResult, so the page is rendered and parsed once.
+    A BoilerplateDetector (see crawl_tools.boilerplate) learns from and strips the text formats,
+    and one text format per page is added to the search index (see crawl_tools.search).
+    A PageSizeLimit (see crawl_tools.memory) truncates every format of an oversized page.
     """
-    if result is None:
-        log_print("[DEBUG] Hook received None result")
-        return
-    norm_url = normalize_url(result.url)
-    if _skip_diff_base and not norm_url.startswith(desired_base):
-        log_print(
-            f"[DEBUG] Skipping {result.url} (normalized: {norm_url} does not start with {desired_base})"
-        )
-        return
-    if result.success:
-        content = convert_crawl_result(result, ext)
+    depth = int(result.metadata.get("depth", 0) or 0)
+    formats = convert_crawl_result_formats(result, exts)
+    if size_limit is not None and size_limit.is_oversized(result):
+        formats = size_limit.apply(result.url, formats)
+    if boilerplate is not None:
+        formats = boilerplate.process(formats)
+    filenames = {}
+    for ext, content in formats.items():
         if not content or str(content).strip() == "":
-            log_print(f"[WARNING] Parsed content from {result.url} is empty.")
+            log_print(f"[WARNING] Parsed {ext} content from {result.url} is empty.")
+            continue
+        if store is not None:
+            filename = store.save(result.url, content, depth, ext, desired_base)
         else:
-            depth = int(result.metadata.get("depth", 0) or 0)
             filename = save_content(
                 result.url, content, depth, ext, desired_base, data_folder
             )
-            async with json_lock:
-                url_to_filename[result.url] = filename
-            log_print(f"[DEBUG] Updated mapping for {result.url}")
-    else:
-        msg = f"[ERROR] Failed to scrape {result.url}: {result.error_message}"
-        log_print(msg)
-        async with json_lock:
-                url_to_filename[result.url] = msg
-    sleep_rand = random.uniform(0, sleep_timer)
-    log_print(f"[INFO] Sleeping for {sleep_rand:.2f}s...")
-    await asyncio.sleep(sleep_rand)
+        if index is not None:
+            index.add(result.url, filename, depth, content, ext)
+        filenames[ext] = filename
+    if search is not None:
+        ext = pick_search_format({ext: formats[ext] for ext in filenames if ext in TEXT_FORMATS})
+        if ext is not None:
+            search.add(result.url, filenames[ext], formats[ext], ext)
+    return filenames
 
-    
-async def api_result_hook(
-    result:CrawlResult, 
-    desired_base: str, 
-    ext:str, 
-    sleep_timer:Union[int,float], 
-    data_folder:str, 
-    json_lock:asyncio.Lock,
-    url_to_filename: Dict,
-    _skip_diff_base:bool=False,
-):
+
+@dataclass
+class HookContext:
+    """
+    What result_hook needs from a crawl: where and in which formats to save, the URL
+    mapping and its lock, the sleep after each page, and the optional writers and
+    controllers, each None when unused.
+    If a store (see crawl_tools.storage) is given, pages are written through it instead of save_content,
+    and if a page index (see crawl_tools.page_index) is given every saved page is added to it.
+    min_sleep sets a lower bound on the sleep, e.g. a robots.txt Crawl-delay.
+    An AdaptiveRateLimiter (throttle) is fed every result, and transient failures are
+    pushed onto retry_queue (see crawl_tools.throttle).
+    With an archive (see crawl_tools.archive) the raw HTML of every successful fetch is recorded for replay.
+    ext is one output format or a list of them (see OUTPUT_FORMATS); with several, the mapping
+    records {ext: filename} per URL. A boilerplate detector strips the site's repeated blocks,
+    and saved pages are added to search (a crawl_tools.search.SearchIndex).
+    The links of every successful result are added to graph (a crawl_tools.link_graph.LinkGraph).
+    Oversized pages are truncated or skipped according to size_limit (a crawl_tools.memory.PageSizeLimit).
+    """
+
+    desired_base: str
+    ext: Union[str, List[str]]
+    data_folder: str
+    json_lock: asyncio.Lock
+    url_to_filename: Dict
+    sleep_timer: Union[int, float] = 0
+    min_sleep: Union[int, float] = 0
+    skip_diff_base: bool = False
+    store: Optional[Union["FileStore", "ShardStore"]] = None
+    index: Optional["PageIndex"] = None
+    throttle: Optional["AdaptiveRateLimiter"] = None
+    retry_queue: Optional["RetryQueue"] = None
+    archive: Optional["FetchArchive"] = None
+    boilerplate: Optional["BoilerplateDetector"] = None
+    search: Optional["SearchIndex"] = None
+    graph: Optional["LinkGraph"] = None
+    size_limit: Optional["PageSizeLimit"] = None
+
+
+async def result_hook(result: "CrawlResult", ctx: HookContext):
     """
     Asynchronous hook that processes each scraped result.
        It saves the page if the normalized URL starts with the desired base,
-    updates the global mapping, and (optionally) waits between calls for a random duration with specified upper bound
+    updates the global mapping, and (optionally) waits between calls for a random duration with specified upper bound.
+    See HookContext for the settings and outputs it uses. The HTML and markdown of a result
+    are released once its outputs are saved, before sleeping.
     """
     if result is None:
         log_print("[DEBUG] Hook received None result")
         return
     norm_url = normalize_url(result.url)
-    if _skip_diff_base and not norm_url.startswith(desired_base):
+    if ctx.skip_diff_base and not norm_url.startswith(ctx.desired_base):
         log_print(
-            f"[DEBUG] Skipping {result.url} (normalized: {norm_url} does not start with {desired_base})"
+            f"[DEBUG] Skipping {result.url} (normalized: {norm_url} does not start with {ctx.desired_base})"
         )
         return
-    if result.success:
-        content = convert_crawl_result(result, ext)
-        if not content or str(content).strip() == "":
-            log_print(f"[WARNING] Parsed content from {result.url} is empty.")
-        else:
-            depth = int(result.metadata.get("depth", 0) or 0)
-            filename = save_content(
-                result.url, content, depth, ext, desired_base, data_folder
-            )
-            async with json_lock:
-                url_to_filename[result.url] = filename
+    if ctx.throttle is not None:
+        ctx.throttle.record_result(result)
+    if result.success and ctx.size_limit is not None and not ctx.size_limit.allows(result):
+        msg = f"[ERROR] Skipped {result.url}: page larger than {ctx.size_limit.max_bytes} bytes"
+        log_print(msg)
+        async with ctx.json_lock:
+            ctx.url_to_filename[result.url] = msg
+    elif result.success:
+        if ctx.archive is not None:
+            ctx.archive.record(result, int(result.metadata.get("depth", 0) or 0))
+        if ctx.graph is not None:
+            ctx.graph.add_result(result)
+        exts = [ctx.ext] if isinstance(ctx.ext, str) else list(ctx.ext)
+        filenames = save_formats(
+            result,
+            exts,
+            ctx.desired_base,
+            ctx.data_folder,
+            ctx.store,
+            ctx.index,
+            ctx.boilerplate,
+            ctx.search,
+            ctx.size_limit,
+        )
+        if filenames:
+            async with ctx.json_lock:
+                # a single format keeps the plain URL -> filename mapping
+                ctx.url_to_filename[result.url] = (
+                    filenames[exts[0]] if len(exts) == 1 else filenames
+                )
             log_print(f"[DEBUG] Updated mapping for {result.url}")
     else:
         msg = f"[ERROR] Failed to scrape {result.url}: {result.error_message}"
+        if ctx.retry_queue is not None and ctx.retry_queue.push(result):
+            msg += " (retry scheduled)"
         log_print(msg)
-        async with json_lock:
-                url_to_filename[result.url] = msg
-    sleep_rand = random.uniform(0, sleep_timer)
+        async with ctx.json_lock:
+            ctx.url_to_filename[result.url] = msg
+    # only the links and metadata are still needed (by the deep crawl strategy)
+    release_result(result)
+    sleep_rand = random.uniform(ctx.min_sleep, max(ctx.min_sleep, ctx.sleep_timer))
     log_print(f"[INFO] Sleeping for {sleep_rand:.2f}s...")
     await asyncio.sleep(sleep_rand)
 
+
 async def periodic_json_update(
     debug_file: str,
     json_lock:asyncio.Lock,
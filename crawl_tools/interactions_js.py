@@ -1,3 +1,5 @@
+import json
+
 scroll_and_next = """
 "use strict";
 window.scrollTo(0, document.body.scrollHeight);
@@ -15,4 +17,58 @@ wait_for_new_page = """js:() => {
   const items = document.querySelectorAll('.exhibitor-item');
   // Or check a data attribute that changes on new page
   return items.length > 0;
-}"""
\ No newline at end of file
+}"""
+PAGINATION_MARKER_ID = "crawl-tools-new-items"
+
+# Crawl4AI evaluates js_code as an expression (`const script_result = <js_code>;`),
+# hence the async IIFE.
+_paginate_step = """await (async () => {
+const ITEM = %(item)s, NEXT = %(next)s, MARKER = %(marker)s, TIMEOUT = %(timeout)d;
+let marker = document.getElementById(MARKER);
+if (!marker) {
+  marker = document.createElement("div");
+  marker.id = MARKER;
+  marker.style.display = "none";
+  document.body.appendChild(marker);
+}
+const items = () => Array.from(document.querySelectorAll(ITEM)).filter(el => !marker.contains(el));
+const fresh = () => items().filter(el => !el.hasAttribute("data-crawl-seen"));
+// the first step marks the items already captured by the initial page load
+if (!window.__crawlToolsPaginating) {
+  items().forEach(el => el.setAttribute("data-crawl-seen", ""));
+  window.__crawlToolsPaginating = true;
+}
+let clicked = false;
+const btn = NEXT ? document.querySelector(NEXT) : null;
+if (btn && !btn.disabled && btn.getAttribute("aria-disabled") !== "true") {
+  btn.scrollIntoView();
+  btn.click();
+  clicked = true;
+} else {
+  window.scrollTo(0, document.body.scrollHeight);
+}
+const deadline = Date.now() + TIMEOUT;
+while (fresh().length === 0 && Date.now() < deadline) {
+  await new Promise(r => setTimeout(r, 250));
+}
+const added = fresh();
+added.forEach(el => el.setAttribute("data-crawl-seen", ""));
+// only the new items are copied into the marker, the crawl scopes its extraction to it
+marker.replaceChildren(...added.map(el => el.cloneNode(true)));
+return {added: added.length, total: items().length, clicked: clicked, html: marker.innerHTML};
+})()"""
+
+
+def paginate_step(item_selector, next_selector=None, timeout_ms=10000, marker_id=PAGINATION_MARKER_ID):
+    """
+    JS for one pagination step on an already loaded listing: click next_selector (or scroll
+    to the bottom when there is none / it is disabled), wait up to timeout_ms for items
+    matching item_selector that were not seen in previous steps, and copy only those into
+    a hidden #marker_id element. Returns {added, total, clicked, html}.
+    """
+    return _paginate_step % {
+        "item": json.dumps(item_selector),
+        "next": json.dumps(next_selector),
+        "marker": json.dumps(marker_id),
+        "timeout": timeout_ms,
+    }
@@ -0,0 +1,213 @@
+import os
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING
+from urllib.parse import urldefrag
+
+from crawl_tools.utils import log_print
+
+if TYPE_CHECKING:
+    from crawl4ai import CrawlResult
+
+# Saved next to the debug URL mapping: <mapping>.links.npz
+LINK_GRAPH_SUFFIX = ".links.npz"
+
+# depth of pages that were linked to but not fetched
+NOT_CRAWLED = -1
+
+
+def link_graph_filename(debug_file: str) -> str:
+    """Path of the link graph saved beside a debug mapping file."""
+    if debug_file.endswith(".json"):
+        debug_file = debug_file[: -len(".json")]
+    return debug_file + LINK_GRAPH_SUFFIX
+
+
+class LinkGraph:
+    """
+    Link graph discovered during a crawl.
+
+    URLs are interned to consecutive integer ids and edges are appended to two
+    array('I') buffers (4 bytes per endpoint), so capturing the graph costs little
+    more than the URL strings themselves and does not need numpy. Pages that were
+    fetched keep their crawl depth; pages only seen as link targets have depth -1.
+
+    to_csr() sorts and deduplicates the edges into compressed sparse row form
+    (indptr, indices), the layout used by save(), in_degree() and pagerank().
+    """
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.urls: List[str] = []
+        self.depths = array("h")
+        self._src = array("I")
+        self._dst = array("I")
+        self._csr = None
+
+    def __len__(self):
+        return len(self.urls)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self._src)
+
+    def intern(self, url: str) -> int:
+        node = self.ids.get(url)
+        if node is None:
+            node = self.ids[url] = len(self.urls)
+            self.urls.append(url)
+            self.depths.append(NOT_CRAWLED)
+        return node
+
+    def add_page(self, url: str, links: Iterable[str], depth: int = 0):
+        """
+        Record a fetched page and the pages it links to (fragments are dropped). URLs are
+        taken as given: add_result() normalizes them the way the deep crawl does.
+        """
+        src = self.intern(url)
+        if self.depths[src] == NOT_CRAWLED or depth < self.depths[src]:
+            self.depths[src] = min(depth, 32767)
+        targets = set()
+        for link in links:
+            target = urldefrag(link)[0]
+            if target and target != url:
+                targets.add(self.intern(target))
+        self._src.extend([src] * len(targets))
+        self._dst.extend(targets)
+        self._csr = None
+
+    def add_result(self, result: "CrawlResult", include_external: bool = False):
+        """
+        Record the links of a CrawlResult (internal ones, plus external with include_external).
+        The page URL and every link are resolved against result.url and normalized with
+        the deep crawl's normalize_url_for_deep_crawl, so a page and the links to it
+        (e.g. ".../docs" and ".../docs/") are the same node.
+        """
+        from crawl4ai.utils import normalize_url_for_deep_crawl
+
+        links = result.links or {}
+        groups = ["internal", "external"] if include_external else ["internal"]
+        hrefs = [
+            normalize_url_for_deep_crawl(link["href"], result.url)
+            for group in groups
+            for link in links.get(group, [])
+            if link.get("href")
+        ]
+        self.add_page(
+            normalize_url_for_deep_crawl(result.url, result.url),
+            hrefs,
+            int(result.metadata.get("depth", 0) or 0),
+        )
+
+    def to_csr(self):
+        """(indptr, indices) numpy arrays of the deduplicated adjacency, rows sorted by source."""
+        if self._csr is None:
+            import numpy as np
+
+            n = len(self.urls)
+            src = np.frombuffer(self._src, dtype=np.uint32).astype(np.int64)
+            dst = np.frombuffer(self._dst, dtype=np.uint32).astype(np.int64)
+            # a page fetched twice (retries, replays) must not count its links twice
+            keys = np.unique(src * n + dst)
+            src, dst = keys // n, keys % n
+            indptr = np.zeros(n + 1, dtype=np.int64)
+            np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+            self._csr = (indptr, dst.astype(np.uint32))
+        return self._csr
+
+    def save(self, path: str):
+        """Write urls, depths and the CSR adjacency to a compressed .npz file."""
+        import numpy as np
+
+        indptr, indices = self.to_csr()
+        np.savez_compressed(
+            path,
+            # newline separated UTF-8 (URLs never contain raw newlines)
+            urls=np.frombuffer("\n".join(self.urls).encode("utf-8"), dtype=np.uint8),
+            depths=np.frombuffer(self.depths, dtype=np.int16),
+            indptr=indptr,
+            indices=indices,
+        )
+        log_print(
+            f"[DEBUG] Saved link graph ({len(self.urls)} pages, {len(indices)} links) to '{path}'"
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "LinkGraph":
+        import numpy as np
+
+        with np.load(path) as data:
+            urls = data["urls"].tobytes().decode("utf-8")
+            graph = cls()
+            graph.urls = urls.split("\n") if urls else []
+            graph.ids = {url: i for i, url in enumerate(graph.urls)}
+            graph.depths = array("h", data["depths"].astype(np.int16).tobytes())
+            indptr, indices = data["indptr"], data["indices"]
+        src = np.repeat(np.arange(len(graph.urls), dtype=np.uint32), np.diff(indptr))
+        graph._src = array("I", src.tobytes())
+        graph._dst = array("I", indices.astype(np.uint32).tobytes())
+        graph._csr = (indptr, indices)
+        return graph
+
+    def out_links(self, url: str) -> List[str]:
+        indptr, indices = self.to_csr()
+        node = self.ids[url]
+        return [self.urls[i] for i in indices[indptr[node] : indptr[node + 1]]]
+
+    def in_degree(self):
+        """Number of distinct pages linking to each page, indexed by id."""
+        import numpy as np
+
+        _, indices = self.to_csr()
+        return np.bincount(indices, minlength=len(self.urls))
+
+    def out_degree(self):
+        import numpy as np
+
+        indptr, _ = self.to_csr()
+        return np.diff(indptr)
+
+    def pagerank(self, damping: float = 0.85, tol: float = 1e-6, max_iter: int = 100):
+        """
+        PageRank by power iteration, indexed by id. Pages without out links (including
+        the ones never fetched) spread their rank evenly over all pages.
+        """
+        import numpy as np
+
+        n = len(self.urls)
+        if n == 0:
+            return np.zeros(0)
+        indptr, indices = self.to_csr()
+        out_degree = np.diff(indptr)
+        dangling = out_degree == 0
+        rank = np.full(n, 1.0 / n)
+        for _ in range(max_iter):
+            share = np.divide(rank, out_degree, out=np.zeros(n), where=~dangling)
+            spread = np.bincount(indices, weights=np.repeat(share, out_degree), minlength=n)
+            updated = (1 - damping) / n + damping * (spread + rank[dangling].sum() / n)
+            delta = np.abs(updated - rank).sum()
+            rank = updated
+            if delta < tol:
+                break
+        return rank
+
+    def top(self, scores, n: int = 20, crawled_only: bool = False) -> List[Tuple[str, float]]:
+        """The n URLs with the highest scores (e.g. pagerank() or in_degree()), best first."""
+        import numpy as np
+
+        order = np.argsort(-np.asarray(scores), kind="stable")
+        ranked = []
+        for node in order:
+            if crawled_only and self.depths[node] == NOT_CRAWLED:
+                continue
+            ranked.append((self.urls[node], float(scores[node])))
+            if len(ranked) == n:
+                break
+        return ranked
+
+
+def load_link_graph(debug_file: str) -> Optional[LinkGraph]:
+    """The link graph saved beside a debug mapping file, or None if the crawl did not capture one."""
+    path = link_graph_filename(debug_file)
+    if not os.path.exists(path):
+        return None
+    return LinkGraph.load(path)
@@ -0,0 +1,120 @@
+import asyncio
+from typing import Awaitable, Dict, TYPE_CHECKING
+
+from crawl_tools.utils import log_print
+
+if TYPE_CHECKING:
+    from crawl4ai import CrawlResult
+
+OVERSIZE_CHOICES = ["truncate", "skip"]
+
+
+def result_bytes(result: "CrawlResult") -> int:
+    """Approximate size of the page representations a CrawlResult holds (HTML variants and markdown)."""
+    size = len(result.html or "") + len(result.cleaned_html or "")
+    markdown = result.markdown
+    if markdown is not None:
+        for field in ("raw_markdown", "markdown_with_citations", "fit_markdown", "fit_html"):
+            size += len(getattr(markdown, field, None) or "")
+    return size
+
+
+def release_result(result: "CrawlResult"):
+    """
+    Drop the large representations of a result once its outputs have been saved.
+    Links and metadata are kept: the deep crawl strategy reads them after the hook.
+    """
+    result.html = ""
+    result.cleaned_html = None
+    result.markdown = None
+    result.media = {}
+    result.extracted_content = None
+    result.js_execution_result = None
+    result.screenshot = None
+    result.pdf = None
+
+
+def truncate_utf8(text: str, max_bytes: int) -> str:
+    """Cut text to at most max_bytes of UTF-8 without splitting a character."""
+    encoded = text.encode("utf-8")
+    if len(encoded) <= max_bytes:
+        return text
+    return encoded[:max_bytes].decode("utf-8", errors="ignore")
+
+
+class PageSizeLimit:
+    """
+    Per-page size limit: pages whose rendered HTML is larger than max_bytes are either
+    skipped (oversize="skip") or saved with every output format cut to max_bytes
+    (oversize="truncate").
+    """
+
+    def __init__(self, max_bytes: int, oversize: str = "truncate"):
+        if oversize not in OVERSIZE_CHOICES:
+            raise ValueError(f"oversize must be one of {OVERSIZE_CHOICES}, not {oversize!r}")
+        self.max_bytes = max_bytes
+        self.oversize = oversize
+
+    def is_oversized(self, result: "CrawlResult") -> bool:
+        html = result.html or ""
+        # a character is 1 to 4 bytes, only encode when that leaves a doubt
+        if len(html) > self.max_bytes or 4 * len(html) <= self.max_bytes:
+            return len(html) > self.max_bytes
+        return len(html.encode("utf-8")) > self.max_bytes
+
+    def allows(self, result: "CrawlResult") -> bool:
+        """False if the page must not be saved at all."""
+        return self.oversize != "skip" or not self.is_oversized(result)
+
+    def apply(self, url: str, formats: Dict[str, str]) -> Dict[str, str]:
+        """Truncate the converted formats ({ext: content}) of one page."""
+        limited = {}
+        for ext, content in formats.items():
+            limited[ext] = truncate_utf8(content, self.max_bytes) if content else content
+            if limited[ext] is not content:
+                log_print(f"[WARNING] Truncated {ext} content of {url} to {self.max_bytes} bytes")
+        return limited
+
+
+class ByteBudget:
+    """
+    Bounds the bytes of results being processed at once when hooks run as tasks.
+
+    spawn() waits until the result fits in the budget before starting its hook, so the
+    loop reading the crawl stream stops pulling results (and the crawler stops
+    scheduling new pages) while the budget is exhausted. A single result larger than
+    the whole budget is let through once nothing else is in flight. A failing hook
+    releases its bytes and its task holds the exception, for the caller to raise.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.used = 0
+        self.peak = 0
+        self._changed = asyncio.Condition()
+
+    async def acquire(self, nbytes: int):
+        async with self._changed:
+            await self._changed.wait_for(
+                lambda: self.used == 0 or self.used + nbytes <= self.max_bytes
+            )
+            self.used += nbytes
+            self.peak = max(self.peak, self.used)
+
+    async def release(self, nbytes: int):
+        async with self._changed:
+            self.used -= nbytes
+            self._changed.notify_all()
+
+    async def spawn(self, result: "CrawlResult", hook: Awaitable) -> asyncio.Task:
+        """Run hook (a coroutine processing result) as a task once the result fits in the budget."""
+        nbytes = result_bytes(result)
+        await self.acquire(nbytes)
+
+        async def run():
+            try:
+                await hook
+            finally:
+                await self.release(nbytes)
+
+        return asyncio.create_task(run())
@@ -0,0 +1,356 @@
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import time
+from collections import namedtuple
+from typing import Iterator, List, Optional
+
+from crawl_tools.storage import parse_ref, read_bytes, read_content
+from crawl_tools.utils import OUTPUT_FORMATS, log_print
+
+# Folder created inside the data folder of a crawl when the page index is enabled.
+PAGE_INDEX_DIRNAME = ".index"
+
+RECORDS_FILE = "pages.idx"
+STRINGS_FILE = "strings.dat"
+SORTED_FILE = "pages.sorted"
+
+# url_hash, url_off, url_len, ref_off, ref_len, offset, length,
+# content_hash, fetched, depth, flags, ext
+RECORD = struct.Struct("<QQIQIQQQdHB8s")
+# url_hash, record number
+SORTED_ENTRY = struct.Struct("<QQ")
+# number of records covered by the sorted table
+SORTED_HEADER = struct.Struct("<Q")
+
+FLAG_SHARDED = 1
+
+PageEntry = namedtuple(
+    "PageEntry",
+    ["url", "ref", "depth", "ext", "content_hash", "fetched", "length"],
+)
+
+
+def url_hash(url: str) -> int:
+    return int.from_bytes(hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _pack_ext(ext: str) -> bytes:
+    """Extension as stored in the 8 byte record field; the dot is dropped for longer ones (.raw.html)."""
+    data = ext.encode("utf-8")
+    if len(data) > 8 and data.startswith(b"."):
+        data = data[1:]
+    return data[:8].ljust(8, b"\0")
+
+
+def _unpack_ext(data: bytes) -> str:
+    ext = data.rstrip(b"\0").decode("utf-8")
+    return ext if not ext or ext.startswith(".") else "." + ext
+
+
+def content_hash(content: str) -> int:
+    return int.from_bytes(hashlib.blake2b(content.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class PageIndex:
+    """
+    Compact on-disk index over crawl output: URL hash -> file/shard offset, length,
+    depth, extension, content hash and fetch time.
+
+    Records are fixed size and appended to pages.idx, the URL and storage reference
+    strings go to strings.dat. Readers memory-map both files, so lookups and filtered
+    iteration never load the whole index into RAM. compact() writes pages.sorted, a
+    table of (url_hash, record) pairs sorted by hash that get() binary searches;
+    records appended after the last compaction are scanned linearly.
+
+    An index has a single writer (the save hook of one crawl); any number of
+    processes can read it while it grows, calling refresh() to see new records.
+    """
+
+    def __init__(self, index_dir: str, readonly: bool = False):
+        self.index_dir = index_dir
+        self.readonly = readonly
+        self.records_path = os.path.join(index_dir, RECORDS_FILE)
+        self.strings_path = os.path.join(index_dir, STRINGS_FILE)
+        self.sorted_path = os.path.join(index_dir, SORTED_FILE)
+        if not readonly:
+            os.makedirs(index_dir, exist_ok=True)
+            self._records_out = open(self.records_path, "ab")
+            self._strings_out = open(self.strings_path, "ab")
+        self._records = None
+        self._strings = None
+        self._sorted = None
+        self._sorted_count = 0
+        self._written = False
+        self.refresh()
+
+    # ------------------------------------------------------------------ writing
+
+    def add(
+        self,
+        url: str,
+        ref: str,
+        depth: int,
+        content: str,
+        ext: str,
+        fetched: Optional[float] = None,
+    ):
+        """Append an entry for a saved page; ref is the value returned by the store (see crawl_tools.storage)."""
+        if self.readonly:
+            raise RuntimeError(f"Page index '{self.index_dir}' was opened read-only")
+        path, offset, length = parse_ref(ref)
+        flags = 0
+        if offset is None:
+            offset = 0
+            length = os.path.getsize(path) if os.path.exists(path) else 0
+        else:
+            flags |= FLAG_SHARDED
+        url_bytes = url.encode("utf-8")
+        ref_bytes = ref.encode("utf-8")
+        # Strings are written (and flushed) before the record pointing at them,
+        # so a concurrent reader never sees a record with missing strings.
+        url_off = self._strings_out.tell()
+        self._strings_out.write(url_bytes)
+        ref_off = self._strings_out.tell()
+        self._strings_out.write(ref_bytes)
+        self._strings_out.flush()
+        self._records_out.write(
+            RECORD.pack(
+                url_hash(url),
+                url_off,
+                len(url_bytes),
+                ref_off,
+                len(ref_bytes),
+                offset,
+                length,
+                content_hash(content),
+                fetched if fetched is not None else time.time(),
+                depth,
+                flags,
+                _pack_ext(ext),
+            )
+        )
+        self._records_out.flush()
+        self._written = True
+
+    def _refresh_if_written(self):
+        # the writer sees its own appends without callers having to refresh()
+        if self._written:
+            self._written = False
+            self.refresh()
+
+    def compact(self):
+        """Rewrite pages.sorted so that every record currently in the index is found by binary search."""
+        if self.readonly:
+            raise RuntimeError(f"Page index '{self.index_dir}' was opened read-only")
+        self.refresh()
+        count = len(self)
+        pairs = sorted(
+            (fields[0], number) for number, fields in enumerate(self._iter_raw())
+        )
+        tmp_path = self.sorted_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(SORTED_HEADER.pack(count))
+            for pair in pairs:
+                f.write(SORTED_ENTRY.pack(*pair))
+        os.replace(tmp_path, self.sorted_path)
+        self.refresh()
+        log_print(f"[DEBUG] Compacted page index '{self.index_dir}' ({count} records)")
+
+    # ------------------------------------------------------------------ reading
+
+    @staticmethod
+    def _map(path):
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return None
+        with open(path, "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def refresh(self):
+        """Re-map the index files to pick up records appended since the last refresh."""
+        for m in (self._records, self._strings, self._sorted):
+            if m is not None:
+                m.close()
+        self._records = self._map(self.records_path)
+        self._strings = self._map(self.strings_path)
+        self._sorted = self._map(self.sorted_path)
+        self._sorted_count = 0
+        if self._sorted is not None:
+            (self._sorted_count,) = SORTED_HEADER.unpack_from(self._sorted, 0)
+
+    def __len__(self):
+        if self._records is None:
+            return 0
+        return len(self._records) // RECORD.size
+
+    def _iter_raw(self, start: int = 0):
+        if self._records is None:
+            return iter(())
+        end = len(self) * RECORD.size
+        return RECORD.iter_unpack(memoryview(self._records)[start * RECORD.size : end])
+
+    def _string(self, offset: int, length: int) -> str:
+        return self._strings[offset : offset + length].decode("utf-8")
+
+    def _entry(self, fields) -> PageEntry:
+        (_, url_off, url_len, ref_off, ref_len, _, length,
+         chash, fetched, depth, _, ext) = fields
+        return PageEntry(
+            url=self._string(url_off, url_len),
+            ref=self._string(ref_off, ref_len),
+            depth=depth,
+            ext=_unpack_ext(ext),
+            content_hash=chash,
+            fetched=fetched,
+            length=length,
+        )
+
+    def _record(self, number: int):
+        return RECORD.unpack_from(self._records, number * RECORD.size)
+
+    def _sorted_hash(self, position: int) -> int:
+        return SORTED_ENTRY.unpack_from(self._sorted, SORTED_HEADER.size + position * SORTED_ENTRY.size)[0]
+
+    def get_all(self, url: str) -> List[PageEntry]:
+        """Every entry recorded for url (one per saved artifact / re-crawl), oldest first."""
+        self._refresh_if_written()
+        target = url_hash(url)
+        numbers = []
+        if self._sorted is not None and self._sorted_count:
+            # bisect over the mmap'd table through a lazy key view
+            view = _SortedHashes(self)
+            position = bisect.bisect_left(view, target)
+            while position < self._sorted_count and self._sorted_hash(position) == target:
+                numbers.append(
+                    SORTED_ENTRY.unpack_from(
+                        self._sorted, SORTED_HEADER.size + position * SORTED_ENTRY.size
+                    )[1]
+                )
+                position += 1
+        for number, fields in enumerate(self._iter_raw(self._sorted_count), start=self._sorted_count):
+            if fields[0] == target:
+                numbers.append(number)
+        entries = [self._entry(self._record(number)) for number in sorted(numbers)]
+        return [entry for entry in entries if entry.url == url]
+
+    def get(self, url: str, ext: Optional[str] = None) -> Optional[PageEntry]:
+        """Latest entry for url (optionally restricted to one extension), or None."""
+        entries = [e for e in self.get_all(url) if ext is None or e.ext == ext]
+        return entries[-1] if entries else None
+
+    def __contains__(self, url: str):
+        return self.get(url) is not None
+
+    def iter_entries(
+        self,
+        max_depth: Optional[int] = None,
+        since: Optional[float] = None,
+        ext: Optional[str] = None,
+        latest_only: bool = True,
+    ) -> Iterator[PageEntry]:
+        """
+        Iterate entries matching the filters, e.g. iter_entries(max_depth=1, since=t)
+        for all depth <= 1 pages fetched after t. Filters are applied on the raw
+        records, strings are only decoded for matches. With latest_only, older entries
+        of a URL/extension that was saved again later are skipped.
+        """
+        self._refresh_if_written()
+        ext_bytes = _pack_ext(ext) if ext is not None else None
+        matches = []
+        for number, fields in enumerate(self._iter_raw()):
+            if max_depth is not None and fields[9] > max_depth:
+                continue
+            if since is not None and fields[8] < since:
+                continue
+            if ext_bytes is not None and fields[11] != ext_bytes:
+                continue
+            matches.append((number, fields))
+        if latest_only and matches:
+            # second pass only tracks the keys of matching records, keeping memory
+            # proportional to the result rather than to the index
+            latest = {(fields[0], fields[11]): number for number, fields in matches}
+            for number, fields in enumerate(self._iter_raw(matches[0][0])):
+                key = (fields[0], fields[11])
+                if key in latest:
+                    latest[key] = max(latest[key], number + matches[0][0])
+            matches = [
+                (number, fields) for number, fields in matches
+                if latest[(fields[0], fields[11])] == number
+            ]
+        for _, fields in matches:
+            yield self._entry(fields)
+
+    def read(self, entry: PageEntry) -> str:
+        return read_content(entry.ref)
+
+    def close(self):
+        for m in (self._records, self._strings, self._sorted):
+            if m is not None:
+                m.close()
+        self._records = self._strings = self._sorted = None
+        if not self.readonly:
+            self._records_out.close()
+            self._strings_out.close()
+
+
+class _SortedHashes:
+    """Sequence view over the hashes of pages.sorted, so bisect can search the mmap directly."""
+
+    def __init__(self, index: PageIndex):
+        self.index = index
+
+    def __len__(self):
+        return self.index._sorted_count
+
+    def __getitem__(self, position):
+        return self.index._sorted_hash(position)
+
+
+def build_from_mapping(mapping_file: str, index_dir: str) -> PageIndex:
+    """
+    Build (or extend) a page index from a debug URL -> filename mapping written by
+    an earlier crawl. Failed URLs (mapped to an error message) are skipped; the depth
+    is recovered from the scraped_content_depth<d>_ filename when present. Mappings
+    of multi-format crawls ({ext: filename} per URL) index every format.
+    """
+    with open(mapping_file, "r", encoding="utf-8") as f:
+        mapping = json.load(f)
+    index = PageIndex(index_dir)
+    added = 0
+    for url, value in mapping.items():
+        refs = value if isinstance(value, dict) else {None: value}
+        for ext, ref in refs.items():
+            if ref.startswith("[ERROR]"):
+                continue
+            path, _, _ = parse_ref(ref)
+            if not os.path.exists(path):
+                log_print(f"[WARNING] Skipping {url}: '{path}' not found")
+                continue
+            match = re.search(r"depth(\d+)_", os.path.basename(path))
+            depth = int(match.group(1)) if match else 0
+            index.add(
+                url, ref, depth, read_content(ref), ext or _ext_from_ref(ref),
+                fetched=os.path.getmtime(path),
+            )
+            added += 1
+    index.compact()
+    log_print(f"[DEBUG] Indexed {added} pages from '{mapping_file}' into '{index_dir}'")
+    return index
+
+
+def _ext_from_ref(ref: str) -> str:
+    path, offset, _ = parse_ref(ref)
+    if offset is not None:
+        return json.loads(read_bytes(ref))["ext"]
+    name = os.path.basename(path)
+    for suffix in (".gz", ".zst"):
+        if name.endswith(suffix):
+            name = name[: -len(suffix)]
+    for ext in sorted(OUTPUT_FORMATS, key=len, reverse=True):
+        if name.endswith(ext):
+            return ext
+    return os.path.splitext(name)[1]
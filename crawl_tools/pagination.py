@@ -0,0 +1,125 @@
+import uuid
+from typing import AsyncIterator, List, Optional, TYPE_CHECKING
+
+from crawl_tools.interactions_js import PAGINATION_MARKER_ID, paginate_step
+from crawl_tools.utils import log_print, normalize_url, unwrap_result
+
+if TYPE_CHECKING:
+    from crawl4ai import CrawlResult
+
+
+class Paginator:
+    """
+    Walks a "load more" / "next" / infinite-scroll listing inside one browser session.
+
+    The listing is loaded once; every following step runs paginate_step() in the same
+    page (js_only), so nothing is re-navigated or re-rendered. Each step only copies the
+    items that appeared since the previous step into a hidden marker element and the
+    crawl's extraction is scoped to it, so every yielded result holds just the new items.
+    Stops after max_pages steps, or when max_idle_steps consecutive steps add nothing.
+
+    Crawl4AI still serializes the whole DOM (page.content()) after each step, as arun()
+    does for every call; only the HTML kept on the result and the extraction are limited
+    to the new items, so the browser-side cost of a step grows with the listing.
+
+    Results are yielded as <url>#page-<n> (n >= 1) at depth 0; the listing's first screen
+    is not yielded since the regular crawl already saves it. Next links that navigate to
+    another document end the pagination: the deep crawl follows those as ordinary links.
+    """
+
+    def __init__(
+        self,
+        item_selector: str,
+        next_selector: Optional[str] = None,
+        max_pages: int = 50,
+        step_timeout: float = 10.0,
+        max_idle_steps: int = 2,
+    ):
+        self.item_selector = item_selector
+        self.next_selector = next_selector
+        self.max_pages = max_pages
+        self.step_timeout = step_timeout
+        self.max_idle_steps = max_idle_steps
+        self.links: List[str] = []  # internal links found in the new items
+
+    @staticmethod
+    def _step_info(result: "CrawlResult") -> Optional[dict]:
+        """The dict returned by paginate_step(), or None if the step navigated away."""
+        execution = result.js_execution_result or {}
+        steps = execution.get("results") or []
+        if not steps or not isinstance(steps[-1], dict):
+            return None
+        info = steps[-1].get("result")
+        return info if isinstance(info, dict) else None
+
+    async def paginate(self, crawler, url: str, config) -> AsyncIterator["CrawlResult"]:
+        """
+        Yield one CrawlResult per page of new listing items. config is the crawl's run
+        config; deep crawling and streaming are turned off for the session.
+        """
+        from crawl4ai import CacheMode
+
+        session_id = f"paginate_{uuid.uuid4().hex[:12]}"
+        base_config = config.clone(
+            deep_crawl_strategy=None,
+            stream=False,
+            session_id=session_id,
+            cache_mode=CacheMode.BYPASS,
+        )
+        step_config = base_config.clone(
+            js_code=paginate_step(
+                self.item_selector, self.next_selector, int(self.step_timeout * 1000)
+            ),
+            js_only=True,
+            css_selector=f"#{PAGINATION_MARKER_ID}",
+        )
+        try:
+            first = unwrap_result(await crawler.arun(url, config=base_config))
+            if not first.success:
+                log_print(f"[ERROR] Could not load listing {url}: {first.error_message}")
+                return
+            page, idle, step = 0, 0, 0
+            for step in range(1, self.max_pages + 1):
+                result = unwrap_result(await crawler.arun(url, config=step_config))
+                if not result.success:
+                    log_print(f"[ERROR] Pagination step {step} of {url} failed: {result.error_message}")
+                    break
+                info = self._step_info(result)
+                if info is None:
+                    log_print(f"[INFO] Pagination step {step} of {url} navigated away, stopping")
+                    break
+                if not info.get("added"):
+                    idle += 1
+                    log_print(f"[DEBUG] Pagination step {step} of {url} found no new items ({idle}/{self.max_idle_steps})")
+                    if idle >= self.max_idle_steps:
+                        break
+                    continue
+                idle = 0
+                page += 1
+                self.links.extend(
+                    link["href"] for link in (result.links or {}).get("internal", []) if link.get("href")
+                )
+                log_print(
+                    f"[DEBUG] Page {page} of {url}: {info['added']} new items ({info.get('total')} total)"
+                )
+                result.url = f"{url}#page-{page}"
+                # keep only the new items instead of the whole serialized listing
+                result.html = info.get("html") or ""
+                result.metadata = result.metadata or {}
+                result.metadata.update(depth=0, page=page)
+                yield result
+            log_print(f"[INFO] Paginated {url}: {page} pages in {step} steps")
+        finally:
+            await crawler.crawler_strategy.kill_session(session_id)
+
+    def seed_links(self, desired_base: str) -> List[str]:
+        """Unique internal links found in the paginated items that stay within desired_base."""
+        seen = set()
+        seeds = []
+        for link in self.links:
+            norm_url = normalize_url(link)
+            if norm_url in seen or not norm_url.startswith(desired_base):
+                continue
+            seen.add(norm_url)
+            seeds.append(link)
+        return seeds
@@ -0,0 +1,230 @@
+import asyncio
+import atexit
+import os
+import sys
+import sysconfig
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from crawl_tools.utils import log_print
+
+# Frames from these directories are library code, blocking call sites are reported
+# at the innermost frame outside them.
+_LIBRARY_DIRS = tuple(
+    os.path.normcase(os.path.realpath(path)) + os.sep
+    for path in {sysconfig.get_paths()[name] for name in ("stdlib", "platstdlib", "purelib", "platlib")}
+)
+
+# activity labels, per asyncio task (or per thread outside a running loop)
+_activities: Dict[object, str] = {}
+
+
+def _activity_key():
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    return task if task is not None else threading.get_ident()
+
+
+@contextmanager
+def activity(label: str):
+    """
+    Label the work done inside the block (e.g. "result_hook <url>"), so the
+    profiler can name what was running when the event loop stalled.
+    """
+    key = _activity_key()
+    previous = _activities.get(key)
+    _activities[key] = label
+    try:
+        yield
+    finally:
+        if previous is None:
+            _activities.pop(key, None)
+        else:
+            _activities[key] = previous
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+@lru_cache(maxsize=None)
+def _is_library(filename: str) -> bool:
+    return os.path.normcase(os.path.realpath(filename)).startswith(_LIBRARY_DIRS)
+
+
+def _call_site(frame) -> str:
+    """Innermost frame of our own code in a stack (the leaf if it is all library code)."""
+    leaf = frame
+    while frame is not None:
+        if not _is_library(frame.f_code.co_filename):
+            code = frame.f_code
+            return f"{os.path.relpath(code.co_filename)}:{frame.f_lineno} ({code.co_name})"
+        frame = frame.f_back
+    code = leaf.f_code
+    return f"{code.co_filename}:{leaf.f_lineno} ({code.co_name})"
+
+
+class Profiler:
+    """
+    Sampling profiler and event loop stall watchdog, run from a background thread.
+
+    Every interval the stacks of all other threads are sampled and counted as folded
+    stacks ("thread;outer;...;inner count" lines, the input of flamegraph.pl and
+    speedscope), written to path by stop().
+
+    With an event loop (start(loop)), a callback on the loop records a heartbeat every
+    interval. When the heartbeat is late by more than stall_threshold seconds the
+    loop is blocked by synchronous code: the loop thread's stack is sampled for as
+    long as the stall lasts, and when it ends the stall is logged with the activity
+    (see activity()) of the task that was running and the call site it was blocked in.
+    stop() logs a summary of the top blocking call sites and activities.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        interval: float = 0.01,
+        stall_threshold: float = 0.1,
+        top: int = 15,
+    ):
+        self.path = path
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self.top = top
+        self.stacks: Counter = Counter()
+        self.activity_samples: Counter = Counter()
+        # call site -> [seconds blocked, number of stalls]
+        self.blocking: Dict[str, List[float]] = defaultdict(lambda: [0.0, 0])
+        self.stalls: List[Tuple[float, str, str]] = []
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.loop_thread: Optional[int] = None
+        self._beat = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = 0.0
+        self._samples = 0
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """Start sampling; pass the running loop (from inside it) to watch for stalls."""
+        if loop is not None:
+            self.loop = loop
+            self.loop_thread = threading.get_ident()
+            self._beat = time.monotonic()
+            loop.call_soon(self._heartbeat)
+        self._started = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)  # also written when the run is interrupted
+        log_print(
+            f"[DEBUG] Profiling every {self.interval * 1000:.0f}ms"
+            + (f", loop stalls over {self.stall_threshold * 1000:.0f}ms" if loop else "")
+            + f" -> '{self.path}'"
+        )
+        return self
+
+    def _heartbeat(self):
+        self._beat = time.monotonic()
+        if not self._stop.is_set():
+            self.loop.call_later(self.interval, self._heartbeat)
+
+    def _current_activity(self, thread_id: int) -> Optional[str]:
+        if thread_id == self.loop_thread and self.loop is not None:
+            # current_task(loop) only reads the loop's entry, it is safe from this thread
+            task = asyncio.current_task(self.loop)
+            if task is None:
+                return None
+            return _activities.get(task) or f"task {task.get_name()}"
+        return _activities.get(thread_id)
+
+    def _run(self):
+        own = threading.get_ident()
+        stall_start = None
+        stall_sites: Counter = Counter()
+        stall_activity = None
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            frames = sys._current_frames()
+            self._samples += 1
+            for thread_id, frame in frames.items():
+                if thread_id == own:
+                    continue
+                stack = []
+                current = frame
+                while current is not None:
+                    stack.append(_frame_label(current))
+                    current = current.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(stack))] += 1
+                label = self._current_activity(thread_id)
+                if label is not None:
+                    self.activity_samples[label] += 1
+
+            if self.loop is None:
+                continue
+            late = time.monotonic() - self._beat - self.interval
+            loop_frame = frames.get(self.loop_thread)
+            if late > self.stall_threshold and loop_frame is not None:
+                if stall_start is None:
+                    stall_start = self._beat + self.interval
+                    stall_activity = self._current_activity(self.loop_thread)
+                stall_sites[_call_site(loop_frame)] += 1
+            elif stall_start is not None:
+                self._end_stall(self._beat - stall_start, stall_sites, stall_activity)
+                stall_start, stall_sites, stall_activity = None, Counter(), None
+
+    def _end_stall(self, duration: float, sites: Counter, label: Optional[str]):
+        total = sum(sites.values())
+        for site, count in sites.items():
+            entry = self.blocking[site]
+            entry[0] += duration * count / total
+            entry[1] += 1
+        site = sites.most_common(1)[0][0]
+        self.stalls.append((duration, label or "(no activity)", site))
+        log_print(
+            f"[WARNING] Event loop blocked for {duration:.3f}s by {label or '(no activity)'} at {site}"
+        )
+
+    def write(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.items():
+                f.write(f"{stack} {count}\n")
+
+    def summary(self) -> str:
+        elapsed = time.monotonic() - self._started
+        lines = [
+            f"Profile summary: {elapsed:.1f}s, {self._samples} samples, "
+            f"{len(self.stalls)} loop stalls totalling {sum(s[0] for s in self.stalls):.2f}s"
+        ]
+        if self.blocking:
+            lines.append("Top blocking call sites (seconds blocked, stalls):")
+            ranked = sorted(self.blocking.items(), key=lambda item: -item[1][0])
+            for site, (seconds, count) in ranked[: self.top]:
+                lines.append(f"  {seconds:8.3f}s {int(count):5d}  {site}")
+        if self.stalls:
+            lines.append("Longest stalls:")
+            for duration, label, site in sorted(self.stalls, reverse=True)[: self.top]:
+                lines.append(f"  {duration:8.3f}s  {label}  at {site}")
+        if self.activity_samples:
+            lines.append("Top activities (sampled seconds):")
+            for label, count in self.activity_samples.most_common(self.top):
+                lines.append(f"  {count * self.interval:8.2f}s  {label}")
+        return "\n".join(lines)
+
+    def stop(self):
+        """Stop sampling, write the folded stacks and log the summary (once)."""
+        if self._thread is None or self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join()
+        atexit.unregister(self.stop)
+        self.write()
+        log_print(f"[INFO] {self.summary()}")
+        log_print(f"[DEBUG] Folded stacks written to '{self.path}' (flamegraph.pl / speedscope input)")
@@ -0,0 +1,228 @@
+import heapq
+import json
+import math
+import os
+import re
+import sqlite3
+import time
+from collections import Counter, namedtuple
+from typing import Dict, List, Optional, Tuple
+
+from crawl_tools.storage import parse_ref, read_content
+from crawl_tools.utils import TEXT_FORMATS, log_print
+
+# Database kept in the data folder of a crawl.
+SEARCH_INDEX_FILENAME = ".search.db"
+
+# Okapi BM25 parameters, the rank_bm25.BM25Okapi defaults.
+BM25_K1 = 1.5
+BM25_B = 0.75
+BM25_EPSILON = 0.25
+
+TOKEN = re.compile(r"\w+")
+
+SearchHit = namedtuple("SearchHit", ["url", "ref", "ext", "score"])
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN.findall(text.lower())
+
+
+class SearchIndex:
+    """
+    Persistent inverted index over saved pages, ranked with Okapi BM25.
+
+    Postings (term, page, term frequency), document frequencies and page lengths live
+    in a SQLite database, so the index is updated page by page during a crawl and
+    queried later without loading the corpus. Re-adding a URL replaces its postings.
+    Scores match rank_bm25.BM25Okapi (k1=1.5, b=0.75, idf floored at epsilon times
+    the average idf) over the same tokens.
+    """
+
+    def __init__(self, path: str, readonly: bool = False):
+        self.path = path
+        if readonly:
+            self.db = sqlite3.connect(f"file:{path}?mode=ro", uri=True, isolation_level=None)
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self.db = sqlite3.connect(path, timeout=60, isolation_level=None)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            self.db.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS docs (
+                    id INTEGER PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    ext TEXT NOT NULL,
+                    ref TEXT NOT NULL,
+                    length INTEGER NOT NULL,
+                    indexed REAL NOT NULL,
+                    UNIQUE (url, ext)
+                );
+                CREATE TABLE IF NOT EXISTS terms (
+                    id INTEGER PRIMARY KEY,
+                    term TEXT NOT NULL UNIQUE,
+                    df INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS postings (
+                    term_id INTEGER NOT NULL,
+                    doc_id INTEGER NOT NULL,
+                    tf INTEGER NOT NULL,
+                    PRIMARY KEY (term_id, doc_id)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc_id);
+                """
+            )
+        self._average_idf = None  # (docs, terms, value)
+
+    def __len__(self):
+        (count,) = self.db.execute("SELECT COUNT(*) FROM docs").fetchone()
+        return count
+
+    def docs(self) -> List[Tuple[str, str, str]]:
+        """(url, ext, ref) of every indexed page."""
+        return self.db.execute("SELECT url, ext, ref FROM docs").fetchall()
+
+    def has(self, url: str, ext: str) -> bool:
+        return self.db.execute(
+            "SELECT 1 FROM docs WHERE url = ? AND ext = ?", (url, ext)
+        ).fetchone() is not None
+
+    def _remove(self, doc_id: int):
+        self.db.execute(
+            "UPDATE terms SET df = df - 1 WHERE id IN (SELECT term_id FROM postings WHERE doc_id = ?)",
+            (doc_id,),
+        )
+        self.db.execute("DELETE FROM postings WHERE doc_id = ?", (doc_id,))
+
+    def add(self, url: str, ref: str, content: str, ext: str = ".md"):
+        """Index (or re-index) one saved page; ref is the storage reference it was saved under."""
+        counts = Counter(tokenize(content))
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.db.execute(
+                "SELECT id FROM docs WHERE url = ? AND ext = ?", (url, ext)
+            ).fetchone()
+            if row is not None:
+                doc_id = row[0]
+                self._remove(doc_id)
+                self.db.execute(
+                    "UPDATE docs SET ref = ?, length = ?, indexed = ? WHERE id = ?",
+                    (ref, sum(counts.values()), time.time(), doc_id),
+                )
+            else:
+                doc_id = self.db.execute(
+                    "INSERT INTO docs (url, ext, ref, length, indexed) VALUES (?, ?, ?, ?, ?)",
+                    (url, ext, ref, sum(counts.values()), time.time()),
+                ).lastrowid
+            self.db.executemany(
+                "INSERT INTO terms (term, df) VALUES (?, 1) ON CONFLICT(term) DO UPDATE SET df = df + 1",
+                [(term,) for term in counts],
+            )
+            term_ids = {}
+            terms = list(counts)
+            for start in range(0, len(terms), 500):
+                chunk = terms[start : start + 500]
+                term_ids.update(
+                    self.db.execute(
+                        f"SELECT term, id FROM terms WHERE term IN ({','.join('?' * len(chunk))})",
+                        chunk,
+                    ).fetchall()
+                )
+            self.db.executemany(
+                "INSERT INTO postings (term_id, doc_id, tf) VALUES (?, ?, ?)",
+                [(term_ids[term], doc_id, tf) for term, tf in counts.items()],
+            )
+            self.db.execute("COMMIT")
+        except Exception:
+            self.db.execute("ROLLBACK")
+            raise
+
+    def _corpus_stats(self):
+        docs, total = self.db.execute("SELECT COUNT(*), COALESCE(SUM(length), 0) FROM docs").fetchone()
+        return docs, (total / docs if docs else 0.0)
+
+    def _idf(self, df: int, docs: int) -> float:
+        return math.log(docs - df + 0.5) - math.log(df + 0.5)
+
+    def _average(self, docs: int) -> float:
+        """Average idf over the vocabulary, only needed when a query term has a negative idf."""
+        (terms,) = self.db.execute("SELECT COUNT(*) FROM terms WHERE df > 0").fetchone()
+        if self._average_idf is None or self._average_idf[:2] != (docs, terms):
+            total = sum(
+                self._idf(df, docs)
+                for (df,) in self.db.execute("SELECT df FROM terms WHERE df > 0")
+            )
+            self._average_idf = (docs, terms, total / terms if terms else 0.0)
+        return self._average_idf[2]
+
+    def search(self, query: str, top: int = 10) -> List[SearchHit]:
+        """The top pages for a free text query, best first."""
+        docs, avgdl = self._corpus_stats()
+        if not docs or not avgdl:
+            return []
+        scores: Dict[int, float] = {}
+        # like rank_bm25, a term repeated in the query counts once per occurrence
+        for term in tokenize(query):
+            row = self.db.execute("SELECT id, df FROM terms WHERE term = ?", (term,)).fetchone()
+            if row is None or row[1] == 0:
+                continue
+            term_id, df = row
+            idf = self._idf(df, docs)
+            if idf < 0:
+                idf = BM25_EPSILON * self._average(docs)
+            for doc_id, tf, length in self.db.execute(
+                "SELECT p.doc_id, p.tf, d.length FROM postings p JOIN docs d ON d.id = p.doc_id "
+                "WHERE p.term_id = ?",
+                (term_id,),
+            ):
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * length / avgdl)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+        best = heapq.nlargest(top, scores.items(), key=lambda item: item[1])
+        hits = []
+        for doc_id, score in best:
+            url, ref, ext = self.db.execute(
+                "SELECT url, ref, ext FROM docs WHERE id = ?", (doc_id,)
+            ).fetchone()
+            hits.append(SearchHit(url, ref, ext, score))
+        return hits
+
+    def close(self):
+        self.db.close()
+
+
+def pick_search_format(formats: Dict[str, str]) -> Optional[str]:
+    """The one text format of a page that gets indexed: fit markdown, else plain text, else raw markdown."""
+    for ext in (".md", ".txt", ".raw.md"):
+        if formats.get(ext):
+            return ext
+    return None
+
+
+def build_search_index(mapping_file: str, path: str) -> SearchIndex:
+    """
+    Build (or update) a search index from a debug URL -> filename mapping written by an
+    earlier crawl, indexing one text format per URL. Failed URLs are skipped.
+    """
+    from crawl_tools.page_index import _ext_from_ref
+
+    with open(mapping_file, "r", encoding="utf-8") as f:
+        mapping = json.load(f)
+    index = SearchIndex(path)
+    added = 0
+    for url, value in mapping.items():
+        refs = value if isinstance(value, dict) else {None: value}
+        if None in refs:
+            if refs[None].startswith("[ERROR]"):
+                continue
+            refs = {_ext_from_ref(refs[None]): refs[None]}
+        ext = pick_search_format({e: r for e, r in refs.items() if e in TEXT_FORMATS})
+        if ext is None:
+            continue
+        if not os.path.exists(parse_ref(refs[ext])[0]):
+            log_print(f"[WARNING] Skipping {url}: '{refs[ext]}' not found")
+            continue
+        index.add(url, refs[ext], read_content(refs[ext]), ext)
+        added += 1
+    log_print(f"[DEBUG] Indexed {added} pages from '{mapping_file}' into '{path}'")
+    return index
@@ -0,0 +1,255 @@
+import gzip
+import io
+from collections import namedtuple
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+from urllib.robotparser import RobotFileParser
+import xml.etree.ElementTree as ET
+
+import requests
+from crawl4ai.deep_crawling.filters import URLFilter
+
+from crawl_tools.utils import log_print, normalize_url
+
+SitemapEntry = namedtuple("SitemapEntry", ["url", "lastmod"])
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+def _local_name(tag: str) -> str:
+    """Strip the XML namespace: '{http://www.sitemaps.org/...}loc' -> 'loc'."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def parse_lastmod(value: Optional[str]) -> Optional[float]:
+    """Parse a sitemap <lastmod> (W3C datetime, date only or full) into a unix timestamp."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class RobotsRules:
+    """robots.txt rules of one site: Disallow checks, Crawl-delay and Sitemap lines."""
+
+    def __init__(
+        self, site_url: str, user_agent: str = DEFAULT_USER_AGENT, timeout: float = 30, cache=None
+    ):
+        parsed = urlparse(site_url)
+        self.robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
+        self.user_agent = user_agent
+        self.parser = RobotFileParser(self.robots_url)
+        self.found = False
+        entry = cache.lookup(self.robots_url) if cache is not None else None
+        cached = cache.read(entry) if entry is not None else None
+        try:
+            if cached is not None:
+                self.parser.parse(cached.decode("utf-8", errors="replace").splitlines())
+                self.found = True
+            else:
+                response = requests.get(
+                    self.robots_url, headers={"User-Agent": user_agent}, timeout=timeout
+                )
+                if response.status_code == 200:
+                    self.parser.parse(response.text.splitlines())
+                    self.found = True
+                    if cache is not None:
+                        cache.store(
+                            self.robots_url, response.content, response.status_code, dict(response.headers)
+                        )
+                elif response.status_code in (401, 403):
+                    # Same convention as RobotFileParser.read(): access denied means disallow all
+                    self.parser.disallow_all = True
+                else:
+                    self.parser.allow_all = True
+        except requests.RequestException as e:
+            log_print(f"[WARNING] Could not fetch {self.robots_url}: {e}")
+            self.parser.allow_all = True
+        log_print(
+            f"[DEBUG] robots.txt {'loaded' if self.found else 'not found'} for {parsed.netloc}"
+            f"{' (from the fetch cache)' if cached is not None else ''} "
+            f"(crawl delay: {self.crawl_delay}, sitemaps: {len(self.sitemaps)})"
+        )
+
+    def can_fetch(self, url: str) -> bool:
+        return self.parser.can_fetch(self.user_agent, url)
+
+    @property
+    def crawl_delay(self) -> Optional[float]:
+        delay = self.parser.crawl_delay(self.user_agent)
+        return float(delay) if delay is not None else None
+
+    @property
+    def sitemaps(self) -> List[str]:
+        return list(self.parser.site_maps() or [])
+
+
+class RobotsFilter(URLFilter):
+    """Crawl4AI URL filter rejecting URLs disallowed by robots.txt."""
+
+    def __init__(self, rules: RobotsRules):
+        super().__init__()
+        self.rules = rules
+
+    def apply(self, url: str) -> bool:
+        passed = self.rules.can_fetch(url)
+        if not passed:
+            log_print(f"[DEBUG] Skipping {url} (disallowed by robots.txt)")
+        self._update_stats(passed)
+        return passed
+
+
+def _gunzip_stream(stream):
+    stream = io.BufferedReader(stream)
+    if stream.peek(2)[:2] == GZIP_MAGIC:
+        return gzip.GzipFile(fileobj=stream, mode="rb")
+    return stream
+
+
+def _open_cached(cache, sitemap_url: str):
+    entry = cache.lookup(sitemap_url)
+    if entry is None:
+        return None
+    try:
+        cached = cache.open(entry)
+    except OSError:
+        return None  # evicted by another process meanwhile
+    return cached, _gunzip_stream(cached)
+
+
+def _open_sitemap(sitemap_url: str, user_agent: str, timeout: float, cache=None):
+    """
+    Open a sitemap as a streaming file object, transparently gunzipping .xml.gz sitemaps.
+    With a FetchCache (see crawl_tools.fetch_cache), fresh sitemaps are read from it and
+    downloaded ones are copied into it first. Returns (closeable, stream).
+    """
+    opened = _open_cached(cache, sitemap_url) if cache is not None else None
+    if opened is not None:
+        return opened
+    response = requests.get(
+        sitemap_url, headers={"User-Agent": user_agent}, timeout=timeout, stream=True
+    )
+    response.raise_for_status()
+    response.raw.decode_content = True  # undo Content-Encoding: gzip
+    if cache is not None and cache.store_stream(
+        sitemap_url, response.raw, response.status_code, dict(response.headers)
+    ):
+        response.close()
+        return _open_cached(cache, sitemap_url) or _open_sitemap(sitemap_url, user_agent, timeout)
+    return response, _gunzip_stream(response.raw)
+
+
+def iter_sitemap(
+    sitemap_url: str,
+    user_agent: str = DEFAULT_USER_AGENT,
+    timeout: float = 60,
+    max_urls: Optional[int] = None,
+    cache=None,
+) -> Iterator[SitemapEntry]:
+    """
+    Stream <url> entries from a sitemap, following sitemap indexes recursively.
+    Documents are parsed incrementally and elements are cleared as they are consumed,
+    so memory stays flat even for 50k-entry sitemaps. Sitemaps go through cache (a
+    FetchCache) when given.
+    """
+    pending = [sitemap_url]
+    seen = set()
+    emitted = 0
+    while pending:
+        current = pending.pop(0)
+        if current in seen:
+            continue
+        seen.add(current)
+        try:
+            response, stream = _open_sitemap(current, user_agent, timeout, cache)
+        except requests.RequestException as e:
+            log_print(f"[WARNING] Could not fetch sitemap {current}: {e}")
+            continue
+        log_print(f"[DEBUG] Reading sitemap {current}")
+        loc, lastmod = None, None
+        try:
+            for _, element in ET.iterparse(stream, events=("end",)):
+                name = _local_name(element.tag)
+                if name == "loc":
+                    loc = (element.text or "").strip()
+                elif name == "lastmod":
+                    lastmod = parse_lastmod(element.text)
+                elif name == "sitemap":
+                    if loc:
+                        pending.append(urljoin(current, loc))
+                    loc, lastmod = None, None
+                    element.clear()
+                elif name == "url":
+                    if loc:
+                        yield SitemapEntry(urljoin(current, loc), lastmod)
+                        emitted += 1
+                        if max_urls is not None and emitted >= max_urls:
+                            return
+                    loc, lastmod = None, None
+                    element.clear()
+        except (ET.ParseError, OSError) as e:
+            log_print(f"[WARNING] Could not parse sitemap {current}: {e}")
+        finally:
+            response.close()
+
+
+def discover_sitemaps(start_url: str, rules: Optional[RobotsRules]) -> List[str]:
+    """Sitemaps listed in robots.txt, falling back to /sitemap.xml at the site root."""
+    if rules is not None and rules.sitemaps:
+        return rules.sitemaps
+    parsed = urlparse(start_url)
+    return [f"{parsed.scheme}://{parsed.netloc}/sitemap.xml"]
+
+
+def seed_urls(
+    start_url: str,
+    desired_base: str,
+    rules: Optional[RobotsRules] = None,
+    page_index=None,
+    user_agent: str = DEFAULT_USER_AGENT,
+    max_urls: Optional[int] = None,
+    cache=None,
+) -> Tuple[List[SitemapEntry], List[str]]:
+    """
+    Collect the sitemap URLs that should seed the crawl frontier: inside desired_base
+    and allowed by robots.txt. When a page index from a previous crawl is given, URLs
+    whose <lastmod> is older than their last fetch are returned separately as unchanged
+    so the crawl can skip them. Sitemaps are read through cache (a FetchCache) when given.
+    Returns (seeds, unchanged_urls).
+    """
+    seeds = []
+    unchanged = []
+    seen = set()
+    for sitemap_url in discover_sitemaps(start_url, rules):
+        for entry in iter_sitemap(sitemap_url, user_agent=user_agent, cache=cache):
+            norm_url = normalize_url(entry.url)
+            if norm_url in seen or not norm_url.startswith(desired_base):
+                continue
+            seen.add(norm_url)
+            if rules is not None and not rules.can_fetch(entry.url):
+                continue
+            if page_index is not None and entry.lastmod is not None:
+                previous = page_index.get(entry.url)
+                if previous is not None and previous.fetched >= entry.lastmod:
+                    unchanged.append(entry.url)
+                    continue
+            seeds.append(entry)
+            if max_urls is not None and len(seeds) >= max_urls:
+                break
+        if max_urls is not None and len(seeds) >= max_urls:
+            break
+    log_print(
+        f"[DEBUG] Seeded {len(seeds)} URLs from sitemaps ({len(unchanged)} unchanged since last crawl skipped)"
+    )
+    return seeds, unchanged
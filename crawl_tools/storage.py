@@ -0,0 +1,236 @@
+import gzip
+import json
+import os
+import time
+from typing import Dict, Optional
+
+from crawl_tools.utils import (
+    build_content_filename,
+    convert_to_utc_string,
+    log_print,
+)
+
+STORE_CHOICES = ["files", "gzip", "zstd", "shards"]
+
+# Separates the shard path from the "<offset>+<length>" part of a shard reference.
+SHARD_REF_SEP = "#"
+
+
+def _zstd():
+    """Import zstandard on demand, it is only needed for the zstd backends."""
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError(
+            "The zstd output backend requires the 'zstandard' package (pip install zstandard)"
+        ) from e
+    return zstandard
+
+
+def compress_bytes(data: bytes, compression: Optional[str], level: Optional[int] = None) -> bytes:
+    """Compress data as a single self-contained gzip member or zstd frame."""
+    if compression == "gzip":
+        return gzip.compress(data, compresslevel=level or 6)
+    if compression == "zstd":
+        return _zstd().ZstdCompressor(level=level or 3).compress(data)
+    return data
+
+
+def decompress_bytes(data: bytes, compression: Optional[str]) -> bytes:
+    if compression == "gzip":
+        return gzip.decompress(data)
+    if compression == "zstd":
+        return _zstd().ZstdDecompressor().decompress(data)
+    return data
+
+
+def compression_from_path(path: str) -> Optional[str]:
+    if path.endswith(".gz"):
+        return "gzip"
+    if path.endswith(".zst"):
+        return "zstd"
+    return None
+
+
+COMPRESSION_SUFFIX = {
+    None: "",
+    "gzip": ".gz",
+    "zstd": ".zst",
+}
+
+
+class FileStore:
+    """
+    One file per page, the layout used by save_content.
+    With compression set to "gzip" or "zstd" each file is compressed individually
+    and gets a .gz/.zst suffix on top of the content extension.
+    """
+
+    def __init__(self, data_folder: str, compression: Optional[str] = None, level: Optional[int] = None):
+        self.data_folder = data_folder
+        self.compression = compression
+        self.level = level
+        if compression == "zstd":
+            _zstd()  # fail at startup rather than on the first page
+        os.makedirs(self.data_folder, exist_ok=True)
+
+    def save(self, url: str, content: str, depth: int, ext: str, base_url: str) -> str:
+        """Write the page and return its filename (used as the reference in the URL mapping)."""
+        filename = build_content_filename(
+            url, depth, ext + COMPRESSION_SUFFIX[self.compression], base_url, self.data_folder
+        )
+        try:
+            with open(filename, "wb") as f:
+                f.write(compress_bytes(content.encode("utf-8"), self.compression, self.level))
+            log_print(f"[DEBUG] Saved '{filename}' (Size: {os.path.getsize(filename)} bytes)")
+        except PermissionError as pe:
+            log_print(f"[ERROR] Permission denied when writing to '{filename}': {pe}")
+        return filename
+
+    def close(self):
+        pass
+
+
+class ShardStore:
+    """
+    Rolling sharded archives holding many pages per file.
+
+    Every page is appended to the current shard as one JSON line
+    ({"url", "depth", "ext", "fetched", "content"}) compressed into its own gzip member
+    or zstd frame. Concatenated members are still a valid .gz/.zst stream, so a whole
+    shard can be read with zcat/zstdcat, while a single page can be read back by
+    seeking to its offset. Once a shard grows past shard_size bytes a new one is started.
+
+    Each save also appends {"url", "ref"} to a sidecar .idx.jsonl file so pages can be
+    looked up by URL without scanning the shards.
+    """
+
+    def __init__(
+        self,
+        data_folder: str,
+        compression: str = "gzip",
+        shard_size: int = 256 * 1024 * 1024,
+        prefix: str = "shard",
+        level: Optional[int] = None,
+    ):
+        self.data_folder = data_folder
+        self.compression = compression
+        self.shard_size = shard_size
+        self.level = level
+        if compression == "zstd":
+            _zstd()  # fail at startup rather than on the first page
+        os.makedirs(self.data_folder, exist_ok=True)
+        self.base_name = f"{prefix}_{convert_to_utc_string(int(time.time()))}_{os.getpid()}"
+        self.index_file = os.path.join(self.data_folder, f"{self.base_name}.idx.jsonl")
+        self._shard_number = -1
+        self._shard = None
+        self._shard_path = None
+        self._index = open(self.index_file, "a", encoding="utf-8")
+        self._roll()
+
+    def _roll(self):
+        if self._shard is not None:
+            self._shard.close()
+            log_print(f"[DEBUG] Closed shard '{self._shard_path}'")
+        self._shard_number += 1
+        self._shard_path = os.path.join(
+            self.data_folder,
+            f"{self.base_name}_{self._shard_number:05d}.jsonl{COMPRESSION_SUFFIX[self.compression]}",
+        )
+        self._shard = open(self._shard_path, "ab")
+
+    def save(self, url: str, content: str, depth: int, ext: str, base_url: str) -> str:
+        """Append the page to the current shard and return its "<shard>#<offset>+<length>" reference."""
+        record = {
+            "url": url,
+            "depth": depth,
+            "ext": ext,
+            "fetched": time.time(),
+            "content": content,
+        }
+        return self.append(url, record)
+
+    def append(self, url: str, record: dict) -> str:
+        """Append one JSON record for url as its own frame and return its reference."""
+        frame = compress_bytes(
+            (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"),
+            self.compression,
+            self.level,
+        )
+        if self._shard.tell() > 0 and self._shard.tell() + len(frame) > self.shard_size:
+            self._roll()
+        offset = self._shard.tell()
+        self._shard.write(frame)
+        self._shard.flush()
+        ref = f"{self._shard_path}{SHARD_REF_SEP}{offset}+{len(frame)}"
+        self._index.write(json.dumps({"url": url, "ref": ref}) + "\n")
+        self._index.flush()
+        log_print(f"[DEBUG] Saved {url} to '{ref}' (Size: {len(frame)} bytes)")
+        return ref
+
+    def close(self):
+        self._shard.close()
+        self._index.close()
+
+
+def parse_ref(ref: str):
+    """Split a storage reference into (path, offset, length); offset/length are None for plain files."""
+    path, sep, span = ref.rpartition(SHARD_REF_SEP)
+    if sep and "+" in span:
+        offset, length = span.split("+", 1)
+        if offset.isdigit() and length.isdigit():
+            return path, int(offset), int(length)
+    return ref, None, None
+
+
+def read_bytes(ref: str) -> bytes:
+    """Read the raw (decompressed) bytes behind a reference produced by FileStore or ShardStore."""
+    path, offset, length = parse_ref(ref)
+    with open(path, "rb") as f:
+        if offset is None:
+            data = f.read()
+        else:
+            f.seek(offset)
+            data = f.read(length)
+    return decompress_bytes(data, compression_from_path(path))
+
+
+def read_record(ref: str) -> dict:
+    """Return the JSON record behind a shard reference."""
+    return json.loads(read_bytes(ref).decode("utf-8"))
+
+
+def read_content(ref: str) -> str:
+    """Return the page content stored under ref, whichever backend wrote it."""
+    path, offset, _ = parse_ref(ref)
+    if offset is None:
+        return read_bytes(ref).decode("utf-8")
+    return read_record(ref)["content"]
+
+
+def load_shard_index(data_folder: str) -> Dict[str, str]:
+    """Load every .idx.jsonl sidecar in data_folder into a URL -> reference mapping (latest wins)."""
+    mapping = {}
+    for name in sorted(os.listdir(data_folder)):
+        if not name.endswith(".idx.jsonl"):
+            continue
+        with open(os.path.join(data_folder, name), "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    entry = json.loads(line)
+                    mapping[entry["url"]] = entry["ref"]
+    return mapping
+
+
+def create_store(store: str, data_folder: str, shard_size_mb: int = 256, compression: str = "gzip"):
+    """Build the output backend selected with --store."""
+    if store == "files":
+        return FileStore(data_folder)
+    if store in ("gzip", "zstd"):
+        return FileStore(data_folder, compression=store)
+    if store == "shards":
+        return ShardStore(
+            data_folder, compression=compression, shard_size=shard_size_mb * 1024 * 1024
+        )
+    raise ValueError(f"Unknown store '{store}', expected one of {STORE_CHOICES}")
@@ -0,0 +1,250 @@
+import asyncio
+import heapq
+import random
+import time
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from crawl4ai import CrawlResult
+from crawl4ai.async_dispatcher import RateLimiter
+
+from crawl_tools.utils import header_value, log_print, unwrap_result
+
+# Status codes that signal an overloaded or rate limiting host.
+CONGESTION_CODES = {429, 503}
+# Status codes worth retrying later.
+TRANSIENT_CODES = {408, 425, 429, 500, 502, 503, 504}
+# Substrings of Crawl4AI/Playwright error messages for transient network failures.
+TRANSIENT_ERRORS = (
+    "timeout",
+    "net::err_connection",
+    "net::err_timed_out",
+    "net::err_network",
+    "net::err_empty_response",
+    "net::err_http2",
+)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP date) into seconds from now."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_transient_failure(result: CrawlResult) -> bool:
+    """True for failures worth retrying: 408/425/429/5xx responses and network timeouts/resets."""
+    if result.status_code in TRANSIENT_CODES:
+        return True
+    if result.success:
+        return False
+    message = (result.error_message or "").lower()
+    return any(pattern in message for pattern in TRANSIENT_ERRORS)
+
+
+@dataclass
+class HostState:
+    concurrency: float
+    delay: float
+    in_flight: Dict[str, float] = field(default_factory=dict)  # url -> start time
+    last_request: float = 0.0
+    blocked_until: float = 0.0
+    latency: Optional[float] = None  # EWMA of response latency
+    best_latency: Optional[float] = None
+
+
+class AdaptiveRateLimiter(RateLimiter):
+    """
+    Per-host AIMD controller plugged into Crawl4AI's dispatcher as its rate limiter.
+
+    Each host has a concurrency limit and a delay between request starts. Every
+    successful, fast response increases the concurrency additively (by one per
+    window of `concurrency` responses) and shortens the delay by delay_step. A 429/503,
+    a transient failure, or a latency above latency_factor times the best observed
+    latency halves the concurrency and doubles the delay. Retry-After headers block
+    the host until they expire.
+
+    Crawl4AI calls wait_if_needed() before each request and update_delay() after it
+    when the response has a status code; record_result() should be called from the
+    result hook so failures without a status code and Retry-After headers are seen too.
+    """
+
+    def __init__(
+        self,
+        initial_delay: float = 1.0,
+        min_delay: float = 0.0,
+        max_delay: float = 60.0,
+        delay_step: float = 0.1,
+        max_concurrency: int = 4,
+        decrease_factor: float = 0.5,
+        latency_factor: float = 3.0,
+        stale_after: float = 600.0,
+    ):
+        super().__init__(base_delay=(initial_delay, initial_delay), max_delay=max_delay)
+        self.initial_delay = max(initial_delay, min_delay)
+        self.min_delay = min_delay
+        self.delay_step = delay_step
+        self.max_concurrency = max_concurrency
+        self.decrease_factor = decrease_factor
+        self.latency_factor = latency_factor
+        self.stale_after = stale_after
+        self.hosts: Dict[str, HostState] = {}
+        # set (and replaced) whenever a slot is released, waking every waiting request
+        self._released = asyncio.Event()
+
+    def host(self, url: str) -> HostState:
+        domain = self.get_domain(url)
+        state = self.hosts.get(domain)
+        if state is None:
+            state = self.hosts[domain] = HostState(concurrency=1.0, delay=self.initial_delay)
+        return state
+
+    def _prune_stale(self, state: HostState, now: float):
+        # requests that raised inside the crawler never reach update_delay
+        for url, started in list(state.in_flight.items()):
+            if now - started > self.stale_after:
+                del state.in_flight[url]
+
+    def _wait_time(self, state: HostState, now: float) -> float:
+        self._prune_stale(state, now)
+        if len(state.in_flight) >= max(1, int(state.concurrency)):
+            return -1  # wait for a slot to be released
+        return max(state.blocked_until - now, state.last_request + state.delay - now, 0.0)
+
+    async def wait_if_needed(self, url: str) -> None:
+        state = self.host(url)
+        # checking and taking a slot never awaits in between, so no lock is needed
+        while True:
+            now = time.time()
+            wait = self._wait_time(state, now)
+            if wait == 0:
+                break
+            released = self._released
+            try:
+                await asyncio.wait_for(released.wait(), timeout=wait if wait > 0 else self.stale_after)
+            except asyncio.TimeoutError:
+                pass
+        state.last_request = now
+        state.in_flight[url] = now
+
+    def _release(self, state: HostState, url: str) -> Optional[float]:
+        started = state.in_flight.pop(url, None)
+        if started is None:
+            return None
+        self._released.set()
+        self._released = asyncio.Event()
+        return time.time() - started
+
+    def _increase(self, state: HostState):
+        state.concurrency = min(self.max_concurrency, state.concurrency + 1.0 / state.concurrency)
+        state.delay = max(self.min_delay, state.delay - self.delay_step)
+
+    def _decrease(self, state: HostState, reason: str, url: str):
+        state.concurrency = max(1.0, state.concurrency * self.decrease_factor)
+        state.delay = min(self.max_delay, max(state.delay * 2, self.delay_step, self.min_delay))
+        log_print(
+            f"[INFO] Backing off {self.get_domain(url)} ({reason}): "
+            f"concurrency {state.concurrency:.2f}, delay {state.delay:.2f}s"
+        )
+
+    def _observe(self, url: str, status_code: Optional[int], transient: bool):
+        state = self.host(url)
+        latency = self._release(state, url)
+        if latency is None:
+            return  # already accounted for
+        if status_code in CONGESTION_CODES:
+            self._decrease(state, f"status {status_code}", url)
+            return
+        if transient:
+            self._decrease(state, "transient failure", url)
+            return
+        state.latency = latency if state.latency is None else 0.8 * state.latency + 0.2 * latency
+        if state.best_latency is None or state.latency < state.best_latency:
+            state.best_latency = state.latency
+        if state.latency > self.latency_factor * state.best_latency:
+            self._decrease(state, f"latency {state.latency:.2f}s", url)
+        else:
+            self._increase(state)
+
+    def update_delay(self, url: str, status_code: int) -> bool:
+        self._observe(url, status_code, status_code in TRANSIENT_CODES)
+        # retries are handled by RetryQueue, never let the dispatcher drop the result
+        return True
+
+    def record_result(self, result: CrawlResult):
+        """Feed a crawl result back from the hook: Retry-After and failures without a status code."""
+        state = self.host(result.url)
+        retry_after = parse_retry_after(header_value(result.response_headers, "retry-after"))
+        if retry_after:
+            state.blocked_until = max(state.blocked_until, time.time() + min(retry_after, self.max_delay))
+            log_print(f"[INFO] {self.get_domain(result.url)} asked to retry after {retry_after:.0f}s")
+        self._observe(result.url, result.status_code, is_transient_failure(result))
+
+
+class RetryQueue:
+    """
+    Transiently failed URLs waiting for another attempt, ordered by due time.
+    The n-th retry of a URL is due after min(max_backoff, base_backoff * 2**n) seconds
+    with +-25% jitter; URLs are given up after max_retries attempts.
+    """
+
+    def __init__(self, max_retries: int = 3, base_backoff: float = 5.0, max_backoff: float = 300.0):
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.attempts: Dict[str, int] = {}
+        self._heap: List[Tuple[float, str, int]] = []
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, result: CrawlResult) -> bool:
+        """Schedule a retry for a failed result; returns False once its retries are exhausted."""
+        if not is_transient_failure(result):
+            return False
+        attempt = self.attempts.get(result.url, 0)
+        if attempt >= self.max_retries:
+            log_print(f"[ERROR] Giving up on {result.url} after {attempt} retries")
+            return False
+        self.attempts[result.url] = attempt + 1
+        backoff = min(self.max_backoff, self.base_backoff * 2 ** attempt) * random.uniform(0.75, 1.25)
+        retry_after = parse_retry_after(header_value(result.response_headers, "retry-after"))
+        if retry_after:
+            backoff = max(backoff, min(retry_after, self.max_backoff))
+        depth = int((result.metadata or {}).get("depth", 0) or 0)
+        heapq.heappush(self._heap, (time.time() + backoff, result.url, depth))
+        log_print(f"[INFO] Retry {attempt + 1}/{self.max_retries} of {result.url} scheduled in {backoff:.1f}s")
+        return True
+
+    async def drain(
+        self,
+        crawler,
+        config,
+        handle_result: Callable[[CrawlResult], Awaitable[None]],
+        limiter: Optional[AdaptiveRateLimiter] = None,
+    ):
+        """
+        Re-crawl queued URLs as they become due (config must not deep crawl) and pass
+        each result to handle_result, which typically runs the save hook and may push
+        the URL again. Returns when the queue is empty.
+        """
+        while self._heap:
+            due, url, depth = heapq.heappop(self._heap)
+            wait = due - time.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            if limiter is not None:
+                await limiter.wait_if_needed(url)
+            result = unwrap_result(await crawler.arun(url, config=config))
+            if limiter is not None and result.status_code:
+                limiter.update_delay(url, result.status_code)
+            result.metadata = result.metadata or {}
+            result.metadata["depth"] = depth
+            await handle_result(result)
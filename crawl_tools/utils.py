@@ -1,21 +1,23 @@
 import time
 import re
 from urllib.parse import urlparse
-import html2text
-from bs4 import BeautifulSoup
 import os
 from datetime import datetime, timezone
 import textwrap
-from crawl4ai import CrawlResult
-import requests
-import time
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException
-from selenium.webdriver.support.ui import WebDriverWait
+from typing import TYPE_CHECKING
+
+# Heavy dependencies (html2text, BeautifulSoup, requests, crawl4ai) are imported
+# inside the functions that need them, so light consumers of this module (logging,
+# URL helpers, file naming) do not pay for the crawl stack at import time.
+# Browser-dependent helpers live in crawl_tools.browser.
+if TYPE_CHECKING:
+    from crawl4ai import CrawlResult
 
 
 def split_into_paragraphs(content, ext, width=80):
+    import html2text
+    from bs4 import BeautifulSoup
+
     if ext == ".md":
         converter = html2text.HTML2Text()
         converter.ignore_links = False
@@ -35,6 +37,9 @@ def split_into_paragraphs(content, ext, width=80):
 
 def convert_and_wrap(content, ext, width=80, verbose=False):
     """Convert HTML content to Markdown or plain text."""
+    import html2text
+    from bs4 import BeautifulSoup
+
     if ext == ".md":
         converter = html2text.HTML2Text()
         converter.ignore_links = False
@@ -57,14 +62,53 @@ def convert_and_wrap(content, ext, width=80, verbose=False):
         return content
 
 
-def convert_crawl_result(result: CrawlResult, ext, cleaned=True):
+# Output formats a page can be saved in, see convert_crawl_result.
+OUTPUT_FORMATS = [".md", ".raw.md", ".html", ".raw.html", ".txt"]
+# Formats holding text rather than HTML.
+TEXT_FORMATS = (".md", ".raw.md", ".txt")
+
+
+def html_to_text(html):
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(html, "html.parser").get_text(separator="\n")
+
+
+def convert_crawl_result(result: "CrawlResult", ext, cleaned=True):
+    """
+    Return one representation of a crawl result:
+    .md fit markdown, .raw.md raw markdown, .html fit html (the content filter's output),
+    .raw.html the rendered page, .txt plain text of the fit html.
+    cleaned=False selects the raw variant for .md/.html.
+    When the content filter kept nothing (empty fit html/markdown), the fit formats fall
+    back to the cleaned HTML and its markdown rather than saving an empty page.
+    """
+    if ext.startswith(".raw."):
+        ext, cleaned = ext[len(".raw"):], False
+    markdown = result.markdown
     if ext == ".html":
         if cleaned:
-            return result.fit_html
+            return markdown.fit_html or result.cleaned_html
         return result.html
-    if cleaned:
-        return result.markdown.fit_markdown
-    return result.markdown
+    if ext == ".txt":
+        return html_to_text(markdown.fit_html or result.cleaned_html or "")
+    if cleaned and markdown.fit_markdown:
+        return markdown.fit_markdown
+    return markdown.raw_markdown
+
+
+def convert_crawl_result_formats(result: "CrawlResult", exts):
+    """All requested representations of one result as {ext: content}, from a single CrawlResult."""
+    return {ext: convert_crawl_result(result, ext) for ext in exts}
+
+
+def unwrap_result(result) -> "CrawlResult":
+    """Return the CrawlResult behind the container crawler.arun() returns for a single URL."""
+    from crawl4ai import CrawlResult
+
+    if isinstance(result, CrawlResult):
+        return result
+    return result[0]
 
 
 def normalize_url(url):
@@ -90,32 +134,11 @@ def filter_queries(url):
         return url.split("?")[0]
     
 
-def response_url(url):
-    chrome_options = Options()
-    chrome_options.add_argument("--headless")
-    chrome_options.add_argument("--disable-gpu")
-    # Initialize the Chrome driver (ensure chromedriver is in PATH)
-    driver = webdriver.Chrome(options=chrome_options)
-    
-    try:
-        driver.set_page_load_timeout(300)
-        driver.get(url)
-        # Wait to ensure dynamic content loads.
-        time.sleep(5)
-        # Get the final URL after any redirections.
-        final_url = driver.current_url
-        driver.quit()
-        return final_url
-    
-    except TimeoutException as te:
-        driver.quit()
-        raise Exception("URL not accessible due to timeout: " + str(te))
-    except Exception as e:
-        driver.quit()
-        raise Exception("URL not accessible: " + str(e))    
-
 def convert_content(content, ext):
     """Convert HTML content to Markdown or plain text."""
+    import html2text
+    from bs4 import BeautifulSoup
+
     if ext == ".md":
         converter = html2text.HTML2Text()
         converter.ignore_links = False
@@ -141,6 +164,13 @@ def convert_to_utc_string(unix_timestamp):
     utc_datetime = datetime.fromtimestamp(unix_timestamp, tz=timezone.utc)
     return utc_datetime.strftime("%Y%m%d_%H%M%S%z")
 
+def header_value(headers, name: str):
+    """Value of an HTTP header from a dict with any key case, or None."""
+    for key, value in (headers or {}).items():
+        if key.lower() == name:
+            return value
+    return None
+
 def log_print(message: str):
     timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
     print(f"({timestamp} UTC) {message}")
@@ -163,15 +193,20 @@ def get_page_slug(url, base_url):
     return slug
 
 
-def save_content(url, content, depth, ext, base_url, data_folder):
-    """Convert, clean, and save content to a file; return the filename."""
-    # converted = convert_content(content, ext)
-    # cleaned = clean_text(content)
+def build_content_filename(url, depth, ext, base_url, data_folder):
+    """Build the output path for a page: data_folder/scraped_content_depth<d>_<slug>_<timestamp><ext>."""
     slug = get_page_slug(url, base_url)
     timestamp = convert_to_utc_string(int(time.time()))
-    filename = os.path.join(
+    return os.path.join(
         data_folder, f"scraped_content_depth{depth}_{slug}_{timestamp}{ext}"
     )
+
+
+def save_content(url, content, depth, ext, base_url, data_folder):
+    """Convert, clean, and save content to a file; return the filename."""
+    # converted = convert_content(content, ext)
+    # cleaned = clean_text(content)
+    filename = build_content_filename(url, depth, ext, base_url, data_folder)
     try:
         with open(filename, "w", encoding="utf-8") as f:
             f.write(content)
@@ -195,6 +230,8 @@ def send_file_to_api(file_path: str, prompt_url: str) -> dict:
     }
     and returns the JSON response.
     """
+    import requests
+
     # Read markdown content
     with open(file_path, "r", encoding="utf-8") as f:
         markdown_content = f.read()
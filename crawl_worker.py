@@ -0,0 +1,180 @@
+import asyncio
+import os
+import argparse
+import subprocess
+import sys
+
+from crawl_tools import (
+    log_print,
+    response_url,
+    PAGE_INDEX_DIRNAME,
+    create_frontier,
+    add_crawl_arguments,
+    check_crawl_arguments,
+    settings_from_args,
+    setup_logging,
+    open_fetch_cache,
+    run_cli,
+)
+
+# Output folders (created when the crawl starts)
+DATA_FOLDER = "data"
+DEBUG_FOLDER = "debug"
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="Crawl a website with several coordinated workers sharing one frontier. "
+        "Run with --spawn N to seed the frontier and start N local workers, or with --worker_index/--num_workers "
+        "to start a single worker (e.g. one per machine against a redis:// frontier)."
+    )
+    add_crawl_arguments(parser)
+    parser.add_argument(
+        "--frontier",
+        default=None,
+        help="Shared frontier: sqlite:///<path> (single host, default: sqlite:///debug/frontier_<url>.db) "
+        "or redis://host:port/db[#prefix] (multi-node)",
+    )
+    parser.add_argument(
+        "--spawn",
+        type=int,
+        default=0,
+        help="Coordinator mode: seed the frontier with the start URL (and its sitemaps with --sitemaps) "
+        "and run this many local worker processes.",
+    )
+    parser.add_argument(
+        "--worker_index",
+        type=int,
+        default=0,
+        help="Index of this worker, from 0 to --num_workers - 1 (default: 0).",
+    )
+    parser.add_argument(
+        "--num_workers",
+        type=int,
+        default=1,
+        help="Total number of workers sharing the frontier (default: 1).",
+    )
+    parser.add_argument(
+        "--batch_size",
+        type=int,
+        default=10,
+        help="Number of URLs claimed from the frontier at a time (default: 10).",
+    )
+    parser.add_argument(
+        "--lease",
+        type=float,
+        default=600,
+        help="Seconds a claimed URL stays leased; a live worker renews it while crawling, so it only "
+        "runs out when the worker dies or stalls (default: 600).",
+    )
+    parser.add_argument(
+        "--max_attempts",
+        type=int,
+        default=3,
+        help="Claims of a URL whose lease keeps expiring (its worker crashes or stalls) before it is marked failed (default: 3).",
+    )
+    args = parser.parse_args()
+    check_crawl_arguments(parser, args)
+    for flag in ("paginate", "max_inflight_mb"):
+        if getattr(args, flag):
+            parser.error(f"--{flag} is not supported by crawl_worker.py")
+    return args
+
+
+def spawn_workers(args):
+    """Coordinator: launch args.spawn local workers running this script and wait for them."""
+    base_cmd = [sys.executable, os.path.abspath(__file__)]
+    skip = {"--spawn", "--worker_index", "--num_workers"}
+    argv = sys.argv[1:]
+    forwarded = []
+    i = 0
+    while i < len(argv):
+        flag = argv[i].split("=", 1)[0]
+        if flag in skip:
+            i += 1 if "=" in argv[i] else 2
+            continue
+        forwarded.append(argv[i])
+        i += 1
+    processes = [
+        subprocess.Popen(
+            base_cmd + forwarded
+            + ["--frontier", args.frontier, "--worker_index", str(index), "--num_workers", str(args.spawn)]
+        )
+        for index in range(args.spawn)
+    ]
+    log_print(f"[INFO] Spawned {len(processes)} workers on frontier {args.frontier}")
+    return max(process.wait() for process in processes)
+
+
+def seed_sitemaps(args, settings, frontier):
+    """Coordinator: add the site's sitemap URLs to the frontier at depth 1."""
+    from crawl_tools import RobotsRules, seed_urls
+
+    fetch_cache = open_fetch_cache(args)
+    try:
+        robots_rules = RobotsRules(settings.url, cache=fetch_cache)
+        seeds, _ = seed_urls(
+            settings.url,
+            settings.desired_base,
+            rules=robots_rules if settings.robots else None,
+            max_urls=settings.max_seed_urls,
+            cache=fetch_cache,
+        )
+    finally:
+        if fetch_cache is not None:
+            fetch_cache.close()
+    added = frontier.add([(entry.url, 1) for entry in seeds])
+    log_print(f"[DEBUG] Seeded frontier with {added} sitemap URLs")
+
+
+async def main(
+    data_folder=DATA_FOLDER,
+    debug_folder=DEBUG_FOLDER,
+):
+    args = parse_arguments()
+    role = "coordinator" if args.spawn else f"worker{args.worker_index}"
+    settings = settings_from_args(
+        args,
+        url=response_url(args.url),
+        data_folder=data_folder,
+        debug_folder=debug_folder,
+    )
+    # the page index has a single writer, so each worker keeps its own
+    settings.page_index_dir = os.path.join(settings.site_folder, PAGE_INDEX_DIRNAME, role)
+
+    if args.frontier is None:
+        args.frontier = "sqlite:///" + os.path.join(
+            debug_folder, f"frontier_{settings.desired_base.replace('/', '%')}.db"
+        )
+
+    if args.spawn:
+        setup_logging(args, settings, f"_{role}")
+        frontier = create_frontier(args.frontier, max_attempts=args.max_attempts)
+        added = frontier.add([(settings.url, 0)])
+        log_print(f"[DEBUG] Seeded frontier {args.frontier} with {settings.url} ({added} new)")
+        if settings.sitemaps:
+            seed_sitemaps(args, settings, frontier)
+        frontier.close()
+        return spawn_workers(args)
+
+    frontier = create_frontier(args.frontier, max_attempts=args.max_attempts)
+    try:
+        await run_cli(
+            args,
+            settings,
+            crawl=lambda engine: engine.crawl_frontier(
+                settings,
+                frontier,
+                args.worker_index,
+                args.num_workers,
+                batch_size=args.batch_size,
+                lease_seconds=args.lease,
+            ),
+            log_suffix=f"_{role}",
+        )
+    finally:
+        frontier.close()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
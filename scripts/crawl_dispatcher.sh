@@ -31,6 +31,12 @@ if [ -z "$TASKS" ] || ! echo "$TASKS" | jq -e 'type == "array"' > /dev/null; the
   exit 1
 fi
 
+# Cache condivisa dei fetch tra i crawl (opzionale: FETCH_CACHE=<dir> nel .env)
+CACHE_ARGS=()
+if [ -n "$FETCH_CACHE" ]; then
+  CACHE_ARGS=(--fetch_cache "$FETCH_CACHE")
+fi
+
 # Itera su ogni task ricevuto
 echo "$TASKS" | jq -c '.[]' | while read -r task; do
   ID=$(echo "$task" | jq '.id')
@@ -44,7 +50,7 @@ echo "$TASKS" | jq -c '.[]' | while read -r task; do
     if [ "$ACTIVE" -lt "$MAX_PROCESSES" ]; then
       echo "[INFO] Avvio crawl_with_sleep per Task ID $ID"
       echo "[CMD] crawl_with_sleep.py -u \"$URL\" -d $DEEP"
-      python3 crawl_with_sleep.py -u "$URL" -d "$DEEP" -s 1 --ext ".md" &
+      python3 crawl_with_sleep.py -u "$URL" -d "$DEEP" -s 1 --ext ".md" "${CACHE_ARGS[@]}" &
       sleep 1
       break
     else
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+search.py
+
+This script:
+1. Takes in the following arguments:
+   - query (free text)
+   - search index (a crawl's <data folder>/.search.db, or the data folder itself)
+   - number of results (default: 10)
+   - mapping (optional): a debug URL -> filename mapping to index first
+2. With --mapping, adds (or updates) the pages of an earlier crawl in the index.
+3. Prints the best matching pages, ranked with BM25, one per line:
+   <score> <url> <file or shard reference>, or as JSON with --json.
+"""
+
+import os
+import sys
+import json
+import argparse
+
+from crawl_tools import SEARCH_INDEX_FILENAME, SearchIndex, build_search_index
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Search the saved pages of a crawl and print ranked URLs and files."
+    )
+    parser.add_argument(
+        "query",
+        nargs="*",
+        help="Words to search for."
+    )
+    parser.add_argument(
+        "-i", "--index",
+        required=True,
+        help=f"Search index file, or the crawl's data folder containing {SEARCH_INDEX_FILENAME}."
+    )
+    parser.add_argument(
+        "-n", "--top",
+        type=int,
+        default=10,
+        help="Number of results to print (default: 10)."
+    )
+    parser.add_argument(
+        "-m", "--mapping",
+        help="Index the pages of this debug URL -> filename mapping before searching (updates the index)."
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the results as a JSON list."
+    )
+    args = parser.parse_args()
+    if not args.query and not args.mapping:
+        parser.error("a query is required unless --mapping is given")
+    return args
+
+
+def resolve_index_path(path: str) -> str:
+    if os.path.isdir(path):
+        return os.path.join(path, SEARCH_INDEX_FILENAME)
+    return path
+
+
+def main():
+    args = parse_args()
+    path = resolve_index_path(args.index)
+
+    if args.mapping:
+        build_search_index(args.mapping, path).close()
+    if not args.query:
+        return
+    if not os.path.exists(path):
+        sys.exit(f"No search index at '{path}'")
+
+    index = SearchIndex(path, readonly=True)
+    hits = index.search(" ".join(args.query), top=args.top)
+    index.close()
+    if args.json:
+        print(json.dumps([hit._asdict() for hit in hits], indent=2, ensure_ascii=False))
+        return
+    for hit in hits:
+        print(f"{hit.score:8.3f}  {hit.url}  {hit.ref}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,10 +9,13 @@ This script:
    - output directory (default: prompted/)
    - debug directory (default: debug)
    - verbose (boolean)
-2. Iterates over all .md files in the input directory (recursively).
+2. Iterates over all .md files (optionally .md.gz/.md.zst) in the input directory (recursively).
 3. Sends the contents of each file via POST to an API (prompt URL).
 4. Saves the JSON response in the output directory, preserving subfolder structure.
    The output filename is the same as the .md file name, but with a .json extension.
+   With --index, pages are read from the crawl's page index instead (optionally filtered
+   by --max-depth/--since), so no directory walk is needed.
+   With --query, only the --top best matching pages of the crawl's search index are sent.
 5. Logs all activity using DualLogger and log_print from crawl_tools.
 """
 
@@ -22,8 +25,21 @@ import argparse
 import requests
 import json
 from pathlib import Path
+from datetime import datetime, timezone
 
-from crawl_tools import DualLogger, log_print
+from crawl_tools import (
+    DualLogger,
+    log_print,
+    read_content,
+    PageIndex,
+    SEARCH_INDEX_FILENAME,
+    SearchIndex,
+    Profiler,
+    activity,
+)
+from crawl_tools.page_index import url_hash
+
+MARKDOWN_SUFFIXES = (".md", ".md.gz", ".md.zst")
 
 
 def parse_args():
@@ -32,8 +48,7 @@ def parse_args():
     )
     parser.add_argument(
         "-i", "--input-directory",
-        required=True,
-        help="Path to the input directory containing .md files."
+        help="Path to the input directory containing .md files (required unless --index is given)."
     )
     parser.add_argument(
         "-p", "--prompt-url",
@@ -50,12 +65,55 @@ def parse_args():
         default="debug",
         help="Path to the directory where debug logs will be stored (default: 'debug')."
     )
+    parser.add_argument(
+        "--index",
+        help="Read pages from a crawl's page index directory (<data folder>/.index) instead of walking the input directory."
+    )
+    parser.add_argument(
+        "--max-depth",
+        type=int,
+        default=None,
+        help="With --index, only send pages crawled at this depth or shallower."
+    )
+    parser.add_argument(
+        "--since",
+        type=parse_since,
+        default=None,
+        help="With --index, only send pages fetched after this time (unix timestamp or ISO 8601)."
+    )
+    parser.add_argument(
+        "--query",
+        default=None,
+        help="Only send the pages best matching this query (BM25 over the crawl's search index)."
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=20,
+        help="With --query, number of best matching pages to send (default: 20)."
+    )
+    parser.add_argument(
+        "--search-index",
+        default=None,
+        help=f"With --query, the search index to use (default: <input directory>/{SEARCH_INDEX_FILENAME})."
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Sample the run's stacks into a folded stacks file in the debug directory (for flamegraph.pl / "
+        "speedscope) and log a summary of where the time went per file."
+    )
     parser.add_argument(
         "-v", "--verbose",
         action="store_true",
         help="Enable verbose mode. Logs will also be printed to the console."
     )
-    return parser.parse_args()
+    args = parser.parse_args()
+    if not args.input_directory and not args.index:
+        parser.error("one of --input-directory or --index is required")
+    if args.query and not args.input_directory and not args.search_index:
+        parser.error("--query needs --input-directory or --search-index")
+    return args
 
 
 def send_file_to_api(file_path: str, prompt_url: str) -> dict:
@@ -69,9 +127,8 @@ def send_file_to_api(file_path: str, prompt_url: str) -> dict:
     }
     and returns the JSON response.
     """
-    # Read markdown content
-    with open(file_path, "r", encoding="utf-8") as f:
-        markdown_content = f.read()
+    # Read markdown content (transparently decompressing .md.gz/.md.zst files)
+    markdown_content = read_content(file_path)
 
     # Prepare request payload
     payload = {
@@ -96,6 +153,59 @@ def send_file_to_api(file_path: str, prompt_url: str) -> dict:
     return response.json()
 
 
+def iter_markdown_files(input_dir: str, output_dir: str):
+    """Walk input_dir for markdown files, yielding (file_path, mirrored output .json path)."""
+    for root, _, files in os.walk(input_dir):
+        for filename in files:
+            # .raw.md files of multi-format crawls duplicate the fit markdown of the same page
+            if filename.lower().endswith(MARKDOWN_SUFFIXES) and ".raw.md" not in filename.lower():
+                file_path = os.path.join(root, filename)
+
+                # Build mirrored output path
+                relative_path = os.path.relpath(file_path, start=input_dir)
+                output_file_path = os.path.join(output_dir, relative_path)
+                output_file_path = output_file_path[: output_file_path.lower().rindex(".md")] + ".json"
+                yield file_path, output_file_path
+
+
+def iter_indexed_pages(index_dir: str, output_dir: str, max_depth=None, since=None):
+    """
+    Read markdown pages from a crawl's page index instead of walking the data folder,
+    yielding (storage reference, output .json path). Output files are named after the
+    URL hash since sharded pages have no file of their own.
+    """
+    index = PageIndex(index_dir, readonly=True)
+    log_print(f"[DEBUG] Reading pages from index '{index_dir}' ({len(index)} records)")
+    for entry in index.iter_entries(max_depth=max_depth, since=since, ext=".md"):
+        yield entry.ref, os.path.join(output_dir, f"{url_hash(entry.url):016x}.json")
+    index.close()
+
+
+def iter_search_hits(search_index: str, query: str, top: int, output_dir: str):
+    """
+    Yield (storage reference, output .json path) for the top pages matching query in a
+    crawl's search index, best first. Output files are named after the URL hash.
+    """
+    index = SearchIndex(search_index, readonly=True)
+    hits = index.search(query, top=top)
+    index.close()
+    log_print(f"[DEBUG] {len(hits)} pages match '{query}' in '{search_index}'")
+    for hit in hits:
+        log_print(f"[DEBUG] {hit.score:.3f} {hit.url}")
+        yield hit.ref, os.path.join(output_dir, f"{url_hash(hit.url):016x}.json")
+
+
+def parse_since(value: str) -> float:
+    """Accept a unix timestamp or an ISO 8601 date/datetime (UTC if no offset is given)."""
+    try:
+        return float(value)
+    except ValueError:
+        parsed = datetime.fromisoformat(value)
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+
+
 def main():
     args = parse_args()
 
@@ -113,42 +223,52 @@ def main():
     log_print(f"[DEBUG] Debug directory: {args.debug_directory}")
     log_print(f"[DEBUG] Verbose: {args.verbose}")
 
+    profiler = None
+    if args.profile:
+        profiler = Profiler(
+            os.path.join(
+                args.debug_directory,
+                f"send_to_prompt_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.folded",
+            )
+        ).start()
+
     # Absolute paths for clarity
-    input_dir = os.path.abspath(args.input_directory)
+    input_dir = os.path.abspath(args.input_directory or args.index)
     output_dir = os.path.abspath(args.output_directory)
     prompt_url = args.prompt_url
 
-    # Walk the input directory for .md files
-    for root, _, files in os.walk(input_dir):
-        for filename in files:
-            if filename.lower().endswith(".md"):
-                file_path = os.path.join(root, filename)
-
-                # Build mirrored output path
-                relative_path = os.path.relpath(file_path, start=input_dir)
-                output_file_path = os.path.join(output_dir, relative_path)
-                output_file_path = os.path.splitext(output_file_path)[0] + ".json"
+    if args.query:
+        search_index = args.search_index or os.path.join(input_dir, SEARCH_INDEX_FILENAME)
+        pages = iter_search_hits(search_index, args.query, args.top, output_dir)
+    elif args.index:
+        pages = iter_indexed_pages(args.index, output_dir, args.max_depth, args.since)
+    else:
+        pages = iter_markdown_files(input_dir, output_dir)
 
-                # Ensure the output directory structure exists
-                Path(os.path.dirname(output_file_path)).mkdir(parents=True, exist_ok=True)
+    for file_path, output_file_path in pages:
+        # Ensure the output directory structure exists
+        Path(os.path.dirname(output_file_path)).mkdir(parents=True, exist_ok=True)
 
-                log_print(f"[INFO] Processing file: {file_path}")
+        log_print(f"[INFO] Processing file: {file_path}")
 
-                # Send to API and save response
-                try:
-                    response_json = send_file_to_api(file_path, prompt_url)
-                    with open(output_file_path, "w", encoding="utf-8") as out_f:
-                        if isinstance(response_json, (dict, list)):
-                            json.dump(response_json, out_f, indent=2, ensure_ascii=False)
-                        else:
-                            out_f.write(str(response_json))
+        # Send to API and save response
+        with activity(f"send_to_prompt {file_path}"):
+            try:
+                response_json = send_file_to_api(file_path, prompt_url)
+                with open(output_file_path, "w", encoding="utf-8") as out_f:
+                    if isinstance(response_json, (dict, list)):
+                        json.dump(response_json, out_f, indent=2, ensure_ascii=False)
+                    else:
+                        out_f.write(str(response_json))
 
-                    log_print(f"[DEBUG] Output JSON saved to: {output_file_path}")
+                log_print(f"[DEBUG] Output JSON saved to: {output_file_path}")
 
-                except Exception as e:
-                    log_print(f"[ERROR] Failed to process file {file_path}: {e}")
+            except Exception as e:
+                log_print(f"[ERROR] Failed to process file {file_path}: {e}")
 
     log_print("[DEBUG] Finished processing all markdown files.")
+    if profiler is not None:
+        profiler.stop()
 
 
 if __name__ == "__main__":
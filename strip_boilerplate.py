@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+strip_boilerplate.py
+
+This script:
+1. Takes in the following arguments:
+   - input directory (the data folder of a crawl)
+   - output directory (default: rewrite the files in place)
+   - debug directory (default: debug)
+   - verbose (boolean)
+2. Loads the boilerplate template learned during the crawl (<data folder>/.boilerplate.json,
+   or --state), or learns it afresh from the saved pages themselves with --learn.
+3. Strips the boilerplate blocks from every saved .md/.raw.md/.txt page (optionally
+   .gz/.zst), e.g. pages saved before the crawl had seen enough of the site.
+   Shard archives are not rewritten. Pages rewritten in place are re-added to the
+   page index and the search index of the data folder, if the crawl built them
+   (the crawl must not be running).
+4. Logs all activity using DualLogger and log_print from crawl_tools.
+"""
+
+import os
+import sys
+import argparse
+from collections import defaultdict
+
+from crawl_tools import (
+    DualLogger,
+    log_print,
+    read_content,
+    BOILERPLATE_FILENAME,
+    BoilerplateDetector,
+    PAGE_INDEX_DIRNAME,
+    PageIndex,
+    SEARCH_INDEX_FILENAME,
+    SearchIndex,
+)
+from crawl_tools.utils import TEXT_FORMATS
+from crawl_tools.storage import compress_bytes, compression_from_path, parse_ref
+
+COMPRESSION_SUFFIXES = (".gz", ".zst")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Strip site-wide boilerplate blocks from the saved pages of a crawl."
+    )
+    parser.add_argument(
+        "-i", "--input-directory",
+        required=True,
+        help="Data folder of the crawl (data/<host>/<path>)."
+    )
+    parser.add_argument(
+        "-o", "--output-directory",
+        default=None,
+        help="Write stripped copies here, mirroring the input tree (default: rewrite files in place)."
+    )
+    parser.add_argument(
+        "--state",
+        default=None,
+        help=f"Boilerplate state file (default: <input directory>/{BOILERPLATE_FILENAME})."
+    )
+    parser.add_argument(
+        "--learn",
+        action="store_true",
+        help="Learn the template from the saved pages first, replacing the state file when it exists."
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.5,
+        help="Fraction of pages a block must appear on to count as boilerplate (default: 0.5)."
+    )
+    parser.add_argument(
+        "--min-pages",
+        type=int,
+        default=20,
+        help="Minimum number of pages seen before anything is stripped (default: 20)."
+    )
+    parser.add_argument(
+        "-d", "--debug-directory",
+        default="debug",
+        help="Path to the directory where debug logs will be stored (default: 'debug')."
+    )
+    parser.add_argument(
+        "-v", "--verbose",
+        action="store_true",
+        help="Enable verbose mode. Logs will also be printed to the console."
+    )
+    return parser.parse_args()
+
+
+def iter_text_files(input_dir: str):
+    """Walk input_dir for saved text pages, skipping hidden folders (.index, .archive) and shards."""
+    for root, dirs, files in os.walk(input_dir):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        for filename in sorted(files):
+            name = filename
+            for suffix in COMPRESSION_SUFFIXES:
+                if name.endswith(suffix):
+                    name = name[: -len(suffix)]
+            if name.endswith(TEXT_FORMATS) and not name.endswith(".jsonl"):
+                yield os.path.join(root, filename)
+
+
+def page_stem(file_path: str) -> str:
+    """The path of a saved page without its format and compression suffixes, shared by all its formats."""
+    for suffix in COMPRESSION_SUFFIXES:
+        if file_path.endswith(suffix):
+            file_path = file_path[: -len(suffix)]
+    # longest first: .raw.md before .md
+    for ext in sorted(TEXT_FORMATS, key=len, reverse=True):
+        if file_path.endswith(ext):
+            return file_path[: -len(ext)]
+    return file_path
+
+
+def open_indexes(input_dir: str):
+    """
+    The page index and search index of a data folder, when they exist, and the
+    entries of its plain files: {absolute path: (url, depth, ext, ref, fetched)}.
+    Files only in the search index get their modification time as fetch time.
+    """
+    page_index, search_index, entries = None, None, {}
+    index_dir = os.path.join(input_dir, PAGE_INDEX_DIRNAME)
+    if os.path.isdir(index_dir):
+        page_index = PageIndex(index_dir)
+        for entry in page_index.iter_entries():
+            path, offset, _ = parse_ref(entry.ref)
+            if offset is None:
+                entries[os.path.abspath(path)] = (
+                    entry.url, entry.depth, entry.ext, entry.ref, entry.fetched
+                )
+    search_path = os.path.join(input_dir, SEARCH_INDEX_FILENAME)
+    if os.path.exists(search_path):
+        search_index = SearchIndex(search_path)
+        for url, ext, ref in search_index.docs():
+            path, offset, _ = parse_ref(ref)
+            if offset is None and os.path.abspath(path) not in entries and os.path.exists(path):
+                entries[os.path.abspath(path)] = (url, 0, ext, ref, os.path.getmtime(path))
+    return page_index, search_index, entries
+
+
+def main():
+    args = parse_args()
+
+    os.makedirs(args.debug_directory, exist_ok=True)
+    sys.stdout = DualLogger(
+        os.path.join(args.debug_directory, "strip_boilerplate"), verbose=args.verbose
+    )
+
+    input_dir = os.path.abspath(args.input_directory)
+    output_dir = os.path.abspath(args.output_directory) if args.output_directory else input_dir
+    state_path = args.state or os.path.join(input_dir, BOILERPLATE_FILENAME)
+    log_print(f"[DEBUG] Input directory: {input_dir}")
+    log_print(f"[DEBUG] Output directory: {output_dir}")
+    log_print(f"[DEBUG] State file: {state_path}")
+
+    if not args.learn and not os.path.exists(state_path):
+        log_print(f"[ERROR] No boilerplate state at '{state_path}', run with --learn")
+        sys.exit(1)
+    # --learn starts from scratch: the saved pages include every page the crawl
+    # observed, so adding them to its state would count them twice
+    detector = BoilerplateDetector(
+        threshold=args.threshold, min_pages=args.min_pages, path=None if args.learn else state_path
+    )
+
+    files = list(iter_text_files(input_dir))
+    if args.learn:
+        # the formats of one page are observed together, so each page counts once
+        pages = defaultdict(list)
+        for file_path in files:
+            pages[page_stem(file_path)].append(file_path)
+        for page_files in pages.values():
+            detector.observe([read_content(file_path) for file_path in page_files])
+        detector.save(state_path)
+
+    page_index, search_index, entries = None, None, {}
+    if output_dir == input_dir:
+        page_index, search_index, entries = open_indexes(input_dir)
+    reindexed = 0
+
+    bytes_before, bytes_after = 0, 0
+    for file_path in files:
+        content = read_content(file_path)
+        stripped = detector.strip(content)
+        bytes_before += len(content.encode("utf-8"))
+        bytes_after += len(stripped.encode("utf-8"))
+        output_path = os.path.join(output_dir, os.path.relpath(file_path, start=input_dir))
+        if stripped == content and output_path == file_path:
+            continue
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        with open(output_path, "wb") as f:
+            f.write(compress_bytes(stripped.encode("utf-8"), compression_from_path(output_path)))
+        log_print(f"[DEBUG] Stripped {file_path} -> {output_path}")
+        entry = entries.get(file_path)
+        if entry is not None:
+            # keep the indexes' sizes, content hashes and postings in step with the file
+            url, depth, ext, ref, fetched = entry
+            if page_index is not None:
+                # the original fetch time, so sitemap lastmod checks still see the page as old
+                page_index.add(url, ref, depth, stripped, ext, fetched=fetched)
+            if search_index is not None and search_index.has(url, ext):
+                search_index.add(url, ref, stripped, ext)
+            reindexed += 1
+
+    if page_index is not None:
+        page_index.compact()
+        page_index.close()
+    if search_index is not None:
+        search_index.close()
+    log_print(
+        f"[INFO] Processed {len(files)} files: {bytes_before} -> {bytes_after} bytes of text, "
+        f"{reindexed} pages re-indexed"
+    )
+
+
+if __name__ == "__main__":
+    main()
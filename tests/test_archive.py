@@ -0,0 +1,93 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from crawl_tools.archive import FetchArchive, replay_archive
+from crawl_tools.engine import CrawlEngine, CrawlSettings, _Crawl
+from crawl_tools.storage import load_shard_index, read_record
+from crawl_tools.utils import convert_crawl_result_formats
+
+URL = "https://example.com/docs/page"
+EXTS = [".md", ".raw.md", ".html", ".txt"]
+
+PAGE = """<html><head><title>Archived page</title></head><body>
+<nav><a href="/">Home</a> | <a href="/docs/">Docs</a></nav>
+<article>
+<h1>Replaying the fetch archive</h1>
+<p>The archive keeps the rendered HTML of every page, so the conversion settings can be
+changed later and applied again without fetching anything over the network.</p>
+<p>Each record holds the status code, the response headers and the final URL after
+redirects, next to the HTML itself. See <a href="/docs/other">the other page</a>.</p>
+<ul><li>First point of the list, long enough to survive pruning.</li>
+<li>Second point of the list, also long enough to be kept.</li></ul>
+</article>
+<footer>Copyright example.com</footer>
+</body></html>"""
+
+
+def fetched(html=PAGE):
+    return SimpleNamespace(
+        url=URL,
+        html=html,
+        status_code=200,
+        response_headers={"content-type": "text/html"},
+        redirected_url=URL + "/",
+    )
+
+
+def test_record_round_trip(tmp_path):
+    archive = FetchArchive(str(tmp_path / "archive"))
+    archive.record(fetched("<p>old</p>"), 1)
+    archive.record(fetched(), 2)
+    archive.close()
+
+    # the latest recording of a URL wins
+    refs = load_shard_index(str(tmp_path / "archive"))
+    assert list(refs) == [URL]
+    record = read_record(refs[URL])
+    assert record["html"] == PAGE
+    assert record["depth"] == 2
+    assert record["status_code"] == 200
+    assert record["response_headers"] == {"content-type": "text/html"}
+    assert record["redirected_url"] == URL + "/"
+
+
+def test_replay_yields_the_saved_formats_of_the_live_crawl(tmp_path):
+    pytest.importorskip("crawl4ai")
+    from crawl4ai import CrawlResult
+
+    # convert the page the way AsyncWebCrawler.aprocess_html does with the live run config
+    settings = CrawlSettings(url=URL, data_folder=str(tmp_path / "data"), debug_folder=str(tmp_path / "debug"))
+    config = _Crawl(CrawlEngine(), settings)._run_config()
+    params = {k: v for k, v in config.to_dict().items() if k != "url"}
+    scraped = config.scraping_strategy.scrap(URL, PAGE, **params)
+    live = CrawlResult(
+        url=URL,
+        html=PAGE,
+        success=True,
+        cleaned_html=scraped.cleaned_html,
+        markdown=config.markdown_generator.generate_markdown(cleaned_html=scraped.cleaned_html, base_url=URL),
+        status_code=200,
+    )
+    expected = convert_crawl_result_formats(live, EXTS)
+    assert "Replaying the fetch archive" in expected[".md"]
+
+    archive = FetchArchive(str(tmp_path / "archive"))
+    archive.record(fetched(), 1)
+    archive.close()
+
+    replayed = []
+
+    async def handle(result):
+        replayed.append(result)
+
+    done = asyncio.run(
+        replay_archive(str(tmp_path / "archive"), handle, pruning_threshold=settings.pruning_threshold, workers=1)
+    )
+    assert done == 1
+    (result,) = replayed
+    assert result.success, result.error_message
+    assert result.metadata["depth"] == 1
+    assert (result.status_code, result.redirected_url) == (200, URL + "/")
+    assert convert_crawl_result_formats(result, EXTS) == expected
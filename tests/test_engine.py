@@ -0,0 +1,62 @@
+import asyncio
+import contextlib
+
+import pytest
+
+from crawl_tools.engine import CrawlEngine, CrawlOutput, CrawlSettings, _Crawl
+
+
+def test_closing_crawl_early_cancels_it(tmp_path, monkeypatch):
+    state = {"emitted": 0, "cancelled": False}
+
+    async def run(self, emit):
+        try:
+            while True:
+                await emit(CrawlOutput(f"https://example.com/{state['emitted']}", 0, {}, None))
+                state["emitted"] += 1
+        except asyncio.CancelledError:
+            state["cancelled"] = True
+            raise
+
+    monkeypatch.setattr(_Crawl, "run", run)
+    settings = CrawlSettings(
+        url="https://example.com/", data_folder=str(tmp_path / "data"), debug_folder=str(tmp_path / "debug")
+    )
+
+    async def consume():
+        engine = CrawlEngine(queue_size=1)
+        async with contextlib.aclosing(engine.crawl(settings)) as pages:
+            async for page in pages:
+                # let the producer fill the queue and block on the next put
+                await asyncio.sleep(0.01)
+                break
+        return page
+
+    page = asyncio.run(asyncio.wait_for(consume(), timeout=5))
+    assert page.url == "https://example.com/0"
+    assert state["cancelled"]
+
+
+def test_concurrent_tasks_caps_the_dispatcher(tmp_path, monkeypatch):
+    crawl4ai = pytest.importorskip("crawl4ai")
+    dispatchers = []
+
+    class Dispatcher:
+        def __init__(self, **options):
+            dispatchers.append(options)
+
+    monkeypatch.setattr(crawl4ai, "MemoryAdaptiveDispatcher", Dispatcher)
+
+    def pacing(**fields):
+        settings = CrawlSettings(
+            url="https://example.com/", data_folder=str(tmp_path / "data"), debug_folder=str(tmp_path / "debug"),
+            **fields,
+        )
+        return _Crawl(CrawlEngine(), settings)._pacing(None)
+
+    # without either option Crawl4AI's default dispatcher is left in place
+    assert pacing()[3] is None
+    sleep_timer, _, throttle, dispatcher, _ = pacing(concurrent_tasks=3)
+    assert isinstance(dispatcher, Dispatcher) and throttle is None and sleep_timer == 2.0
+    _, _, throttle, _, _ = pacing(concurrent_tasks=3, adaptive=True)
+    assert dispatchers == [{"max_session_permit": 3}, {"max_session_permit": 3, "rate_limiter": throttle}]
@@ -0,0 +1,111 @@
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from crawl_tools import fetch_cache
+from crawl_tools.fetch_cache import FetchCache, canonical_url, freshness_lifetime
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = FetchCache(str(tmp_path / "cache"), max_bytes=10_000)
+    yield cache
+    cache.close()
+
+
+def stored_total(cache):
+    (total,) = cache.db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+    return total
+
+
+def test_canonical_url():
+    assert canonical_url("HTTPS://Example.com:443/a?b=2&a=1#frag") == "https://example.com/a?a=1&b=2"
+    assert canonical_url("http://example.com") == "http://example.com/"
+    assert canonical_url("http://example.com:8080/") == "http://example.com:8080/"
+
+
+def test_freshness_lifetime():
+    assert freshness_lifetime({}, 60) == 60
+    assert freshness_lifetime({"Cache-Control": "max-age=30"}, 60) == 30
+    assert freshness_lifetime({"cache-control": "public, s-maxage=40, max-age=30"}, 60) == 40
+    assert freshness_lifetime({"Cache-Control": "max-age=30", "Age": "10"}, 60) == 20
+    assert freshness_lifetime({"Cache-Control": "no-store"}, 60) is None
+    assert freshness_lifetime({"Cache-Control": "max-age=0"}, 60) is None
+
+
+def test_store_and_lookup_round_trip(cache):
+    body = b"<html>" + os.urandom(100).hex().encode() + b"</html>"
+    assert cache.store(
+        "https://example.com/a?y=2&x=1", body, 200, {"Content-Type": "text/html"}, "https://example.com/a/"
+    )
+    entry = cache.lookup("https://EXAMPLE.com/a?x=1&y=2#top")
+    assert entry.status_code == 200
+    assert entry.headers == {"Content-Type": "text/html"}
+    assert entry.redirected_url == "https://example.com/a/"
+    assert cache.read(entry) == body
+    assert cache.lookup("https://example.com/b") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_uncacheable_responses_are_not_stored(cache):
+    assert not cache.store("https://example.com/404", b"missing", 404)
+    assert not cache.store("https://example.com/private", b"secret", 200, {"Cache-Control": "no-store"})
+    assert cache.lookup("https://example.com/404") is None
+    assert cache.total_bytes() == 0
+
+
+def test_expired_entries_are_misses(cache, monkeypatch):
+    cache.store("https://example.com/a", b"body", 200, {"Cache-Control": "max-age=10"})
+    later = time.time() + 11
+    monkeypatch.setattr(fetch_cache, "time", SimpleNamespace(time=lambda: later))
+    assert cache.lookup("https://example.com/a") is None
+
+
+def test_total_bytes_follows_stores_and_replacements(tmp_path):
+    cache = FetchCache(str(tmp_path / "cache"))
+    for i in range(5):
+        cache.store(f"https://example.com/{i}", os.urandom(500))
+    assert cache.total_bytes() == stored_total(cache) > 0
+    cache.store("https://example.com/0", b"short")
+    assert cache.total_bytes() == stored_total(cache)
+    total = cache.total_bytes()
+    cache.close()
+
+    # a second process sharing the cache sees the same total
+    other = FetchCache(str(tmp_path / "cache"))
+    assert other.total_bytes() == total
+    other.close()
+
+
+def test_lru_eviction_keeps_the_bound(cache, monkeypatch):
+    monkeypatch.setattr(fetch_cache, "ACCESS_GRANULARITY", 0)
+    clock = [1000.0]
+    monkeypatch.setattr(fetch_cache, "time", SimpleNamespace(time=lambda: clock[0]))
+    for i in range(8):
+        clock[0] += 1
+        cache.store(f"https://example.com/{i}", os.urandom(1000))
+    # touch the oldest entry so it survives eviction
+    clock[0] += 1
+    assert cache.lookup("https://example.com/0") is not None
+    for i in range(8, 12):
+        clock[0] += 1
+        cache.store(f"https://example.com/{i}", os.urandom(1000))
+
+    assert cache.total_bytes() == stored_total(cache) <= cache.max_bytes
+    assert cache.lookup("https://example.com/0") is not None
+    assert cache.lookup("https://example.com/1") is None
+    assert cache.lookup("https://example.com/11") is not None
+    # evicted blobs are removed from disk
+    blobs = sum(len(files) for _, _, files in os.walk(cache.blob_dir))
+    (rows,) = cache.db.execute("SELECT COUNT(*) FROM entries").fetchone()
+    assert blobs == rows
+
+
+def test_recent_hits_do_not_write(cache):
+    cache.store("https://example.com/a", b"body")
+    changes = cache.db.total_changes
+    for _ in range(3):
+        assert cache.lookup("https://example.com/a") is not None
+    assert cache.db.total_changes == changes
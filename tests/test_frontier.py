@@ -0,0 +1,193 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from crawl_tools.frontier import (
+    FrontierWorker,
+    SQLiteFrontier,
+    create_frontier,
+    owned_partitions,
+    url_partition,
+)
+
+ALL = list(range(8))
+
+
+@pytest.fixture
+def frontier(tmp_path):
+    frontier = SQLiteFrontier(str(tmp_path / "frontier.db"), num_partitions=8, max_attempts=2)
+    yield frontier
+    frontier.close()
+
+
+def test_url_partition_is_stable_and_spreads_one_site():
+    urls = [f"https://example.com/docs/page{i}" for i in range(100)]
+    partitions = [url_partition(url, 64) for url in urls]
+    assert partitions == [url_partition(url, 64) for url in urls]
+    assert len(set(partitions)) > 32
+
+
+def test_owned_partitions_cover_every_partition_once():
+    owned = [owned_partitions(i, 3, 8) for i in range(3)]
+    assert sorted(p for partitions in owned for p in partitions) == ALL
+
+
+def test_add_ignores_known_urls(frontier):
+    assert frontier.add([("https://example.com/a", 0), ("https://example.com/b", 1)]) == 2
+    assert frontier.add([("https://example.com/a", 2), ("https://example.com/c", 1)]) == 1
+    assert frontier.counts() == {"pending": 3}
+
+
+def test_claim_leases_each_url_once_shallowest_first(frontier):
+    frontier.add([(f"https://example.com/{i}", i % 3) for i in range(9)])
+    first = frontier.claim("w1", ALL, limit=5, lease_seconds=60)
+    second = frontier.claim("w2", ALL, limit=10, lease_seconds=60)
+    assert len(first) == 5 and len(second) == 4
+    assert not {item.url for item in first} & {item.url for item in second}
+    assert [item.depth for item in first] == sorted(item.depth for item in first)
+    assert max(item.depth for item in first) <= min(item.depth for item in second)
+    assert frontier.claim("w3", ALL, limit=10, lease_seconds=60) == []
+    assert frontier.counts() == {"leased": 9}
+
+
+def test_claim_only_from_given_partitions(frontier):
+    urls = [f"https://example.com/{i}" for i in range(40)]
+    frontier.add((url, 0) for url in urls)
+    claimed = frontier.claim("w1", [0, 1], limit=100, lease_seconds=60)
+    assert {item.url for item in claimed} == {url for url in urls if url_partition(url, 8) in (0, 1)}
+    assert all(item.partition in (0, 1) for item in claimed)
+
+
+def test_complete_requires_the_lease(frontier):
+    frontier.add([("https://example.com/a", 0), ("https://example.com/b", 0)])
+    frontier.claim("w1", ALL, limit=2, lease_seconds=60)
+    assert not frontier.complete("https://example.com/a", "w2")
+    assert frontier.complete("https://example.com/a", "w1")
+    assert not frontier.complete("https://example.com/a", "w1")
+    assert frontier.complete("https://example.com/b", "w1", success=False)
+    assert frontier.counts() == {"done": 1, "failed": 1}
+
+
+def test_expired_leases_are_reclaimed_then_failed(frontier):
+    frontier.add([("https://example.com/a", 0)])
+    frontier.claim("w1", ALL, limit=1, lease_seconds=-1)
+    assert frontier.reclaim_expired() == 1
+    assert frontier.counts() == {"pending": 1}
+    # the stalled worker lost its lease
+    assert not frontier.complete("https://example.com/a", "w1")
+
+    (item,) = frontier.claim("w2", ALL, limit=1, lease_seconds=-1)
+    assert item.url == "https://example.com/a"
+    # claimed max_attempts times: given up instead of handed out again
+    assert frontier.reclaim_expired() == 0
+    assert frontier.counts() == {"failed": 1}
+
+
+def test_live_leases_are_kept(frontier):
+    frontier.add([("https://example.com/a", 0)])
+    frontier.claim("w1", ALL, limit=1, lease_seconds=60)
+    assert frontier.reclaim_expired() == 0
+    assert frontier.complete("https://example.com/a", "w1")
+
+
+def test_renew_extends_only_the_holders_leases(frontier):
+    frontier.add([("https://example.com/a", 0)])
+    frontier.claim("w1", ALL, limit=1, lease_seconds=-1)
+    assert frontier.renew("w2", ["https://example.com/a"], 60) == 0
+    assert frontier.renew("w1", ["https://example.com/a"], 60) == 1
+    assert frontier.reclaim_expired() == 0
+    assert frontier.complete("https://example.com/a", "w1")
+    assert frontier.renew("w1", ["https://example.com/a"], 60) == 0
+
+
+class SlowCrawler:
+    """arun_many() stand-in taking delay seconds per page."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.crawled = []
+
+    async def arun_many(self, urls, config=None, dispatcher=None):
+        async def results():
+            for url in urls:
+                await asyncio.sleep(self.delay)
+                self.crawled.append(url)
+                yield SimpleNamespace(url=url, success=True, links={}, metadata=None)
+
+        return results()
+
+
+class Config:
+    def clone(self, **kwargs):
+        return self
+
+
+async def ignore(result):
+    pass
+
+
+def test_slow_batch_keeps_its_leases(frontier):
+    urls = [f"https://example.com/{i}" for i in range(3)]
+    frontier.add((url, 0) for url in urls)
+    worker = FrontierWorker(
+        frontier, 0, 1, "https://example.com", max_depth=0,
+        batch_size=3, lease_seconds=0.2, dead_after=0.2, renew_interval=0.05,
+    )
+    crawler = SlowCrawler(delay=0.3)
+    reclaimed, heartbeat_ages = [], []
+
+    async def other_worker():
+        # what another worker does between batches
+        while True:
+            await asyncio.sleep(0.02)
+            reclaimed.append(frontier.reclaim_expired())
+            heartbeat_ages.append(time.time() - frontier.workers()["worker0"])
+
+    async def main():
+        watcher = asyncio.create_task(other_worker())
+        try:
+            await worker.run(crawler, Config(), ignore)
+        finally:
+            watcher.cancel()
+
+    asyncio.run(asyncio.wait_for(main(), timeout=10))
+    assert sorted(crawler.crawled) == urls
+    # pages take longer than the lease, yet nothing expired and worker0 never looked dead
+    assert reclaimed and not any(reclaimed)
+    assert max(heartbeat_ages) < 0.2
+    assert frontier.counts() == {"done": 3}
+
+
+def test_dead_workers_urls_and_partitions_are_taken_over(frontier):
+    urls = [f"https://example.com/{i}" for i in range(20)]
+    frontier.add((url, 0) for url in urls)
+    dead = owned_partitions(0, 2, frontier.num_partitions)
+    # worker0 claims a batch, then dies without completing it or sending a heartbeat
+    stranded = frontier.claim("worker0", dead, limit=2, lease_seconds=-1)
+    assert stranded
+
+    worker = FrontierWorker(
+        frontier, 1, 2, "https://example.com", max_depth=0,
+        batch_size=5, lease_seconds=60, dead_after=60, poll_interval=0.01,
+    )
+    crawler = SlowCrawler()
+    asyncio.run(asyncio.wait_for(worker.run(crawler, Config(), ignore), timeout=10))
+
+    assert sorted(crawler.crawled) == sorted(urls)
+    assert frontier.counts() == {"done": 20}
+    assert not frontier.complete(stranded[0].url, "worker0")
+
+
+def test_partition_count_is_fixed_at_creation(tmp_path):
+    path = str(tmp_path / "frontier.db")
+    SQLiteFrontier(path, num_partitions=8).close()
+    reopened = create_frontier(f"sqlite:///{path}", num_partitions=64)
+    assert reopened.num_partitions == 8
+    reopened.close()
+
+
+def test_unknown_frontier_spec():
+    with pytest.raises(ValueError):
+        create_frontier("memory://")
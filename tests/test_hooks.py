@@ -0,0 +1,70 @@
+import asyncio
+import os
+from types import SimpleNamespace
+
+from crawl_tools.hooks import HookContext, result_hook, save_formats
+
+BASE = "https://example.com/docs"
+EXTS = [".md", ".raw.md", ".html", ".raw.html"]
+
+
+def page(url=f"{BASE}/page", depth=1):
+    markdown = SimpleNamespace(
+        fit_markdown="# Page\n\nfit", raw_markdown="# Page\n\nraw", fit_html="<h1>Page</h1><p>fit</p>"
+    )
+    return SimpleNamespace(
+        url=url,
+        success=True,
+        status_code=200,
+        html="<html><nav>menu</nav><h1>Page</h1><p>raw</p></html>",
+        cleaned_html="<h1>Page</h1><p>raw</p>",
+        markdown=markdown,
+        metadata={"depth": depth},
+        links={"internal": [], "external": []},
+    )
+
+
+def run_hook(result, ext, data_folder):
+    mapping = {}
+    asyncio.run(result_hook(result, HookContext(BASE, ext, str(data_folder), asyncio.Lock(), mapping)))
+    return mapping
+
+
+def read(filename):
+    with open(filename, encoding="utf-8") as f:
+        return f.read()
+
+
+def test_save_formats_writes_one_file_per_format(tmp_path):
+    result = page()
+    filenames = save_formats(result, EXTS, BASE, str(tmp_path))
+    assert list(filenames) == EXTS
+    assert len(set(filenames.values())) == len(EXTS)
+    assert read(filenames[".md"]) == "# Page\n\nfit"
+    assert read(filenames[".raw.md"]) == "# Page\n\nraw"
+    assert read(filenames[".html"]) == "<h1>Page</h1><p>fit</p>"
+    assert read(filenames[".raw.html"]) == result.html
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(name) for name in filenames.values())
+
+
+def test_several_formats_map_the_url_to_ext_and_file(tmp_path):
+    mapping = run_hook(page(), EXTS, tmp_path)
+    (files,) = mapping.values()
+    assert list(mapping) == [f"{BASE}/page"]
+    assert set(files) == set(EXTS)
+    assert all(os.path.isfile(name) and name.endswith(ext) for ext, name in files.items())
+
+
+def test_single_format_keeps_the_plain_mapping(tmp_path):
+    mapping = run_hook(page(), ".md", tmp_path)
+    assert read(mapping[f"{BASE}/page"]) == "# Page\n\nfit"
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_empty_filter_output_falls_back_to_the_cleaned_html(tmp_path):
+    result = page()
+    result.markdown.fit_html = ""
+    result.markdown.fit_markdown = ""
+    filenames = save_formats(result, [".md", ".html"], BASE, str(tmp_path))
+    assert read(filenames[".md"]) == "# Page\n\nraw"
+    assert read(filenames[".html"]) == "<h1>Page</h1><p>raw</p>"
@@ -0,0 +1,44 @@
+import json
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Lightweight helpers must not pull in the crawl stack.
+HEAVY_MODULES = ["crawl4ai", "requests", "bs4", "selenium", "html2text"]
+
+# Seconds, for the imports alone (interpreter startup excluded).
+IMPORT_BUDGET = 0.5
+
+SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import crawl_tools
+from crawl_tools import DualLogger, log_print, read_content, PageIndex
+elapsed = time.perf_counter() - start
+print(json.dumps({"elapsed": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+
+def run_imports():
+    output = subprocess.run(
+        [sys.executable, "-c", SCRIPT],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output)
+
+
+def test_light_imports_skip_heavy_dependencies():
+    modules = set(run_imports()["modules"])
+    loaded = [name for name in HEAVY_MODULES if name in modules]
+    assert loaded == []
+
+
+def test_light_imports_within_budget():
+    # best of three runs, to be robust to a cold filesystem cache
+    elapsed = min(run_imports()["elapsed"] for _ in range(3))
+    assert elapsed < IMPORT_BUDGET, f"lightweight imports took {elapsed:.3f}s"
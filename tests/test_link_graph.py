@@ -0,0 +1,86 @@
+import pytest
+
+from crawl_tools.link_graph import NOT_CRAWLED, LinkGraph
+
+np = pytest.importorskip("numpy")
+
+EDGES = {
+    "a": ["b", "c"],
+    "b": ["c"],
+    "c": ["a"],
+    "d": ["c", "e"],
+}
+
+
+def build(edges):
+    graph = LinkGraph()
+    for depth, (url, links) in enumerate(edges.items()):
+        graph.add_page(url, links, depth)
+    return graph
+
+
+def reference_pagerank(graph, damping=0.85, iterations=200):
+    """Dense Google matrix power iteration, dangling pages linking to every page."""
+    n = len(graph)
+    matrix = np.zeros((n, n))
+    indptr, indices = graph.to_csr()
+    for node in range(n):
+        targets = indices[indptr[node] : indptr[node + 1]]
+        if len(targets):
+            matrix[targets, node] = 1.0 / len(targets)
+        else:
+            matrix[:, node] = 1.0 / n
+    google = damping * matrix + (1 - damping) / n
+    rank = np.full(n, 1.0 / n)
+    for _ in range(iterations):
+        rank = google @ rank
+    return rank
+
+
+def test_pagerank_matches_dense_reference():
+    graph = build(EDGES)
+    rank = graph.pagerank(tol=1e-12, max_iter=500)
+    assert rank.sum() == pytest.approx(1.0)
+    assert rank == pytest.approx(reference_pagerank(graph), abs=1e-9)
+    # "e" is never fetched: a dangling page
+    assert graph.depths[graph.ids["e"]] == NOT_CRAWLED
+    assert graph.top(rank, n=1) == [("c", pytest.approx(rank.max()))]
+
+
+def test_pagerank_of_a_cycle_is_uniform():
+    graph = build({"a": ["b"], "b": ["c"], "c": ["a"]})
+    assert graph.pagerank() == pytest.approx(np.full(3, 1 / 3))
+
+
+def test_pagerank_of_an_empty_graph():
+    assert len(LinkGraph().pagerank()) == 0
+
+
+def test_duplicate_pages_do_not_count_twice():
+    graph = build(EDGES)
+    graph.add_page("a", ["b", "c", "b"], depth=5)
+    assert graph.edge_count == 8  # appended again, deduplicated by to_csr()
+    assert graph.out_degree().tolist() == [2, 1, 1, 2, 0]
+    assert graph.pagerank() == pytest.approx(build(EDGES).pagerank())
+    # the shallowest depth is kept
+    assert graph.depths[graph.ids["a"]] == 0
+
+
+def test_fragments_and_self_links_are_dropped():
+    graph = LinkGraph()
+    graph.add_page("https://example.com/a", [
+        "https://example.com/a#top", "https://example.com/b#part", "https://example.com/b",
+    ])
+    assert graph.out_links("https://example.com/a") == ["https://example.com/b"]
+    assert graph.in_degree().tolist() == [0, 1]
+
+
+def test_save_and_load_round_trip(tmp_path):
+    graph = build(EDGES)
+    path = str(tmp_path / "crawl.links.npz")
+    graph.save(path)
+    loaded = LinkGraph.load(path)
+    assert loaded.urls == graph.urls
+    assert list(loaded.depths) == list(graph.depths)
+    assert loaded.out_links("d") == graph.out_links("d")
+    assert loaded.pagerank() == pytest.approx(graph.pagerank())
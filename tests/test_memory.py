@@ -0,0 +1,109 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from crawl_tools.memory import (
+    ByteBudget,
+    PageSizeLimit,
+    release_result,
+    result_bytes,
+    truncate_utf8,
+)
+
+
+def page(html="", url="https://example.com/", **fields):
+    return SimpleNamespace(url=url, html=html, cleaned_html=None, markdown=None, **fields)
+
+
+def test_truncate_utf8_never_splits_a_character():
+    assert truncate_utf8("abc", 10) == "abc"
+    assert truncate_utf8("héllo", 2) == "h"
+    assert truncate_utf8("héllo", 3) == "hé"
+
+
+def test_result_bytes_counts_html_and_markdown():
+    markdown = SimpleNamespace(raw_markdown="12345", fit_markdown="123", fit_html=None)
+    result = SimpleNamespace(html="x" * 10, cleaned_html="y" * 4, markdown=markdown)
+    assert result_bytes(result) == 22
+    release_result(result)
+    assert result_bytes(result) == 0
+
+
+def test_page_size_limit_measures_utf8_bytes():
+    limit = PageSizeLimit(10)
+    assert not limit.is_oversized(page("a" * 10))
+    assert limit.is_oversized(page("a" * 11))
+    # 6 characters, 12 bytes
+    assert limit.is_oversized(page("é" * 6))
+    assert not limit.is_oversized(page("é" * 5))
+
+
+def test_skip_and_truncate_modes():
+    big = page("a" * 20)
+    assert not PageSizeLimit(10, "skip").allows(big)
+    assert PageSizeLimit(10, "skip").allows(page("small"))
+    truncate = PageSizeLimit(10, "truncate")
+    assert truncate.allows(big)
+    assert truncate.apply(big.url, {".md": "b" * 30, ".txt": "short", ".html": ""}) == {
+        ".md": "b" * 10, ".txt": "short", ".html": "",
+    }
+    with pytest.raises(ValueError):
+        PageSizeLimit(10, "drop")
+
+
+def test_byte_budget_holds_back_results_that_do_not_fit():
+    async def main():
+        budget = ByteBudget(100)
+        release = {name: asyncio.Event() for name in "abc"}
+        started = []
+
+        async def hook(name):
+            started.append(name)
+            await release[name].wait()
+
+        a = await budget.spawn(page("x" * 60), hook("a"))
+        b = await budget.spawn(page("x" * 40), hook("b"))
+        # c does not fit next to a and b: spawn() waits instead of pulling more results
+        c = asyncio.create_task(budget.spawn(page("x" * 50), hook("c")))
+        await asyncio.sleep(0.01)
+        assert not c.done() and budget.used == 100
+        release["a"].set()
+        await a
+        c = await asyncio.wait_for(c, timeout=1)
+        assert budget.used == 90
+        release["b"].set()
+        release["c"].set()
+        await asyncio.gather(b, c)
+        return budget, started
+
+    budget, started = asyncio.run(main())
+    assert started == ["a", "b", "c"]
+    assert (budget.used, budget.peak) == (0, 100)
+
+
+def test_byte_budget_lets_an_oversized_result_through_alone():
+    async def main():
+        budget = ByteBudget(10)
+        small = await budget.spawn(page("x" * 5), asyncio.sleep(0.02))
+        big = await budget.spawn(page("x" * 50), asyncio.sleep(0))
+        assert small.done()  # the big result waited for the budget to empty
+        await big
+        return budget
+
+    budget = asyncio.run(main())
+    assert (budget.used, budget.peak) == (0, 50)
+
+
+def test_byte_budget_failing_hook_releases_and_raises():
+    async def failing():
+        raise RuntimeError("disk full")
+
+    async def main():
+        budget = ByteBudget(100)
+        task = await budget.spawn(page("x" * 60), failing())
+        with pytest.raises(RuntimeError):
+            await task
+        return budget
+
+    assert asyncio.run(main()).used == 0
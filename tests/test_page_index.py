@@ -0,0 +1,82 @@
+import os
+
+from crawl_tools.page_index import PageIndex, content_hash
+from crawl_tools.storage import ShardStore
+
+
+def save_page(folder, name, content):
+    path = os.path.join(folder, name)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    return path
+
+
+def test_get_finds_records_before_and_after_compaction(tmp_path):
+    index = PageIndex(str(tmp_path / ".index"))
+    for i in range(20):
+        ref = save_page(tmp_path, f"page{i}.md", f"page {i}")
+        index.add(f"https://example.com/{i}", ref, depth=i % 3, content=f"page {i}", ext=".md", fetched=i)
+    index.compact()
+    # appended after the compaction, only found by the linear scan
+    ref = save_page(tmp_path, "late.md", "late")
+    index.add("https://example.com/late", ref, depth=1, content="late", ext=".md")
+
+    entry = index.get("https://example.com/7")
+    assert entry.ref == str(tmp_path / "page7.md")
+    assert (entry.depth, entry.ext, entry.fetched) == (1, ".md", 7)
+    assert entry.content_hash == content_hash("page 7")
+    assert entry.length == len("page 7")
+    assert index.read(entry) == "page 7"
+    assert index.get("https://example.com/late").ref == ref
+    assert index.get("https://example.com/missing") is None
+    assert len(index) == 21
+    index.close()
+
+
+def test_get_returns_latest_entry_per_extension(tmp_path):
+    index = PageIndex(str(tmp_path / ".index"))
+    url = "https://example.com/a"
+    index.add(url, save_page(tmp_path, "a1.md", "old"), 0, "old", ".md")
+    index.add(url, save_page(tmp_path, "a.raw.html", "<p>html</p>"), 0, "<p>html</p>", ".raw.html")
+    index.compact()
+    index.add(url, save_page(tmp_path, "a2.md", "new"), 0, "new", ".md")
+
+    assert [e.ref for e in index.get_all(url)] == [
+        str(tmp_path / name) for name in ("a1.md", "a.raw.html", "a2.md")
+    ]
+    assert index.get(url).ref == str(tmp_path / "a2.md")
+    assert index.get(url, ext=".raw.html").ext == ".raw.html"
+    assert [e.ref for e in index.iter_entries(ext=".md")] == [str(tmp_path / "a2.md")]
+    index.close()
+
+
+def test_iter_entries_filters_on_depth_and_fetch_time(tmp_path):
+    index = PageIndex(str(tmp_path / ".index"))
+    for i in range(6):
+        ref = save_page(tmp_path, f"p{i}.md", str(i))
+        index.add(f"https://example.com/{i}", ref, depth=i % 3, content=str(i), ext=".md", fetched=100 + i)
+    urls = [e.url for e in index.iter_entries(max_depth=1, since=102)]
+    assert urls == ["https://example.com/3", "https://example.com/4"]
+    index.close()
+
+
+def test_sharded_refs_and_readonly_readers(tmp_path):
+    store = ShardStore(str(tmp_path), compression="gzip")
+    index = PageIndex(str(tmp_path / ".index"))
+    for i in range(5):
+        ref = store.save(f"https://example.com/{i}", f"content {i}", 0, ".md", "https://example.com/")
+        index.add(f"https://example.com/{i}", ref, 0, f"content {i}", ".md")
+    store.close()
+    index.compact()
+
+    reader = PageIndex(str(tmp_path / ".index"), readonly=True)
+    entry = reader.get("https://example.com/3")
+    assert "#" in entry.ref
+    assert reader.read(entry) == "content 3"
+    # a reader sees records appended later once it refreshes
+    index.add("https://example.com/new", entry.ref, 0, "content 3", ".md")
+    assert reader.get("https://example.com/new") is None
+    reader.refresh()
+    assert reader.get("https://example.com/new") is not None
+    reader.close()
+    index.close()
@@ -0,0 +1,124 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from crawl_tools.interactions_js import PAGINATION_MARKER_ID, paginate_step
+from crawl_tools.pagination import Paginator
+
+LISTING = "https://example.com/list"
+
+
+def step_result(info, links=()):
+    """What arun() returns for a js_only step whose script returned info (None: navigated away)."""
+    results = [{"success": True, "result": info}] if info is not None else []
+    return SimpleNamespace(
+        url=LISTING,
+        success=True,
+        error_message=None,
+        html="<html>whole listing</html>",
+        links={"internal": [{"href": href} for href in links]},
+        metadata=None,
+        js_execution_result={"success": True, "results": results},
+    )
+
+
+def added(n, html):
+    return {"added": n, "total": 10 + n, "clicked": True, "html": html}
+
+
+class Config:
+    def __init__(self, **fields):
+        self.fields = fields
+
+    def clone(self, **fields):
+        return Config(**{**self.fields, **fields})
+
+
+class StepCrawler:
+    """Plays back the first load, then one result per pagination step."""
+
+    def __init__(self, steps):
+        self.steps = list(steps)
+        self.configs = []
+        self.killed = []
+        self.crawler_strategy = SimpleNamespace(kill_session=self._kill)
+
+    async def _kill(self, session_id):
+        self.killed.append(session_id)
+
+    async def arun(self, url, config=None):
+        self.configs.append(config)
+        # a container, like the CrawlResultContainer arun() returns
+        if len(self.configs) == 1:
+            return [SimpleNamespace(url=url, success=True, error_message=None)]
+        return [self.steps.pop(0)]
+
+
+def collect(paginator, crawler):
+    async def main():
+        return [result async for result in paginator.paginate(crawler, LISTING, Config())]
+
+    return asyncio.run(main())
+
+
+def test_paginate_step_quotes_its_arguments():
+    script = paginate_step('a[data-x="1"]', None, 2500)
+    assert json.dumps('a[data-x="1"]') in script
+    assert "NEXT = null" in script
+    assert "TIMEOUT = 2500" in script
+    assert json.dumps(PAGINATION_MARKER_ID) in script
+
+
+def test_step_info():
+    assert Paginator._step_info(step_result(added(2, "x"))) == added(2, "x")
+    assert Paginator._step_info(step_result(None)) is None
+    assert Paginator._step_info(SimpleNamespace(js_execution_result=None)) is None
+
+
+def test_seed_links_stay_within_base_and_are_unique():
+    paginator = Paginator(".item")
+    paginator.links = [
+        "https://example.com/list/a", "https://example.com/list/a/", "https://other.com/b",
+        "https://example.com/list/c?ref=1",
+    ]
+    assert paginator.seed_links("https://example.com/list") == [
+        "https://example.com/list/a", "https://example.com/list/c?ref=1",
+    ]
+
+
+def test_only_steps_with_new_items_are_yielded():
+    pytest.importorskip("crawl4ai")
+    crawler = StepCrawler([
+        step_result(added(2, "<li>1</li><li>2</li>"), links=["https://example.com/list/1"]),
+        step_result(added(0, "")),
+        step_result(added(1, "<li>3</li>"), links=["https://example.com/list/3"]),
+        step_result(added(0, "")),
+        step_result(added(0, "")),
+        step_result(added(5, "never reached")),
+    ])
+    paginator = Paginator(".item", next_selector="button.more", max_pages=10)
+    pages = collect(paginator, crawler)
+
+    assert [page.url for page in pages] == [f"{LISTING}#page-1", f"{LISTING}#page-2"]
+    # the saved HTML is the new items from the marker, not the serialized listing
+    assert [page.html for page in pages] == ["<li>1</li><li>2</li>", "<li>3</li>"]
+    assert [page.metadata for page in pages] == [{"depth": 0, "page": 1}, {"depth": 0, "page": 2}]
+    assert paginator.links == ["https://example.com/list/1", "https://example.com/list/3"]
+    # two idle steps in a row end the pagination
+    assert len(crawler.steps) == 1
+    step_config = crawler.configs[1].fields
+    assert step_config["js_only"] and step_config["css_selector"] == f"#{PAGINATION_MARKER_ID}"
+    assert crawler.killed == [step_config["session_id"]]
+
+
+def test_navigation_and_max_pages_stop_paginating():
+    pytest.importorskip("crawl4ai")
+    crawler = StepCrawler([step_result(added(1, "a")), step_result(None), step_result(added(1, "b"))])
+    assert len(collect(Paginator(".item"), crawler)) == 1
+    assert len(crawler.steps) == 1
+
+    crawler = StepCrawler([step_result(added(1, str(i))) for i in range(5)])
+    assert len(collect(Paginator(".item", max_pages=3), crawler)) == 3
+    assert len(crawler.killed) == 1
@@ -0,0 +1,52 @@
+import asyncio
+import time
+
+from crawl_tools.profiling import Profiler, _activities, _activity_key, activity
+
+URL = "https://example.com/slow"
+
+
+def test_activity_labels_nest_and_restore():
+    with activity("outer"):
+        with activity("inner"):
+            assert _activities[_activity_key()] == "inner"
+        assert _activities[_activity_key()] == "outer"
+    assert _activity_key() not in _activities
+
+
+def blocking_parse(seconds):
+    time.sleep(seconds)
+
+
+async def hook(url):
+    with activity(f"result_hook {url}"):
+        await asyncio.sleep(0)
+        blocking_parse(0.3)
+
+
+def test_stall_names_the_blocking_hook_and_url(tmp_path):
+    path = tmp_path / "profile" / "stacks.folded"
+
+    async def main():
+        profiler = Profiler(str(path), interval=0.005, stall_threshold=0.05)
+        profiler.start(asyncio.get_running_loop())
+        await asyncio.sleep(0.05)
+        await asyncio.create_task(hook(URL))
+        # let the heartbeat catch up so the stall ends
+        await asyncio.sleep(0.1)
+        profiler.stop()
+        return profiler
+
+    profiler = asyncio.run(asyncio.wait_for(main(), timeout=5))
+    # a busy machine may add short stalls of its own
+    (stall,) = [stall for stall in profiler.stalls if stall[0] > 0.2]
+    duration, label, site = stall
+    assert duration < 1
+    assert label == f"result_hook {URL}"
+    assert "test_profiling.py" in site and "blocking_parse" in site
+    assert any(site in line for line in profiler.summary().splitlines())
+
+    # the folded stacks of the loop thread went through the blocking call
+    stacks = path.read_text(encoding="utf-8").splitlines()
+    assert any("blocking_parse (test_profiling.py" in line for line in stacks)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in stacks)
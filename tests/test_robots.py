@@ -0,0 +1,110 @@
+import pytest
+
+requests = pytest.importorskip("requests")
+pytest.importorskip("crawl4ai")
+
+from crawl_tools import seeding  # noqa: E402
+from crawl_tools.seeding import RobotsRules  # noqa: E402
+
+ROBOTS_TXT = b"""
+User-agent: *
+Disallow: /private/
+Allow: /private/public.html
+Crawl-delay: 2
+
+User-agent: SpecialBot
+Disallow: /
+
+Sitemap: https://example.com/sitemap.xml
+Sitemap: https://example.com/news.xml.gz
+"""
+
+
+class MemoryCache:
+    """Just the FetchCache calls RobotsRules makes, backed by a dict."""
+
+    def __init__(self, bodies=None):
+        self.bodies = dict(bodies or {})
+        self.stored = {}
+
+    def lookup(self, url):
+        return url if url in self.bodies else None
+
+    def read(self, entry):
+        return self.bodies[entry]
+
+    def store(self, url, body, status_code=200, headers=None, redirected_url=None):
+        self.stored[url] = body
+        return True
+
+
+class Response:
+    def __init__(self, status_code, content=b""):
+        self.status_code = status_code
+        self.content = content
+        self.text = content.decode("utf-8")
+        self.headers = {}
+
+
+def fail_get(*args, **kwargs):
+    raise AssertionError("robots.txt should have come from the cache")
+
+
+def test_rules_from_cache(monkeypatch):
+    monkeypatch.setattr(seeding.requests, "get", fail_get)
+    cache = MemoryCache({"https://example.com/robots.txt": ROBOTS_TXT})
+    rules = RobotsRules("https://example.com/docs/index.html", cache=cache)
+
+    assert rules.found
+    assert rules.can_fetch("https://example.com/docs/page")
+    assert not rules.can_fetch("https://example.com/private/secret")
+    assert rules.crawl_delay == 2.0
+    assert rules.sitemaps == ["https://example.com/sitemap.xml", "https://example.com/news.xml.gz"]
+
+
+def test_user_agent_groups(monkeypatch):
+    monkeypatch.setattr(seeding.requests, "get", fail_get)
+    cache = MemoryCache({"https://example.com/robots.txt": ROBOTS_TXT})
+    rules = RobotsRules("https://example.com/", user_agent="SpecialBot/1.0", cache=cache)
+
+    assert not rules.can_fetch("https://example.com/docs/page")
+    assert rules.crawl_delay is None
+
+
+def test_fetched_rules_are_cached(monkeypatch):
+    requested = []
+
+    def get(url, headers=None, timeout=None):
+        requested.append(url)
+        return Response(200, ROBOTS_TXT)
+
+    monkeypatch.setattr(seeding.requests, "get", get)
+    cache = MemoryCache()
+    rules = RobotsRules("https://example.com/docs/", cache=cache)
+
+    assert requested == ["https://example.com/robots.txt"]
+    assert cache.stored == {"https://example.com/robots.txt": ROBOTS_TXT}
+    assert not rules.can_fetch("https://example.com/private/")
+
+
+@pytest.mark.parametrize(
+    "status_code, allowed",
+    [(404, True), (500, True), (401, False), (403, False)],
+)
+def test_missing_or_denied_robots_txt(monkeypatch, status_code, allowed):
+    monkeypatch.setattr(seeding.requests, "get", lambda *args, **kwargs: Response(status_code))
+    rules = RobotsRules("https://example.com/")
+
+    assert not rules.found
+    assert rules.can_fetch("https://example.com/anything") is allowed
+    assert rules.sitemaps == []
+
+
+def test_unreachable_robots_txt_allows_everything(monkeypatch):
+    def get(*args, **kwargs):
+        raise requests.RequestException("connection refused")
+
+    monkeypatch.setattr(seeding.requests, "get", get)
+    rules = RobotsRules("https://example.com/")
+
+    assert rules.can_fetch("https://example.com/private/")
@@ -0,0 +1,93 @@
+import math
+
+import pytest
+
+from crawl_tools.search import BM25_B, BM25_K1, SearchIndex, tokenize
+
+DOCS = {
+    "https://example.com/cats": "Cats purr. A cat sleeps all day, cats love sleeping.",
+    "https://example.com/dogs": "Dogs bark and dogs fetch. A dog walks every day.",
+    "https://example.com/pets": "Cats and dogs are pets.",
+    "https://example.com/fish": "Fish swim in water all day long without a sound.",
+    "https://example.com/birds": "Birds sing early in the morning and fly south in winter.",
+}
+
+
+def bm25(query, docs):
+    """Reference Okapi BM25 over tokenized docs (no epsilon floor needed for these queries)."""
+    tokenized = {url: tokenize(text) for url, text in docs.items()}
+    avgdl = sum(len(tokens) for tokens in tokenized.values()) / len(tokenized)
+    scores = {}
+    for url, tokens in tokenized.items():
+        score = 0.0
+        for term in tokenize(query):
+            df = sum(term in other for other in tokenized.values())
+            tf = tokens.count(term)
+            if not tf:
+                continue
+            idf = math.log(len(docs) - df + 0.5) - math.log(df + 0.5)
+            score += idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * len(tokens) / avgdl))
+        if score:
+            scores[url] = score
+    return scores
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = SearchIndex(str(tmp_path / ".search.db"))
+    for url, text in DOCS.items():
+        index.add(url, f"{url}.md", text)
+    yield index
+    index.close()
+
+
+def test_ranking_matches_bm25(index):
+    for query in ("cats", "dogs bark", "water sound", "sing winter morning"):
+        expected = bm25(query, DOCS)
+        hits = index.search(query)
+        assert [hit.url for hit in hits] == sorted(expected, key=expected.get, reverse=True)
+        for hit in hits:
+            assert hit.score == pytest.approx(expected[hit.url])
+
+
+def test_hits_carry_ref_and_ext(index):
+    (hit,) = index.search("purr")
+    assert (hit.url, hit.ref, hit.ext) == ("https://example.com/cats", "https://example.com/cats.md", ".md")
+
+
+def test_top_and_unknown_terms(index):
+    assert len(index.search("cats dogs", top=1)) == 1
+    assert index.search("zebra") == []
+    assert index.search("") == []
+
+
+def test_common_terms_use_the_epsilon_floor(index):
+    # "day" is in 3 of 5 docs: a negative idf, floored at a small positive weight
+    hits = index.search("day")
+    assert {hit.url for hit in hits} == {
+        "https://example.com/cats", "https://example.com/dogs", "https://example.com/fish",
+    }
+    assert all(hit.score > 0 for hit in hits)
+
+
+def test_readding_a_page_replaces_its_postings(index):
+    index.add("https://example.com/fish", "fish2.md", "Fish are pets that purr loudly.")
+    assert len(index) == len(DOCS)
+    assert index.search("water") == []
+    assert [hit.url for hit in index.search("purr")][0] == "https://example.com/fish"
+    assert index.has("https://example.com/fish", ".md")
+    assert not index.has("https://example.com/fish", ".txt")
+
+
+def test_formats_are_indexed_separately(index):
+    index.add("https://example.com/cats", "cats.txt", "plain text about cats", ext=".txt")
+    assert len(index) == len(DOCS) + 1
+    assert {(url, ext) for url, ext, _ in index.docs() if url.endswith("/cats")} == {
+        ("https://example.com/cats", ".md"), ("https://example.com/cats", ".txt"),
+    }
+
+
+def test_empty_index(tmp_path):
+    index = SearchIndex(str(tmp_path / "empty.db"))
+    assert index.search("anything") == []
+    index.close()
@@ -0,0 +1,160 @@
+import asyncio
+import time
+from email.utils import formatdate
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("crawl4ai")
+
+from crawl_tools import throttle  # noqa: E402
+from crawl_tools.throttle import AdaptiveRateLimiter, RetryQueue, parse_retry_after  # noqa: E402
+
+URL = "https://example.com/a"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(throttle, "time", SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+def failed(url=URL, status_code=503, retry_after=None, depth=0, error_message=None):
+    return SimpleNamespace(
+        url=url,
+        success=False,
+        status_code=status_code,
+        error_message=error_message,
+        response_headers={"Retry-After": retry_after} if retry_after else {},
+        metadata={"depth": depth},
+    )
+
+
+def respond(limiter, clock, status_code=200, latency=0.1, url=URL):
+    """One request through the limiter that takes latency seconds to answer."""
+    limiter.host(url).in_flight[url] = clock[0]
+    clock[0] += latency
+    return limiter.update_delay(url, status_code)
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after(" 120 ") == 120
+    assert parse_retry_after(formatdate(time.time() + 60, usegmt=True)) == pytest.approx(60, abs=2)
+    assert parse_retry_after(formatdate(time.time() - 60, usegmt=True)) == 0
+    assert parse_retry_after("soon") is None
+
+
+def test_fast_responses_increase_additively(clock):
+    limiter = AdaptiveRateLimiter(initial_delay=1.0, delay_step=0.25, max_concurrency=3)
+    concurrency, delays = [], []
+    for _ in range(5):
+        assert respond(limiter, clock)
+        state = limiter.host(URL)
+        concurrency.append(state.concurrency)
+        delays.append(state.delay)
+    # +1 per window of `concurrency` responses, capped at max_concurrency
+    assert concurrency == pytest.approx([2.0, 2.5, 2.9, 3.0, 3.0])
+    assert delays == [0.75, 0.5, 0.25, 0.0, 0.0]
+
+
+def test_congestion_and_slow_responses_decrease_multiplicatively(clock):
+    limiter = AdaptiveRateLimiter(initial_delay=0.0, delay_step=0.25, max_concurrency=8)
+    for _ in range(10):
+        respond(limiter, clock)
+    state = limiter.host(URL)
+    before = state.concurrency
+    assert before > 4
+
+    # retries are left to RetryQueue, the dispatcher never drops the result
+    assert respond(limiter, clock, status_code=429)
+    assert state.concurrency == pytest.approx(before / 2)
+    assert state.delay == 0.25
+    respond(limiter, clock, status_code=503)
+    assert state.concurrency == pytest.approx(max(1.0, before / 4))
+    assert state.delay == 0.5
+
+    # a latency above latency_factor times the best one backs off as well
+    before = state.concurrency
+    respond(limiter, clock, latency=5.0)
+    assert state.concurrency == max(1.0, before / 2)
+    assert state.delay == 1.0
+
+
+def test_backoff_honours_retry_after_and_slots(clock):
+    limiter = AdaptiveRateLimiter(initial_delay=0.0, max_delay=60.0)
+    state = limiter.host(URL)
+    state.in_flight[URL] = clock[0]
+    limiter.record_result(failed(status_code=429, retry_after="30"))
+    assert not state.in_flight
+    assert limiter._wait_time(state, clock[0]) == 30
+    assert limiter._wait_time(state, clock[0] + 31) == 0
+
+    # Retry-After is bounded by max_delay
+    limiter.record_result(failed(status_code=503, retry_after="3600"))
+    assert state.blocked_until == clock[0] + 60
+
+    # a host with all its slots taken waits for a release
+    clock[0] += 100
+    state.in_flight["https://example.com/b"] = clock[0]
+    assert limiter._wait_time(state, clock[0]) == -1
+    # other hosts are not affected
+    assert limiter._wait_time(limiter.host("https://other.com/"), clock[0]) == 0
+
+
+def test_retry_queue_gives_up_after_max_retries(clock):
+    queue = RetryQueue(max_retries=2)
+    assert not queue.push(failed(status_code=404))
+    assert queue.push(failed(status_code=None, error_message="Timeout 30000ms exceeded"))
+    assert queue.push(failed())
+    assert not queue.push(failed())
+    assert (len(queue), queue.attempts[URL]) == (2, 2)
+
+
+def test_retry_queue_backoff(clock, monkeypatch):
+    monkeypatch.setattr(throttle.random, "uniform", lambda low, high: 1.0)
+    queue = RetryQueue(max_retries=10, base_backoff=5.0, max_backoff=30.0)
+    for _ in range(4):
+        queue.push(failed())
+    assert sorted(due - clock[0] for due, _, _ in queue._heap) == [5.0, 10.0, 20.0, 30.0]
+    # Retry-After lengthens the backoff, up to max_backoff
+    queue.push(failed("https://example.com/b", retry_after="20"))
+    queue.push(failed("https://example.com/c", retry_after="3600"))
+    due = {url: due - clock[0] for due, url, _ in queue._heap}
+    assert (due["https://example.com/b"], due["https://example.com/c"]) == (20.0, 30.0)
+
+
+def test_drain_recrawls_in_due_order_until_empty(monkeypatch):
+    monkeypatch.setattr(throttle.random, "uniform", lambda low, high: 1.0)
+    queue = RetryQueue(max_retries=2, base_backoff=0.01)
+    # URL was already retried once: its retry is due after 0.02s, the others after 0.01s
+    queue.attempts[URL] = 1
+    queue.push(failed(depth=2))
+    queue.push(failed("https://example.com/b", depth=1))
+    queue.push(failed("https://example.com/c", status_code=200, error_message="net::ERR_CONNECTION_RESET"))
+
+    class Crawler:
+        def __init__(self):
+            self.crawled = []
+
+        async def arun(self, url, config=None):
+            self.crawled.append(url)
+            return [failed(url, depth=None)]
+
+    handled = []
+
+    async def handle(result):
+        handled.append((result.url, result.metadata["depth"]))
+        # the save hook pushes failures again, until their retries are exhausted
+        queue.push(result)
+
+    crawler = Crawler()
+    asyncio.run(asyncio.wait_for(queue.drain(crawler, None, handle), timeout=5))
+    assert len(queue) == 0
+    assert sorted(crawler.crawled[:2]) == ["https://example.com/b", "https://example.com/c"]
+    assert crawler.crawled[2] == URL
+    assert sorted(crawler.crawled[3:]) == ["https://example.com/b", "https://example.com/c"]
+    # the depth comes from the queue, not from the re-crawled result
+    assert handled[2] == (URL, 2)
+    assert ("https://example.com/b", 1) in handled